@@ -0,0 +1,63 @@
+"""
+Backtest throughput over synthetic book+trade recordings (several
+instruments per file, one file per "day"), single process versus a
+process pool split per (file, instrument).
+
+Run from the repository root:
+    python -m benchmarks.bench_backtest
+"""
+import os
+import time
+import shutil
+import tempfile
+from utils.replay import FrameRecorder
+from utils.synthetic import SyntheticBook
+from veloz.backtest import backtest, format_report
+
+INSTRUMENTS = [f"SYN{i}-USDT" for i in range(4)]
+DAYS = 2
+UPDATES = 2000
+TRADE_EVERY = 5
+
+
+def write_day(path, day):
+    books = [SyntheticBook(inst, depth=400, mid=100.0 * (i + 1), tick=0.1, seed=day * 100 + i)
+             for i, inst in enumerate(INSTRUMENTS)]
+    streams = [book.messages(UPDATES, trade_every=TRADE_EVERY) for book in books]
+    frames = 0
+    with FrameRecorder(path) as rec:
+        # Interleave instruments the way a multi-instrument session records them
+        for batch in zip(*streams):
+            for msg in batch:
+                rec.write(msg, day * 86400.0 + frames * 1e-3)
+                frames += 1
+    return frames
+
+
+def main():
+    tmp = tempfile.mkdtemp()
+    try:
+        paths = [os.path.join(tmp, f"day{day}.rec") for day in range(DAYS)]
+        frames = sum(write_day(path, day) for day, path in enumerate(paths))
+        size_mb = sum(os.path.getsize(path) for path in paths) / 1e6
+        print(f"{DAYS} files x {len(INSTRUMENTS)} instruments: {frames} frames, {size_mb:.0f} MB")
+
+        options = dict(qty_usd=1e5, vol24h=5000.0, price_every=50)
+        backtest(paths[:1], INSTRUMENTS[:1], workers=1, **options)  # warm model caches
+        for label, instruments, workers in (("1 process, per file", None, 1),
+                                            ("1 process, per instrument", INSTRUMENTS, 1),
+                                            (f"{os.cpu_count()} workers, per instrument", INSTRUMENTS, os.cpu_count()),
+                                            ("4 workers, per instrument", INSTRUMENTS, 4)):
+            start = time.perf_counter()
+            merged = backtest(paths, instruments, workers=workers, **options)
+            elapsed = time.perf_counter() - start
+            total = merged['ALL']
+            print(f"  {label:<28} {elapsed:6.2f}s  {total.frames / elapsed:9.0f} frames/s  "
+                  f"trades={total.trades}")
+        print(format_report(merged['ALL'].summary()))
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    main()
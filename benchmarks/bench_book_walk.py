@@ -0,0 +1,72 @@
+"""
+Book-walking fills on a 400-level book: prefix-sum + binary search against a
+level-by-level loop, single and batched queries on both sides, and the
+regression slippage estimate next to the exact walk.
+
+Run from the repository root:
+    python -m benchmarks.bench_book_walk
+"""
+import numpy as np
+from models.book_walk import BookWalker
+from models.slippage import estimate_slippage
+from utils.orderbook import BookSnapshot
+from benchmarks.common import per_call_us, synthetic_levels
+
+VOL24H = 5000.0
+
+
+def naive_walk(px, sz, notional):
+    """Level-by-level reference: (qty, filled_usd, levels)."""
+    qty = filled = 0.0
+    levels = 0
+    for p, s in zip(px.tolist(), sz.tolist()):
+        if filled >= notional * (1 - 1e-12):
+            break
+        levels += 1
+        take = min(s, (notional - filled) / p)
+        qty += take
+        filled += take * p
+    return qty, filled, levels
+
+
+def check_parity(book):
+    walker = BookWalker(book)
+    notionals = np.concatenate(([1.0, 50.0], np.geomspace(1e2, 1e6, 40)))
+    for side, px, sz in (("buy", book.ask_px, book.ask_sz), ("sell", book.bid_px, book.bid_sz)):
+        batch = walker.walk_many(notionals, side)
+        for i, n in enumerate(notionals):
+            qty, filled, levels = naive_walk(px, sz, n)
+            one = walker.walk(n, side)
+            assert np.isclose(one['qty'], qty, rtol=1e-9) and np.isclose(batch['qty'][i], qty, rtol=1e-9)
+            assert np.isclose(one['filled_usd'], filled, rtol=1e-9)
+            assert one['levels'] == levels == batch['levels'][i], (side, n, one['levels'], levels)
+    print(f"  parity ok: {len(notionals)} notionals per side match the level-by-level walk")
+
+
+def main():
+    asks, bids = synthetic_levels(400)
+    book = BookSnapshot.from_levels(asks, bids)
+    check_parity(book)
+
+    print("400-level book")
+    print(f"  BookWalker + prefix sums     {per_call_us(lambda: BookWalker(book).walk(1e5), 5000):8.2f} us")
+    walker = BookWalker(book)
+    walker.walk(1e5)
+    print(f"  walk(), prefix built         {per_call_us(lambda: walker.walk(1e5), 20000):8.2f} us")
+    print(f"  level-by-level loop          {per_call_us(lambda: naive_walk(book.ask_px, book.ask_sz, 1e5), 200):8.2f} us")
+    for n in (50, 500):
+        sizes = np.geomspace(1e3, 1e7, n)
+        for side in ("buy", "sell"):
+            t = per_call_us(lambda: walker.walk_many(sizes, side), 2000)
+            print(f"  walk_many {n:>3} sizes {side:<4}     {t:8.2f} us  ({n / t * 1e6:10.0f} queries/s)")
+
+    print("regression estimate vs book walk (buy)")
+    for qty in (1e3, 1e4, 1e5, 1e6):
+        fill = walker.walk(qty, "buy")
+        print(f"  ${qty:>9,.0f}  model={estimate_slippage(book, qty, None, VOL24H):9.3f}  "
+              f"walk={fill['slippage']:9.3f}  vwap={fill['vwap']:.4f}  levels={fill['levels']}  "
+              f"residual={fill['residual_usd']:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Frame decoding on a recorded synthetic feed (400-level books with trades
+interleaved): stdlib json versus orjson per frame type, the channel peek
+that skips frames before decoding, and the whole per-frame path as it was
+(json + timestamp formatting per tick) against the new one.
+
+Run from the repository root:
+    python -m benchmarks.bench_decode
+"""
+import os
+import json
+import tempfile
+from engine import CostCalculator
+from utils.decode import DECODERS, format_ts, peek_arg
+from utils.replay import FrameRecorder, read_frames, replay
+from utils.synthetic import SyntheticBook
+from utils.volume import VolumeCache
+from benchmarks.common import per_call_us
+
+UPDATES = 5000
+VOL24H = 5000.0
+
+
+def record(path):
+    feed = SyntheticBook("SYN-USDT", depth=400, seed=1)
+    with FrameRecorder(path) as rec:
+        for msg in feed.messages(UPDATES, trade_every=4):
+            rec.write(msg)
+
+
+def calculator(decoder, book_depth=None):
+    calc = CostCalculator("SYN-USDT", 1e5, "Tier 1", 0.5, VolumeCache(lambda inst: VOL24H),
+                          {'delta': 0.3, 'gamma': 0.45, 'lam': 1e-6, 'T': 1.0, 'N': 100},
+                          decoder=decoder, book_depth=book_depth)
+    calc.vol_cache.set(calc.asset, VOL24H)
+    return calc
+
+
+def previous_path(calc):
+    """Every frame decoded with json; the timestamp formatted on every priced tick."""
+    def process(msg):
+        tick = json.loads(msg)
+        if tick.get('arg', {}).get('channel') != 'books' or not calc.apply(tick):
+            return None
+        result = calc.evaluate()
+        result['timestamp'] = format_ts(result['ts'])
+        return result
+    return process
+
+
+def current_path(calc):
+    """Non-book frames skipped on the peeked channel; formatting left to the UI/output."""
+    def process(msg):
+        peeked = peek_arg(msg)
+        if peeked is not None and peeked[0] != 'books':
+            return None
+        if not calc.apply(calc.decode(msg)):
+            return None
+        return calc.evaluate()
+    return process
+
+
+def main():
+    path = os.path.join(tempfile.mkdtemp(), "feed.rec")
+    record(path)
+    frames = [msg for _, msg in read_frames(path)]
+    kinds = {
+        'snapshot (400 levels)': frames[0],
+        'update (8 levels)': next(m for m in frames if '"update"' in m),
+        'trade': next(m for m in frames if '"trades"' in m),
+    }
+
+    print("decode only")
+    for kind, msg in kinds.items():
+        row = "  ".join(f"{name} {per_call_us(lambda: fn(msg), 2000 if 'snapshot' not in kind else 200):8.2f} us"
+                        for name, fn in DECODERS.items())
+        print(f"  {kind:<22} {row}  peek {per_call_us(lambda: peek_arg(msg), 5000):6.2f} us  "
+              f"({len(msg)} bytes)")
+    print(f"  format_ts              {per_call_us(lambda: format_ts(1700000000123), 20000):8.2f} us")
+
+    print(f"per-frame path over {len(frames)} recorded frames ({UPDATES} updates, 1 trade per 4)")
+    runs = [("previous: json, ts formatted", previous_path(calculator("json"))),
+            ("json decoder, peek", current_path(calculator("json")))]
+    if 'orjson' in DECODERS:
+        runs.append(("orjson decoder, peek", current_path(calculator("orjson"))))
+        runs.append(("orjson, book_depth=50", current_path(calculator("orjson", book_depth=50))))
+    for label, process in runs:
+        replay(path, process)  # warm up
+        stats = replay(path, process)
+        print(f"  {label:<30} {stats['ticks_per_sec']:9.0f} ticks/s  p50={stats['p50_ms'] * 1000:7.1f} us  "
+              f"p99={stats['p99_ms'] * 1000:7.1f} us  errors={stats['errors']}")
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Startup time and steady-state memory of the headless CLI (python -m veloz)
+against the local mock OKX server.
+
+Run from the repository root:
+    python -m benchmarks.bench_headless
+"""
+import re
+import sys
+import time
+import subprocess
+import multiprocessing as mp
+from benchmarks.bench_mock_feed import _serve, PORT
+
+DURATION = 5.0
+
+
+def run_cli(instruments):
+    cmd = [sys.executable, "-W", "ignore", "-m", "veloz", "run", "--qty", "1e5", "--vol24h", "5000",
+           "--uri", f"ws://127.0.0.1:{PORT}", "--duration", str(DURATION), "--metrics", "",
+           "--log-file", "/dev/null", "--report-every", "0"]
+    for inst in instruments:
+        cmd += ["--inst", inst]
+
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    first_line = None
+    lines = 0
+    for _ in proc.stdout:
+        if first_line is None:
+            first_line = time.perf_counter() - start
+        lines += 1
+    stderr = proc.communicate()[1].decode()
+
+    imports = re.search(r"startup imports=(\d+)ms rss=([\d.]+)MB", stderr)
+    stopped = re.search(r"rss=([\d.]+)MB peak_rss=([\d.]+)MB", stderr)
+    return {
+        'first_line_s': first_line,
+        'lines': lines,
+        'imports_ms': float(imports.group(1)) if imports else float("nan"),
+        'rss_after_imports_mb': float(imports.group(2)) if imports else float("nan"),
+        'rss_mb': float(stopped.group(1)) if stopped else float("nan"),
+        'peak_rss_mb': float(stopped.group(2)) if stopped else float("nan"),
+    }
+
+
+def main():
+    server = mp.Process(target=_serve, args=({'rate': 200, 'depth': 400},), daemon=True)
+    server.start()
+    time.sleep(1.0)
+    try:
+        print(f"python -m veloz run, {DURATION:.0f}s against the mock feed (200 msg/s per instrument)")
+        for n in (1, 5):
+            stats = run_cli([f"SYN{i}-USDT" for i in range(n)])
+            print(f"  instruments={n}  imports={stats['imports_ms']:.0f}ms  "
+                  f"first result={stats['first_line_s'] * 1000:.0f}ms  results={stats['lines']}  "
+                  f"rss after imports={stats['rss_after_imports_mb']:.1f}MB  "
+                  f"steady rss={stats['rss_mb']:.1f}MB  peak={stats['peak_rss_mb']:.1f}MB")
+    finally:
+        server.terminate()
+        server.join()
+
+
+if __name__ == "__main__":
+    main()
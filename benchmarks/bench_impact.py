@@ -0,0 +1,117 @@
+"""
+Per-call latency of the vectorized impact engine, checked against the original
+loop implementation.
+
+Run from the repository root:
+    python -m benchmarks.bench_impact
+"""
+import time
+import numpy as np
+from models.impact import TrajectoryCache, calculate_impact, decay_matrix
+
+BOOK = [[100.0 + 0.01*i, 1.0] for i in range(5)]
+PARAMS = {'delta': 0.3, 'gamma': 0.45, 'lam': 1e-6, 'T': 1.0}
+
+
+def reference_impact(orderbook, qty_usd, sigma, delta, gamma, lam, T=1.0, N=100):
+    """The pre-vectorization implementation, kept verbatim for parity checks."""
+    bids = [float(lvl[0]) for lvl in orderbook[:5]]
+    asks = [float(lvl[0]) for lvl in orderbook[:5]]
+    mid_price = (np.mean(bids) + np.mean(asks)) / 2.0
+    X = qty_usd / mid_price
+    t_grid = np.linspace(0, T, N+1)
+    dt = T/N
+
+    def decay_kernel(t, s):
+        return (t - s)**(-gamma) if t > s else 0.0
+
+    v = np.ones(N) * X/(T*N)
+    for _ in range(100):
+        new_v = np.zeros(N)
+        for i in range(N):
+            integral = sum(
+                v[j]**(delta) * decay_kernel(t_grid[i], t_grid[j])
+                for j in range(i+1)
+            )
+            new_v[i] = (lam * sigma**2 / (2 * delta))**(1/(2*delta - 1)) * integral**(-1/(2*delta - 1))
+        total = np.sum(new_v)*dt
+        new_v *= X / total
+        v = 0.5*v + 0.5*new_v
+
+    transient_cost = 0.0
+    permanent_impact = 0.0
+    risk_term = 0.0
+    for i in range(N):
+        transient_cost += v[i]**(1 + delta) * dt**(1 - gamma)
+        permanent_impact += 0.5 * v[i] * np.sum(v[:i+1] * dt * (t_grid[i] - t_grid[:i+1])**(-gamma))
+        risk_term += lam * sigma**2 * (X - np.sum(v[:i]*dt))**2 * dt
+
+    transient_cost *= mid_price * (1 + delta)/(delta + 1)
+    permanent_impact *= mid_price * gamma
+    risk_term *= mid_price
+    return transient_cost + permanent_impact + risk_term, {
+        'transient': transient_cost,
+        'permanent': permanent_impact,
+        'risk': risk_term
+    }
+
+
+def _outcome(fn, **kwargs):
+    try:
+        return fn(**kwargs)
+    except ZeroDivisionError:
+        return ZeroDivisionError
+
+
+def check_parity(N=100):
+    cases = [
+        dict(PARAMS, qty_usd=1e4, sigma=0.5),
+        dict(PARAMS, qty_usd=1e6, sigma=0.2, delta=0.2, gamma=0.3),
+        dict(PARAMS, qty_usd=1e5, sigma=0.5, delta=0.7),
+        dict(PARAMS, qty_usd=1e5, sigma=0.5, delta=0.5),
+    ]
+    with np.errstate(all="ignore"):
+        for case in cases:
+            ref = _outcome(reference_impact, orderbook=BOOK, N=N, **case)
+            new = _outcome(calculate_impact, orderbook=BOOK, N=N, **case)
+            if ref is ZeroDivisionError or new is ZeroDivisionError:
+                assert ref is new, (case, ref, new)
+                print(f"  parity ok  delta={case['delta']}: ZeroDivisionError")
+                continue
+            for key in ('transient', 'permanent', 'risk'):
+                np.testing.assert_allclose(new[1][key], ref[1][key], rtol=1e-9, equal_nan=True)
+            np.testing.assert_allclose(new[0], ref[0], rtol=1e-9, equal_nan=True)
+            print(f"  parity ok  delta={case['delta']}: {new[1]}")
+
+
+def time_call(fn, N, repeat):
+    fn(orderbook=BOOK, qty_usd=1e5, sigma=0.5, N=N, **PARAMS)  # warm-up (kernel cache)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(orderbook=BOOK, qty_usd=1e5, sigma=0.5, N=N, **PARAMS)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    print("Parity against the loop implementation (N=100):")
+    check_parity()
+
+    print("\nPer-call latency:")
+    with np.errstate(all="ignore"):
+        ref_ms = time_call(reference_impact, 100, 1)
+    print(f"  reference  N=100   {ref_ms:10.3f} ms")
+    for N, repeat in [(100, 200), (500, 50), (2000, 10)]:
+        start = time.perf_counter()
+        decay_matrix.cache_clear()
+        decay_matrix(1.0, N, PARAMS['gamma'])
+        build_ms = (time.perf_counter() - start) * 1000
+        ms = time_call(calculate_impact, N, repeat)
+        print(f"  vectorized N={N:<5} {ms:10.3f} ms  (kernel build {build_ms:.1f} ms, once)")
+
+    cache = TrajectoryCache()
+    ms = time_call(cache.calculate_impact, 100, 10000)
+    print(f"  cached     N=100   {ms:10.4f} ms  {cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
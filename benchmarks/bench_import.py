@@ -0,0 +1,66 @@
+"""
+Startup cost: `python -X importtime` breakdown of the entry modules and the
+time to the first usable model, with a cold and a warm coefficient cache.
+
+Run from the repository root:
+    python -m benchmarks.bench_import
+"""
+import os
+import sys
+import shutil
+import tempfile
+import subprocess
+
+MODULES = ["engine", "veloz.session", "websocket_client", "ui"]
+TOP = 8
+
+
+def importtime(module):
+    """(total ms, [(cumulative us, self us, name)]) for a fresh `import module`."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          capture_output=True, text=True, env=dict(os.environ, QT_QPA_PLATFORM="offscreen"))
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|")
+        rows.append((int(cum_us), int(self_us), name.rstrip()))
+    total = next((cum for cum, _, name in rows if name.strip() == module), 0)
+    return total / 1000, rows
+
+
+def first_prediction_ms(cold):
+    """Time to import models.slippage and get the predictor in a fresh process."""
+    src = "models/slippage_model.pkl"
+    tmp = tempfile.mkdtemp()
+    shutil.copy(src, tmp)
+    if not cold and os.path.exists(src + ".coef.json"):
+        shutil.copy(src + ".coef.json", tmp)
+    code = (
+        "import time, warnings; warnings.simplefilter('ignore'); t = time.perf_counter()\n"
+        "from models.linear import LazyPredictor\n"
+        f"LazyPredictor({os.path.join(tmp, os.path.basename(src))!r}).get()\n"
+        "print((time.perf_counter() - t) * 1000)"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    shutil.rmtree(tmp)
+    return float(out.stdout.strip())
+
+
+def main():
+    for module in MODULES:
+        total, rows = importtime(module)
+        print(f"import {module}: {total:.0f} ms")
+        for cum, self_us, name in sorted(rows, reverse=True)[1:TOP + 1]:
+            print(f"  {cum / 1000:8.1f} ms cumulative  {self_us / 1000:7.1f} ms self  {name.strip()}")
+
+    # Warm the coefficient cache for the second measurement
+    from models.linear import load_predictor
+    load_predictor("models/slippage_model.pkl")
+    print("first slippage model load (fresh process)")
+    print(f"  cold cache (joblib + sklearn): {first_prediction_ms(cold=True):8.1f} ms")
+    print(f"  warm cache (coefficients):     {first_prediction_ms(cold=False):8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+sklearn estimators versus the closed-form predictors from models/linear.py,
+per row and batched.
+
+Run from the repository root:
+    python -m benchmarks.bench_inference
+"""
+import warnings
+import joblib
+import numpy as np
+from models.linear import load_predictor
+from benchmarks.common import per_call_us
+
+MODELS = {
+    "slippage": ("models/slippage_model.pkl", [1e-6, 2.4, 5000.0, 1e5]),
+    "maker_taker": ("models/maker_taker_model.pkl", [0.5, 0.01]),
+}
+
+
+def main():
+    warnings.simplefilter("ignore")
+    for name, (path, row) in MODELS.items():
+        model = joblib.load(path)
+        fast = load_predictor(path)
+        if hasattr(model, "predict_proba"):
+            sk_one = lambda: model.predict_proba([row])[0][1]
+            fast_one = lambda: fast.predict_proba_one(*row)
+            sk_batch, fast_batch = model.predict_proba, fast.predict_proba
+        else:
+            sk_one = lambda: model.predict([row])[0]
+            fast_one = lambda: fast.predict_one(*row)
+            sk_batch, fast_batch = model.predict, fast.predict
+
+        print(f"{name}:")
+        print(f"  single row  sklearn {per_call_us(sk_one, 2000):8.2f} us   closed-form {per_call_us(fast_one, 20000):8.3f} us")
+        X = np.tile(row, (10000, 1))
+        sk = per_call_us(lambda: sk_batch(X), 50)
+        cf = per_call_us(lambda: fast_batch(X), 50)
+        print(f"  10k rows    sklearn {sk:8.1f} us   closed-form {cf:8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
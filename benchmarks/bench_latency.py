@@ -0,0 +1,59 @@
+"""
+Cost of recording into the latency histograms and accuracy of their
+percentiles against exact numpy percentiles.
+
+Run from the repository root:
+    python -m benchmarks.bench_latency
+"""
+import numpy as np
+from utils.latency import LatencyHistogram, LatencyTracker
+from benchmarks.common import per_call_us
+
+SAMPLES = 200_000
+
+
+def check_accuracy(samples_ms):
+    hist = LatencyHistogram()
+    for ms in samples_ms:
+        hist.record(ms)
+    exact = np.percentile(samples_ms, [50, 99, 99.9])
+    approx = hist.percentiles()
+    for q, e, a in zip((50, 99, 99.9), exact, approx):
+        err = abs(a - e) / e
+        print(f"  p{q:<5} exact={e:9.4f}ms  hist={a:9.4f}ms  err={err:.2%}")
+        assert err < 0.01, (q, e, a)
+    assert hist.max_ms == samples_ms.max()
+
+
+def main():
+    rng = np.random.default_rng(0)
+    # Heavy-tailed, like real tick latencies
+    samples = rng.lognormal(mean=-1.0, sigma=1.0, size=SAMPLES)
+    print(f"accuracy over {SAMPLES} lognormal samples")
+    check_accuracy(samples)
+
+    values = samples[:1000].tolist()
+    hist = LatencyHistogram()
+    tracker = LatencyTracker()
+    i = [0]
+
+    def record_hist():
+        hist.record(values[i[0] % 1000])
+        i[0] += 1
+
+    def record_tracker():
+        tracker.record('e2e', values[i[0] % 1000])
+        i[0] += 1
+
+    print("per-call cost")
+    print(f"  LatencyHistogram.record   {per_call_us(record_hist, SAMPLES):6.3f} us")
+    print(f"  LatencyTracker.record     {per_call_us(record_tracker, SAMPLES):6.3f} us")
+    print(f"  summary('1m'), 5 stages   {per_call_us(lambda: tracker.summary('1m'), 20):8.1f} us")
+    print(f"  summary('session')        {per_call_us(lambda: tracker.summary('session'), 20):8.1f} us")
+
+    samples_list = samples.tolist()
+    print(f"  sorted() p99 of 100 items {per_call_us(lambda: sorted(samples_list[:100])[99], 2000):6.3f} us")
+
+
+if __name__ == "__main__":
+    main()
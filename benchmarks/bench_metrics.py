@@ -0,0 +1,88 @@
+"""
+Per-tick cost of the old logger.info f-string line vs MetricsSink.record,
+plus a round trip through the binary file.
+
+Run from the repository root:
+    python -m benchmarks.bench_metrics
+"""
+import os
+import time
+import logging
+import tempfile
+import numpy as np
+from utils.metrics import MetricsSink, read_metrics, summarize
+from utils.replay import latency_summary
+
+TICKS = 100_000
+
+
+def _row(i):
+    return (1.7e12 + i, 1.7e9 + i / 1000, 12.5, 0.03, 0.08, 0.11, 0.25)
+
+
+def time_calls(fn, n):
+    samples = np.empty(n)
+    for i in range(n):
+        t0 = time.perf_counter()
+        fn(i)
+        samples[i] = time.perf_counter() - t0
+    return latency_summary(samples), samples.sum()
+
+
+def main():
+    tmp = tempfile.mkdtemp()
+
+    logger = logging.getLogger("bench_metrics")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    handler = logging.FileHandler(os.path.join(tmp, "latency.log"))
+    handler.setFormatter(logging.Formatter('%(asctime)s %(message)s', '%Y-%m-%d %H:%M:%S'))
+    logger.addHandler(handler)
+
+    def log_tick(i):
+        ts, recv, net, queue, parse, model, e2e = _row(i)
+        logger.info(
+            f"DataProc={parse + model:.2f}ms "
+            f"UIUpdate={0.02:.2f}ms "
+            f"EndToEnd={e2e:.2f}ms "
+            f"Staleness={net:.2f}ms"
+        )
+
+    path = os.path.join(tmp, "tick_metrics.vlm")
+    sink = MetricsSink(path)
+    rows = [_row(i) for i in range(TICKS)]
+
+    def record_tick(i):
+        sink.record(rows[i])
+
+    print(f"{TICKS} ticks, per-call latency")
+    for label, fn in (("logger.info", log_tick), ("MetricsSink", record_tick)):
+        stats, total = time_calls(fn, TICKS)
+        print(f"  {label:<12} mean={total / TICKS * 1e6:6.2f}us  p50={stats['p50_ms'] * 1000:6.2f}us  "
+              f"p99={stats['p99_ms'] * 1000:7.2f}us  max={stats['max_ms'] * 1000:8.1f}us")
+    handler.close()
+    sink.close()
+    # A tight loop outruns the writer thread, which only gets the GIL at switch intervals
+    print(f"  unpaced sink {sink.stats()}")
+
+    # Realistic pacing: bursts of 100 ticks, 10k ticks/s (a new file: sinks append)
+    path = os.path.join(tmp, "paced_metrics.vlm")
+    sink = MetricsSink(path)
+    for i in range(TICKS):
+        sink.record(rows[i])
+        if i % 100 == 99:
+            time.sleep(0.01)
+    sink.close()
+    print(f"  paced sink   {sink.stats()}")
+
+    columns = read_metrics(path)
+    assert len(columns['ts']) == TICKS - sink.dropped
+    print(f"  file size: log={os.path.getsize(os.path.join(tmp, 'latency.log')) / TICKS:.1f} B/tick, "
+          f"metrics={os.path.getsize(path) / TICKS:.1f} B/tick")
+    publish = summarize(columns)['publish_ms']
+    print(f"  publish_ms from file: n={publish['count']} p50={publish['p50_ms']:.3f}ms "
+          f"p99={publish['p99_ms']:.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
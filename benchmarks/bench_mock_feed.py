@@ -0,0 +1,74 @@
+"""
+Drive WebSocketClient against the local mock OKX server (run in a separate
+process) to find the tick rate where processing saturates and to time
+recovery after injected disconnects.
+
+Run from the repository root:
+    python -m benchmarks.bench_mock_feed
+"""
+import io
+import time
+import asyncio
+import logging
+import warnings
+import contextlib
+import multiprocessing as mp
+from utils.mock_okx import MockOkxServer
+
+PORT = 8799
+INST = "BTC-USDT"
+
+
+def _serve(kwargs):
+    async def run():
+        server = await MockOkxServer(port=PORT, **kwargs).start()
+        await asyncio.Event().wait()
+    asyncio.run(run())
+
+
+def run_client(duration, server_kwargs, reconnect_delay=2.0):
+    from websocket_client import WebSocketClient
+    # Keep benchmark runs out of logs/latency_metrics.log
+    for handler in logging.root.handlers[:]:
+        logging.root.removeHandler(handler)
+
+    proc = mp.Process(target=_serve, args=(server_kwargs,), daemon=True)
+    proc.start()
+    time.sleep(1.0)
+    client = WebSocketClient(INST, 1e5, "Tier 1", 0.5, vol_fetcher=lambda inst: 5000.0,
+                             uri=f"ws://127.0.0.1:{PORT}", reconnect_delay=reconnect_delay,
+                             metrics_path=None)
+
+    async def main():
+        asyncio.get_running_loop().call_later(duration, client.stop)
+        await client.session.run()
+
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            asyncio.run(main())
+    finally:
+        proc.terminate()
+        proc.join()
+    return client
+
+
+def main():
+    warnings.simplefilter("ignore")
+    duration = 3.0
+    print("Saturation (depth 400; server and client share the machine):")
+    for rate in (1000, 5000, 20000, 100000):
+        client = run_client(duration, {'rate': rate})
+        q = client.queue.stats()
+        print(f"  offered {rate:>6} msg/s  received {q['enqueued'] / duration:8.0f}/s  "
+              f"priced {client.session.published / duration:6.0f}/s  conflated {q['conflated']:>6}  "
+              f"dropped {q['dropped']:>6}  max queue {q['max_depth']}")
+
+    print("\nRecovery after a disconnect every 2000 messages at 2000 msg/s:")
+    for delay in (2.0, 0.1):
+        client = run_client(6.0, {'rate': 2000, 'disconnect_every': 2000}, reconnect_delay=delay)
+        recovery = client.last_recovery_s * 1000 if client.last_recovery_s is not None else float("nan")
+        print(f"  reconnect_delay={delay:<4} reconnects={client.reconnects}  last recovery {recovery:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
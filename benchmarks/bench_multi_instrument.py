@@ -0,0 +1,86 @@
+"""
+Many instruments over one multiplexed connection versus the previous
+thread-per-asset model (one thread, event loop and socket per instrument),
+against the local mock OKX server.
+
+Run from the repository root:
+    python -m benchmarks.bench_multi_instrument
+"""
+import time
+import asyncio
+import threading
+import warnings
+import multiprocessing as mp
+from benchmarks.bench_mock_feed import _serve, PORT
+
+URI = f"ws://127.0.0.1:{PORT}"
+RATE = 100  # messages/s per instrument
+
+
+def rss_mb():
+    with open("/proc/self/status") as fh:
+        for line in fh:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def _calculators(n):
+    from engine import CostCalculator
+    from utils.volume import VolumeCache
+    vol_cache = VolumeCache(lambda inst: 5000.0)
+    return [CostCalculator(f"SYN{i}-USDT", 1e5 * (i + 1), "Tier 1", 0.5, vol_cache) for i in range(n)]
+
+
+def _measure(model, n, duration, out):
+    warnings.simplefilter("ignore")
+    from engine import ConnectionManager
+    import models.impact, models.slippage, models.maker_taker  # noqa: F401  (loaded before the baseline)
+
+    base = rss_mb()
+    calcs = _calculators(n)
+    priced = [0]
+
+    def count(result):
+        priced[0] += 1
+
+    if model == "multiplexed":
+        managers = [ConnectionManager(calcs, URI, on_result=count)]
+    else:
+        managers = [ConnectionManager([calc], URI, on_result=count) for calc in calcs]
+
+    threads = [threading.Thread(target=asyncio.run, args=(m.run(),), daemon=True) for m in managers]
+    for t in threads:
+        t.start()
+    time.sleep(1.0)
+    start_priced = priced[0]
+    time.sleep(duration)
+    rate = (priced[0] - start_priced) / duration
+    mem = rss_mb() - base
+    for m in managers:
+        m.stop()
+    out.put((rate, mem, threading.active_count()))
+
+
+def main():
+    server = mp.Process(target=_serve, args=({'rate': RATE, 'depth': 400},), daemon=True)
+    server.start()
+    time.sleep(1.0)
+    try:
+        print(f"{RATE} msg/s per instrument, depth 400")
+        for n in (1, 5, 20):
+            for model in ("thread-per-asset", "multiplexed"):
+                out = mp.Queue()
+                proc = mp.Process(target=_measure, args=(model, n, 3.0, out))
+                proc.start()
+                rate, mem, threads = out.get()
+                proc.join(10)
+                print(f"  n={n:<3} {model:<17} priced {rate:7.0f}/s  threads {threads:>3}  "
+                      f"RSS {mem:6.1f} MB ({mem / n:5.2f} MB/instrument)")
+    finally:
+        server.terminate()
+        server.join()
+
+
+if __name__ == "__main__":
+    main()
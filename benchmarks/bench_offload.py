@@ -0,0 +1,132 @@
+"""
+Inline vs process-pool impact evaluation under a paced tick stream.
+
+Every tick carries a fresh delta so each one is an uncached N=500 solve, the
+worst case for the compute stage. For each mode the stream is replayed at
+increasing rates across several instruments; a rate is sustainable when
+the loop keeps up (inline) or fewer than 1% of requests are superseded
+(pooled). Results depend on the core count of the machine.
+
+Run from the repository root:
+    python -m benchmarks.bench_offload
+"""
+import os
+import time
+import asyncio
+import argparse
+import numpy as np
+from models.impact import TrajectoryCache
+from models.offload import ImpactPool
+from utils.orderbook import BookSnapshot
+from utils.replay import latency_summary
+from benchmarks.common import synthetic_levels
+
+AC_PARAMS = {'delta': 0.3, 'gamma': 0.45, 'lam': 1e-6, 'T': 1.0, 'N': 500}
+QTY_USD = 1e5
+
+
+def _book():
+    asks, bids = synthetic_levels()
+    return BookSnapshot.from_levels(asks, bids, ts=0)
+
+
+async def run_inline(rate, duration):
+    cache = TrajectoryCache()
+    book = _book()
+    interval = 1.0 / rate
+    latencies = []
+    start = time.perf_counter()
+    n = 0
+    while time.perf_counter() - start < duration:
+        due = start + n * interval
+        wait = due - time.perf_counter()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        # The trajectory cache is keyed by (delta, gamma, T, N), not sigma
+        params = dict(AC_PARAMS, delta=AC_PARAMS['delta'] + 1e-9 * n)
+        cache.calculate_impact(book, QTY_USD, 0.2, **params)
+        # Latency from when the tick was due, so falling behind shows up
+        latencies.append(time.perf_counter() - due)
+        n += 1
+    elapsed = time.perf_counter() - start
+    return {'sent': n, 'completed': n, 'superseded': 0, 'rate': n / elapsed,
+            'behind': n < 0.99 * rate * duration, **latency_summary(latencies)}
+
+
+async def run_pooled(pool, rate, instruments, duration):
+    book = _book()
+    interval = 1.0 / rate
+    latencies = []
+    pending = []
+    start = time.perf_counter()
+    n = 0
+
+    def done(fut, due):
+        if not fut.cancelled() and fut.result() is not None:
+            latencies.append(time.perf_counter() - due)
+
+    while time.perf_counter() - start < duration:
+        due = start + n * interval
+        wait = due - time.perf_counter()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        params = dict(AC_PARAMS, delta=AC_PARAMS['delta'] + 1e-9 * n)
+        fut = pool.submit(f"INST-{n % instruments}", book, QTY_USD, 0.2, params)
+        fut.add_done_callback(lambda f, due=due: done(f, due))
+        pending.append(fut)
+        n += 1
+    await asyncio.gather(*pending)
+    elapsed = time.perf_counter() - start
+    superseded = sum(1 for fut in pending if fut.result() is None)
+    return {'sent': n, 'completed': len(latencies), 'superseded': superseded,
+            'rate': len(latencies) / elapsed, 'behind': superseded > 0.01 * n,
+            **latency_summary(latencies)}
+
+
+def _print(label, rate, stats):
+    print(f"  {label:<10} offered={rate:>5}/s  done={stats['rate']:7.1f}/s  "
+          f"superseded={stats['superseded']:>5}  p50={stats['p50_ms']:7.2f}ms  "
+          f"p99={stats['p99_ms']:8.2f}ms  {'BEHIND' if stats['behind'] else 'ok'}")
+
+
+async def main(rates, instruments, duration, worker_counts):
+    print(f"cores={os.cpu_count()} instruments={instruments} N={AC_PARAMS['N']} duration={duration}s")
+    sustainable = {}
+
+    print("inline")
+    for rate in rates:
+        stats = await run_inline(rate, duration)
+        _print("inline", rate, stats)
+        if not stats['behind']:
+            sustainable['inline'] = rate
+
+    for workers in worker_counts:
+        label = f"pool x{workers}"
+        print(label)
+        pool = ImpactPool(workers=workers)
+        try:
+            # Spawn and warm up every worker before timing
+            await asyncio.gather(*[pool.submit(f"WARM-{i}", _book(), QTY_USD, 0.2, AC_PARAMS)
+                                   for i in range(workers)])
+            for rate in rates:
+                stats = await run_pooled(pool, rate, instruments, duration)
+                _print(label, rate, stats)
+                if not stats['behind']:
+                    sustainable[label] = rate
+        finally:
+            pool.close()
+
+    print("max sustainable tick rate")
+    for label, rate in sustainable.items():
+        print(f"  {label:<10} {rate}/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rates", type=int, nargs="+", default=[25, 50, 100, 200, 400])
+    parser.add_argument("--instruments", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=2.0)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    args = parser.parse_args()
+    with np.errstate(all="ignore"):
+        asyncio.run(main(args.rates, args.instruments, args.duration, args.workers))
@@ -0,0 +1,70 @@
+"""
+Per-tick cost pipeline: list-of-lists book (previous path) versus a
+BookSnapshot built once and shared by slippage, impact and maker/taker.
+
+Run from the repository root:
+    python -m benchmarks.bench_pipeline
+"""
+import joblib
+import numpy as np
+from models.impact import TrajectoryCache
+from models.maker_taker import predict_maker_taker
+from models.slippage import estimate_slippage
+from utils.fees import calculate_fee
+from utils.orderbook import LocalOrderBook
+from benchmarks.common import per_call_us, synthetic_levels
+
+QTY = 1e5
+VOL24H = 5000.0
+PARAMS = {'delta': 0.3, 'gamma': 0.45, 'lam': 1e-6, 'T': 1.0, 'N': 100}
+
+# The previous path called the sklearn estimators directly
+_slip_model = joblib.load("models/slippage_model.pkl")
+clf = joblib.load("models/maker_taker_model.pkl")
+
+
+def legacy_tick(raw_asks, raw_bids, cache):
+    """Per-tick work as done before BookSnapshot: each model re-floats the levels."""
+    asks = [[float(p[0]), float(p[1])] for p in raw_asks if float(p[0]) > 0 and float(p[1]) >= 0]
+    bids = [[float(p[0]), float(p[1])] for p in raw_bids if float(p[0]) > 0 and float(p[1]) >= 0]
+
+    best_ask, best_bid = float(asks[0][0]), float(bids[0][0])
+    mid = (best_ask + best_bid) / 2
+    depth5 = sum(float(l[1]) for l in asks[:5]) + sum(float(l[1]) for l in bids[:5])
+    slippage = _slip_model.predict([[(best_ask - best_bid) / mid, depth5, VOL24H, QTY]])[0]
+
+    with np.errstate(all="ignore"):
+        impact, _ = cache.calculate_impact(asks, QTY, 0.5, **PARAMS)
+
+    best_bid, best_ask = float(bids[0][0]), float(asks[0][0])
+    depth5 = sum(float(l[1]) for l in bids[:5]) + sum(float(l[1]) for l in asks[:5])
+    rel_aggr = (best_ask - best_bid) / (best_ask - best_bid)
+    clf.predict_proba([[rel_aggr, (QTY / best_ask) / depth5]])
+    return slippage + impact + calculate_fee("Tier 1", QTY)
+
+
+def snapshot_tick(local_book, cache):
+    book = local_book.snapshot()
+    slippage = estimate_slippage(book, QTY, None, VOL24H)
+    with np.errstate(all="ignore"):
+        impact, _ = cache.calculate_impact(book, QTY, 0.5, **PARAMS)
+    predict_maker_taker(book, book.best_ask, "buy", QTY / book.best_ask)
+    return slippage + impact + calculate_fee("Tier 1", QTY)
+
+
+def main():
+    cache = TrajectoryCache()
+    for depth in (5, 50, 400):
+        raw_asks, raw_bids = synthetic_levels(depth)
+        local_book = LocalOrderBook()
+        local_book.apply("snapshot", {"asks": raw_asks, "bids": raw_bids})
+
+        legacy = per_call_us(lambda: legacy_tick(raw_asks, raw_bids, cache), 2000)
+        shared = per_call_us(lambda: snapshot_tick(local_book, cache), 2000)
+        build = per_call_us(local_book.snapshot, 2000)
+        print(f"depth={depth:<4} list path {legacy:8.1f} us/tick   "
+              f"snapshot path {shared:8.1f} us/tick   (snapshot build {build:.1f} us)")
+
+
+if __name__ == "__main__":
+    main()
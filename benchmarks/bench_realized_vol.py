@@ -0,0 +1,111 @@
+"""
+Streaming realized volatility (utils/realized_vol.py): the cost of one
+update on its own and inside CostCalculator.apply on a synthetic feed, the
+estimates on a simulated mid with known volatility, and the trajectory
+cache hit rate, impact cost per tick and pricing error when the estimated
+sigma drives the impact model.
+
+Run from the repository root:
+    python -m benchmarks.bench_realized_vol
+"""
+import math
+import time
+import numpy as np
+from benchmarks.common import per_call_us
+from engine import CostCalculator
+from models.impact import TrajectoryCache, calculate_impact
+from utils.orderbook import BookSnapshot
+from utils.realized_vol import SECONDS_PER_YEAR, RealizedVolatility
+from utils.synthetic import SyntheticBook
+from utils.volume import VolumeCache
+
+TRUE_SIGMA = 0.6
+TICK_MS = 100
+TICKS = 20000
+PARAMS = {'delta': 0.3, 'gamma': 0.45, 'lam': 1e-6, 'T': 1.0, 'N': 100}
+
+
+def gbm_mids(n, sigma=TRUE_SIGMA, tick_ms=TICK_MS, seed=0):
+    """Mid prices every tick_ms with annualized volatility sigma."""
+    rng = np.random.default_rng(seed)
+    step = sigma * math.sqrt(tick_ms / 1000 / SECONDS_PER_YEAR)
+    return 100000.0 * np.exp(np.cumsum(rng.normal(0, step, n))), np.arange(n) * tick_ms
+
+
+def update_cost():
+    mids, ts = gbm_mids(TICKS)
+    mids, ts = mids.tolist(), ts.tolist()
+    print("update() on its own")
+    for method in ("ewma", "window"):
+        est = RealizedVolatility(method)
+        start = time.perf_counter()
+        for t, mid in zip(ts, mids):
+            est.update(t, mid)
+        us = (time.perf_counter() - start) / TICKS * 1e6
+        print(f"  {method:<7} {us:6.3f} us/update")
+
+    print("CostCalculator.apply on 400-level synthetic book updates")
+    feed = SyntheticBook("SYN-USDT", depth=400, seed=1)
+    frames = [feed.snapshot()] + [feed.update() for _ in range(5000)]
+    for label, est in (("static", None), ("ewma", RealizedVolatility("ewma")),
+                       ("window", RealizedVolatility("window"))):
+        calc = CostCalculator("SYN-USDT", 1e5, "Tier 1", 0.5, VolumeCache(lambda inst: 5000.0), realized_vol=est)
+        ticks = [calc.decode(msg) for msg in frames]
+        start = time.perf_counter()
+        for tick in ticks:
+            calc.apply(tick)
+        us = (time.perf_counter() - start) / len(ticks) * 1e6
+        print(f"  {label:<7} {us:6.2f} us/update")
+
+
+def accuracy():
+    mids, ts = gbm_mids(TICKS * 5, seed=1)
+    print(f"estimates on a {TICK_MS} ms mid with sigma={TRUE_SIGMA} ({TICKS * 5} updates)")
+    for method, kwargs in (("ewma", {'halflife': 200}), ("ewma", {'halflife': 2000}),
+                           ("window", {'window': 1000}), ("window", {'window': 10000})):
+        est = RealizedVolatility(method, **kwargs)
+        path = []
+        for t, mid in zip(ts.tolist(), mids.tolist()):
+            path.append(est.update(t, mid))
+        path = np.array([p for p in path if p is not None])
+        (name, value), = kwargs.items()
+        print(f"  {method:<7} {name}={value:<6} final={est.sigma:.4f}  mean={path.mean():.4f}  "
+              f"std={path.std():.4f}")
+
+
+def cache_hit_rate():
+    mids, ts = gbm_mids(TICKS, seed=2)
+    print(f"impact per tick with realized sigma ({TICKS} ticks, window=1000)")
+    est = RealizedVolatility("window", window=1000)
+    cache = TrajectoryCache()
+    sigmas = set()
+    elapsed = 0.0
+    error = 0.0
+    for i, (t, mid) in enumerate(zip(ts.tolist(), mids.tolist())):
+        sigma = est.update(t, mid) or 0.5
+        sigmas.add(sigma)
+        book = BookSnapshot(np.array([mid + 0.1]), np.array([1.0]), np.array([mid - 0.1]), np.array([1.0]), t)
+        start = time.perf_counter()
+        _, terms = cache.calculate_impact(book, 1e5, sigma, **PARAMS)
+        elapsed += time.perf_counter() - start
+        if i % 1000 == 0:
+            # Against the uncached solver at exactly this sigma (finite terms only)
+            _, exact = calculate_impact(book, 1e5, sigma, **PARAMS)
+            for name, value in exact.items():
+                if np.isfinite(value):
+                    error = max(error, abs(terms[name] - value) / abs(value))
+    s = cache.stats()
+    print(f"  streamed sigma  distinct sigmas={len(sigmas):6d}  hit_rate={s['hit_rate']:6.1%}  "
+          f"impact {elapsed / TICKS * 1e6:6.1f} us/tick  max rel. error vs uncached solve={error:.1e}")
+    cache = TrajectoryCache()
+    print(f"  static sigma    impact {per_call_us(lambda: cache.calculate_impact(book, 1e5, 0.5, **PARAMS), 2000):6.1f} us/tick")
+
+
+def main():
+    update_cost()
+    accuracy()
+    cache_hit_rate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Deterministic, offline throughput benchmark: replays a feed recording
+through the same CostCalculator the live client uses.
+
+Run from the repository root:
+    python -m benchmarks.bench_replay                       # synthetic recording
+    python -m benchmarks.bench_replay feed.bin --speed 10   # a real recording at 10x
+"""
+import os
+import argparse
+import tempfile
+import warnings
+from engine import CostCalculator
+from utils.replay import FrameRecorder, replay
+from utils.synthetic import SyntheticBook
+from utils.volume import VolumeCache
+
+
+def make_recording(path, inst_id, n_updates, depth, rate=100.0):
+    feed = SyntheticBook(inst_id, depth=depth)
+    with FrameRecorder(path) as rec:
+        for i, msg in enumerate(feed.messages(n_updates)):
+            rec.write(msg, recv_time=i / rate)
+
+
+def run(path, inst_id, speed):
+    vol_cache = VolumeCache(fetcher=None)
+    vol_cache.set(inst_id, 5000.0)
+    calc = CostCalculator(inst_id, 1e5, "Tier 1", 0.5, vol_cache)
+    return replay(path, calc.process, speed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("recording", nargs="?", help="file written by FrameRecorder")
+    parser.add_argument("--inst", default="BTC-USDT")
+    parser.add_argument("--speed", type=float, default=None, help="N x recorded pace (default: as fast as possible)")
+    parser.add_argument("--updates", type=int, default=5000)
+    parser.add_argument("--depth", type=int, default=400)
+    args = parser.parse_args()
+    warnings.simplefilter("ignore")
+
+    path = args.recording
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(), "synthetic_books.bin")
+        make_recording(path, args.inst, args.updates, args.depth)
+
+    stats = run(path, args.inst, args.speed)
+    print(f"frames={stats['frames']} ticks={stats['ticks']} errors={stats['errors']} "
+          f"elapsed={stats['elapsed_s']:.2f}s  {stats['ticks_per_sec']:.0f} ticks/s")
+    print(f"processing p50={stats['p50_ms']:.3f}ms p99={stats['p99_ms']:.3f}ms "
+          f"p999={stats['p999_ms']:.3f}ms max={stats['max_ms']:.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
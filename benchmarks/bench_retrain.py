@@ -0,0 +1,116 @@
+"""
+Online retraining: vectorized features + closed-form/IRLS fits against the
+offline scripts' pandas row-wise features + sklearn, the cost of a swap, and
+the latency of live predictions while a background retrain is running.
+
+Run from the repository root:
+    python -m benchmarks.bench_retrain
+"""
+import time
+import threading
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression, LogisticRegression
+from models import maker_taker, slippage
+from models.linear import LazyPredictor
+from models.online import OnlineTrainer, maker_taker_xy, slippage_xy
+
+PREDICTIONS = 20000
+
+
+def synthetic_fills(n, seed=0):
+    rng = np.random.default_rng(seed)
+    mid = 100000 * (1 + np.cumsum(rng.normal(0, 1e-5, n)))
+    spread = rng.uniform(0.1, 2.0, n)
+    bid, ask = mid - spread / 2, mid + spread / 2
+    bid_depth5, ask_depth5 = rng.uniform(1, 20, n), rng.uniform(1, 20, n)
+    side = np.where(rng.random(n) < 0.5, 1, -1)
+    sz = rng.exponential(0.5, n)
+    # Takers cross the spread and trade bigger relative to depth
+    taker = rng.random(n) < 1 / (1 + np.exp(-(2 * sz / (bid_depth5 + ask_depth5) * 20 - 1)))
+    px = np.where(taker, np.where(side > 0, ask, bid), np.where(side > 0, bid, ask))
+    px = px + side * rng.exponential(0.2, n) * sz
+    return {'ts': np.arange(n) + 1_700_000_000_000, 'px': px, 'sz': sz, 'side': side,
+            'best_bid': bid, 'best_ask': ask, 'bid_depth5': bid_depth5, 'ask_depth5': ask_depth5,
+            'vol24h': rng.uniform(4000, 6000, n), 'is_taker': taker.astype(float)}
+
+
+def offline_fit(cols):
+    """train_slippage_model / train_maker_taker as scripts: DataFrame, df.apply, sklearn."""
+    df = pd.DataFrame({
+        'exec_price': cols['px'], 'mid_price_at_submit': (cols['best_bid'] + cols['best_ask']) / 2,
+        'trade_price': cols['px'], 'trade_size': cols['sz'], 'side': np.where(cols['side'] > 0, "buy", "sell"),
+        'best_bid': cols['best_bid'], 'best_ask': cols['best_ask'], 'bid_depth5': cols['bid_depth5'],
+        'ask_depth5': cols['ask_depth5'], 'vol24h': cols['vol24h'], 'is_taker': cols['is_taker']})
+    df["slippage"] = (df["exec_price"] - df["mid_price_at_submit"]) / df["mid_price_at_submit"]
+    df["spread_rel"] = (df["best_ask"] - df["best_bid"]) / df["mid_price_at_submit"]
+    df["depth5"] = df["bid_depth5"] + df["ask_depth5"]
+    df["order_size"] = df["trade_size"] * df["mid_price_at_submit"]
+    LinearRegression().fit(df[["spread_rel", "depth5", "vol24h", "order_size"]], df["slippage"])
+
+    df["spread"] = df["best_ask"] - df["best_bid"]
+    df["aggr"] = df.apply(lambda row: row["trade_price"] - row["best_bid"] if row["side"] == "buy"
+                          else row["best_ask"] - row["trade_price"], axis=1)
+    df["rel_aggr"] = df["aggr"] / df["spread"].replace(0, 1e-9)
+    df["size_depth_ratio"] = df["trade_size"] / df["depth5"].replace(0, 1e-9)
+    LogisticRegression(max_iter=1000).fit(df[["rel_aggr", "size_depth_ratio"]], df["is_taker"])
+
+
+def live_predictions(model, stop, latencies):
+    """Stand-in for the feed: predict_one in a loop, timing every call."""
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        model.get().predict_proba_one(0.5, 0.02)
+        latencies.append(time.perf_counter() - t0)
+        time.sleep(0)
+
+
+def main():
+    slip_live = LazyPredictor(slippage.model_path)
+    mt_live = LazyPredictor(maker_taker.model_path)
+    slip_live.get(), mt_live.get()
+
+    print("fit on a window of fills (80% train, 20% holdout)")
+    for n in (10_000, 50_000):
+        cols = synthetic_fills(n)
+        trainer = OnlineTrainer(slip_live, mt_live, capacity=n, retrain_every=n + 1)
+        trainer.add_fills(cols)
+        start = time.perf_counter()
+        reports = trainer.retrain()
+        total = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        slippage_xy(cols), maker_taker_xy(cols)
+        features = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        offline_fit(cols)
+        offline = (time.perf_counter() - start) * 1000
+        print(f"  {n:>6} fills  retrain {total:7.1f} ms (features {features:5.1f} ms)   "
+              f"offline pandas+sklearn {offline:8.1f} ms")
+        for name, r in reports.items():
+            print(f"    {name:<12} fit={r['fit_ms']:6.2f} ms  holdout live={r['score_live']:.4g} "
+                  f"new={r['score_new']:.4g}  accepted={r['accepted']}  swap={r.get('swap_us', 0):.1f} us")
+
+    # Prediction latency with and without a retrain running in the background
+    cols = synthetic_fills(50_000, seed=1)
+    for label, retrain in (("idle", False), ("retraining", True)):
+        trainer = OnlineTrainer(slip_live, mt_live, capacity=50_000, retrain_every=10_000)
+        stop, latencies = threading.Event(), []
+        feed = threading.Thread(target=live_predictions, args=(mt_live, stop, latencies))
+        feed.start()
+        time.sleep(0.05)
+        if retrain:
+            for i in range(0, 50_000, 10_000):
+                trainer.add_fills({k: v[i:i + 10_000] for k, v in cols.items()})
+                trainer.wait()
+        else:
+            time.sleep(0.3)
+        stop.set()
+        feed.join()
+        us = np.array(latencies) * 1e6
+        print(f"  predict_one while {label:<10} n={len(us):6d}  p50={np.percentile(us, 50):5.2f} us  "
+              f"p99={np.percentile(us, 99):6.2f} us  max={us.max():8.1f} us  retrains={trainer.retrains} "
+              f"swaps={mt_live.swaps}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Per-tick cost of the Monte Carlo shortfall distribution (models/shortfall.py)
+at N = 100 intervals: the batched scenario product against a per-path Python
+loop, the one-off scenario draw, and the simulated moments and tails checked
+against the closed form for Gaussian shocks.
+
+Run from the repository root:
+    python -m benchmarks.bench_shortfall
+"""
+import time
+import numpy as np
+from benchmarks.common import per_call_us
+from models.impact import TrajectoryCache
+from models.shortfall import ShortfallSimulator, optimal_schedule
+
+MID = 100000.0
+QTY_USD = 1_000_000.0
+SIGMA = 0.02
+EXPECTED = 25.0
+PARAMS = {'delta': 0.3, 'gamma': 0.45, 'lam': 1e-6, 'T': 1.0, 'N': 100}
+BUDGET_MS = 5.0
+
+
+def loop_shortfall(traded, mid, sigma, expected, paths, rng, T=1.0):
+    """One path at a time: walk the price and charge each interval's fill."""
+    N = len(traded)
+    step = sigma * mid * np.sqrt(T / N)
+    out = np.empty(paths)
+    for p in range(paths):
+        price, cost = mid, expected
+        for k in range(N):
+            cost += traded[k] * (price - mid)
+            price += step * rng.standard_normal()
+        out[p] = cost
+    return out
+
+
+def main():
+    cache = TrajectoryCache()
+    X = QTY_USD / MID
+    schedules = {
+        'optimal (delta=0.3)': optimal_schedule(cache, X, PARAMS['delta'], PARAMS['gamma'], N=PARAMS['N']),
+        'TWAP (delta=0.5)': optimal_schedule(cache, X, 0.5, PARAMS['gamma'], N=PARAMS['N']),
+    }
+
+    print(f"{X:.0f} BTC at {MID:.0f}, sigma={SIGMA}, N={PARAMS['N']}")
+    for paths in (1_000, 10_000, 100_000):
+        sim = ShortfallSimulator(paths, seed=0)
+        start = time.perf_counter()
+        sim.shocks(PARAMS['N'])
+        draw_ms = (time.perf_counter() - start) * 1000
+        traded = schedules['optimal (delta=0.3)']
+        tick_ms = per_call_us(lambda: sim.simulate(traded, MID, SIGMA, EXPECTED), 50) / 1000
+        flag = "" if paths != 10_000 else f"  (budget {BUDGET_MS:.0f} ms: {'ok' if tick_ms < BUDGET_MS else 'OVER'})"
+        print(f"  {paths:>7} paths  per tick {tick_ms:7.3f} ms   scenario draw {draw_ms:7.1f} ms{flag}")
+
+    rng = np.random.default_rng(0)
+    traded = schedules['optimal (delta=0.3)']
+    start = time.perf_counter()
+    loop_shortfall(traded, MID, SIGMA, EXPECTED, 1_000, rng)
+    loop_ms = (time.perf_counter() - start) * 1000 * 10
+    print(f"  per-path Python loop, 10000 paths (from 1000)   {loop_ms:9.1f} ms")
+
+    print("simulated vs closed form (Gaussian shocks, 100000 paths)")
+    sim = ShortfallSimulator(100_000, seed=1)
+    for name, traded in schedules.items():
+        r = sim.simulate(traded, MID, SIGMA, EXPECTED)
+        remaining = traded.sum() - np.cumsum(traded)
+        std = SIGMA * MID * np.sqrt(PARAMS['T'] / PARAMS['N']) * np.sqrt((remaining ** 2).sum())
+        print(f"  {name:<20} mean={r['mean']:9.1f} ({EXPECTED:.1f})  std={r['std']:8.1f} ({std:.1f})  "
+              f"p95={r['p95']:8.1f} ({EXPECTED + 1.6449 * std:.1f})  p99={r['p99']:8.1f} ({EXPECTED + 2.3263 * std:.1f})")
+
+    print("fat tails (Student-t, df=4, unit variance), 100000 paths")
+    sim = ShortfallSimulator(100_000, dist="t", df=4, seed=1)
+    r = sim.simulate(schedules['TWAP (delta=0.5)'], MID, SIGMA, EXPECTED)
+    print(f"  TWAP (delta=0.5)     mean={r['mean']:9.1f}  std={r['std']:8.1f}  p95={r['p95']:8.1f}  p99={r['p99']:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
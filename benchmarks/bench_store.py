@@ -0,0 +1,93 @@
+"""
+Columnar store against CSV: the same 2M trades (4 instruments x 5 days)
+loaded whole with pandas.read_csv versus memory-mapped reads of the
+MarketStore, full and with a time range plus column projection.
+
+Run from the repository root:
+    python -m benchmarks.bench_store
+"""
+import os
+import time
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from utils.store import DAY_MS, MarketStore, slippage_history
+
+INSTRUMENTS = [f"SYN{i}-USDT" for i in range(4)]
+DAYS = 5
+ROWS_PER_DAY = 100_000
+START = 1_700_000_000_000 // DAY_MS * DAY_MS
+
+
+def synthetic_trades(inst_index, day, rng):
+    n = ROWS_PER_DAY
+    ts = START + day * DAY_MS + np.sort(rng.integers(0, DAY_MS, n))
+    mid = 100.0 * (inst_index + 1) * (1 + np.cumsum(rng.normal(0, 1e-5, n)))
+    half = mid * 5e-5
+    side = np.where(rng.random(n) < 0.5, 1, -1).astype(np.int8)
+    return {
+        'ts': ts,
+        'px': mid + side * half * rng.uniform(1, 3, n),
+        'sz': rng.exponential(0.5, n),
+        'side': side,
+        'best_bid': mid - half,
+        'best_ask': mid + half,
+        'bid_depth5': rng.uniform(5, 50, n),
+        'ask_depth5': rng.uniform(5, 50, n),
+        'vol24h': np.full(n, 5000.0 * (inst_index + 1)),
+        'is_taker': np.ones(n, dtype=np.int8)
+    }
+
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, out
+
+
+def main():
+    tmp = tempfile.mkdtemp()
+    try:
+        store = MarketStore(os.path.join(tmp, "store"))
+        csv_path = os.path.join(tmp, "slippage_history.csv")
+        rng = np.random.default_rng(0)
+        frames = []
+        start = time.perf_counter()
+        for i, inst in enumerate(INSTRUMENTS):
+            with store.writer("trades", inst, chunk_rows=ROWS_PER_DAY) as writer:
+                for day in range(DAYS):
+                    cols = synthetic_trades(i, day, rng)
+                    writer.extend(cols)
+                    frames.append(pd.DataFrame(slippage_history(cols)))
+        write_s = time.perf_counter() - start
+        pd.concat(frames).to_csv(csv_path, index=False)
+        rows = len(INSTRUMENTS) * DAYS * ROWS_PER_DAY
+
+        store_mb = sum(os.path.getsize(os.path.join(d, f)) for d, _, fs in os.walk(store.root) for f in fs) / 1e6
+        print(f"{rows} trades: csv {os.path.getsize(csv_path) / 1e6:.0f} MB, store {store_mb:.0f} MB "
+              f"(written in {write_s:.1f}s)")
+
+        csv_ms, df = timed(lambda: pd.read_csv(csv_path), repeat=1)
+        print(f"  pandas.read_csv, all rows                     {csv_ms:9.1f} ms")
+        ms, cols = timed(lambda: store.read("trades"))
+        print(f"  store.read, all rows and columns              {ms:9.1f} ms  ({len(cols['ts'])} rows)")
+        ms, cols = timed(lambda: pd.DataFrame(slippage_history(store.read("trades"))))
+        print(f"  store -> slippage_history DataFrame           {ms:9.1f} ms  ({len(cols)} rows)")
+
+        one_hour = (START + 2 * DAY_MS + 12 * 3600_000, START + 2 * DAY_MS + 13 * 3600_000)
+        ms, cols = timed(lambda: store.read("trades", INSTRUMENTS[0], *one_hour, columns=["ts", "px", "sz"]), 20)
+        print(f"  one instrument, one hour, 3 columns           {ms:9.2f} ms  ({len(cols['ts'])} rows)")
+        ms, chunks = timed(lambda: list(store.scan("trades", columns=["px", "vol24h"])), 20)
+        print(f"  scan all parts, 2 columns (mmap views)        {ms:9.2f} ms  ({len(chunks)} parts)")
+        ms, _ = timed(lambda: sum(float(chunk['px'].sum()) for chunk in store.scan("trades", columns=["px"])), 5)
+        print(f"  scan + reduce px over every row               {ms:9.1f} ms")
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Cost curves over many order sizes: one evaluate() per size versus a single
+evaluate_curve() pass on a 400-level book.
+
+Run from the repository root:
+    python -m benchmarks.bench_sweep
+"""
+import numpy as np
+from engine import CostCalculator
+from utils.orderbook import LocalOrderBook
+from utils.volume import VolumeCache
+from benchmarks.common import per_call_us, synthetic_levels
+
+VOL24H = 5000.0
+PARAMS = {'delta': 0.3, 'gamma': 0.45, 'lam': 1e-6, 'T': 1.0, 'N': 100}
+
+
+def _calculator():
+    calc = CostCalculator("SYN-USDT", 1e5, "Tier 1", 0.5, VolumeCache(lambda inst: VOL24H), dict(PARAMS))
+    calc.vol_cache.set(calc.asset, VOL24H)
+    asks, bids = synthetic_levels(400)
+    calc.book = LocalOrderBook(calc.asset)
+    calc.book.apply("snapshot", {"asks": asks, "bids": bids, "ts": "0"})
+    return calc
+
+
+def per_size_loop(calc, book, sizes):
+    net = np.empty(len(sizes))
+    for i, qty in enumerate(sizes):
+        calc.qty_usd = qty
+        net[i] = calc.evaluate(book)['net_cost']
+    return net
+
+
+def check_parity(calc, book):
+    sizes = np.geomspace(1e3, 1e7, 50)
+    curve = calc.evaluate_curve(sizes, book)
+    for i, qty in enumerate(sizes):
+        calc.qty_usd = qty
+        result = calc.evaluate(book)
+        for key in ('slippage', 'fee', 'impact', 'net_cost'):
+            assert np.isclose(curve[key][i], result[key], rtol=1e-12, equal_nan=True), (key, qty)
+        for key in ('transient', 'permanent', 'risk'):
+            assert np.isclose(curve[key][i], result['impact_breakdown'][key], rtol=1e-12, equal_nan=True)
+    print("  parity ok: evaluate_curve matches evaluate() for 50 sizes")
+
+
+def main():
+    calc = _calculator()
+    book = calc.book.snapshot()
+    with np.errstate(all="ignore"):
+        check_parity(calc, book)
+        for n in (1, 50, 500):
+            sizes = np.geomspace(1e3, 1e7, n)
+            loop = per_call_us(lambda: per_size_loop(calc, book, sizes), 200 if n < 500 else 20)
+            curve = per_call_us(lambda: calc.evaluate_curve(sizes, book), 2000)
+            print(f"  sizes={n:<4} per-size loop {loop:9.1f} us/tick   curve {curve:7.1f} us/tick   "
+                  f"({n / curve * 1e6:10.0f} sizes/s, x{loop / curve:.0f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+import time
+import random
+
+
+def synthetic_levels(depth=400, mid=100.0, tick=0.01, seed=0):
+    """Best-first OKX-style (string) ask and bid levels around mid."""
+    rng = random.Random(seed)
+    asks = [[f"{mid + tick*(i+1):.2f}", f"{rng.uniform(0.01, 5):.5f}", "0", "1"] for i in range(depth)]
+    bids = [[f"{mid - tick*(i+1):.2f}", f"{rng.uniform(0.01, 5):.5f}", "0", "1"] for i in range(depth)]
+    return asks, bids
+
+
+def per_call_us(fn, repeat):
+    """Mean wall time of fn() in microseconds, after one warm-up call."""
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
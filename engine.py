@@ -0,0 +1,448 @@
+import json
+import time
+import asyncio
+import websockets
+import numpy as np
+from models.book_walk import BookWalker
+from models.impact import TrajectoryCache
+from models.shortfall import optimal_schedule
+from models import maker_taker, slippage
+from models.slippage import estimate_slippage, estimate_slippage_curve
+from models.maker_taker import predict_maker_taker
+from utils.fees import calculate_fee
+from utils.decode import get_decoder, peek_arg
+from utils.latency import measure_latency
+from utils.orderbook import LocalOrderBook
+from utils.tick_queue import TickQueue
+from utils.volume import VolumeCache, fetch_vol24h
+
+OKX_PUBLIC_WS = "wss://ws.okx.com:8443/ws/v5/public"
+
+
+class OutOfSync(Exception):
+    """The local order book lost sync with the feed and needs a fresh snapshot."""
+
+
+class CostCalculator:
+    """
+    Per-instrument cost pipeline: merges raw OKX `books` messages into a local
+    order book and evaluates slippage, fee, impact and maker/taker on every
+    update. Free of Qt and networking so the live client, replay and
+    benchmarks all run the same code.
+    """
+
+    def __init__(self, asset, qty_usd, fee_tier, volatility, vol_cache=None, ac_params=None, decoder="auto",
+                 book_depth=None, shortfall=None, realized_vol=None):
+        self.asset = asset
+        self.qty_usd = float(qty_usd)
+        self.fee_tier = fee_tier
+        self.volatility = float(volatility)
+        # Optional RealizedVolatility: once warmed up, its sigma replaces `volatility` on every book update
+        self.realized_vol = realized_vol
+        self.ac_params = ac_params or {
+            'delta': 0.5,    # Gatheral: impact exponent
+            'gamma': 0.45,   # Gatheral: decay exponent
+            'lam': 1e-6,     # risk aversion
+            'T': 1.0,        # trading horizon
+            'N': 100         # intervals
+        }
+        # Trajectory only depends on delta, gamma, T and N, so it is solved once per session
+        self.impact_cache = TrajectoryCache()
+        # Optional ShortfallSimulator: cost distribution along the same trajectory
+        self.shortfall = shortfall
+        # 24h volume is refreshed in the background instead of per tick
+        self.vol_cache = vol_cache or VolumeCache(fetch_vol24h)
+        self.book = LocalOrderBook(asset)
+        # Levels per side handed to the models (None: the whole book); fills cannot walk past them
+        self.book_depth = book_depth
+        self.decode = get_decoder(decoder)
+        self._book_data = {}
+        # Models load in the background while the connection is being set up
+        slippage.preload()
+        maker_taker.preload()
+
+    def process(self, msg):
+        """
+        Apply one raw message and return the tick's costs as a dict, or None
+        when the message carries no usable book (e.g. a trades frame or
+        another instrument's). Raises OutOfSync when the book has to be
+        resubscribed.
+        """
+        # Frames for other channels or instruments are skipped before the payload is decoded
+        peeked = peek_arg(msg)
+        if peeked is not None and (peeked[0] != 'books' or peeked[1] != self.asset):
+            return None
+        if not self.apply(self.decode(msg)):
+            return None
+        return self.evaluate()
+
+    def apply(self, tick):
+        """
+        Merge one decoded `books` message into the local book; True if the
+        book is usable. Other channels and frames without an explicit
+        snapshot/update action are ignored.
+        """
+        if 'data' not in tick or not tick['data'] or 'action' not in tick:
+            return False
+        if tick.get('arg', {}).get('channel', 'books') != 'books':
+            return False
+        book_data = tick['data'][0]
+
+        # Merge the snapshot/update into the local order book
+        resyncs = self.book.resyncs
+        if not self.book.apply(tick['action'], book_data):
+            if self.book.resyncs != resyncs:
+                raise OutOfSync(self.asset)
+            return False
+        self._book_data = book_data
+        if not self.book.asks() or not self.book.bids():
+            return False
+        if self.realized_vol is not None:
+            sigma = self.realized_vol.update(self.book.ts, self.book.mid())
+            if sigma is not None:
+                self.volatility = sigma
+        return True
+
+    def snapshot(self):
+        """BookSnapshot of the current book, limited to book_depth levels per side."""
+        return self.book.snapshot(self.book_depth)
+
+    def evaluate(self, book=None, impact=None):
+        """
+        Run the cost models on a BookSnapshot (the current book by default);
+        None if it cannot be priced yet. `impact` is a precomputed
+        (value, breakdown) pair, e.g. from an ImpactPool.
+        """
+        book_data = self._book_data
+
+        # Order book snapshot shared by all cost models
+        if book is None:
+            book = self.snapshot()
+        if book.mid <= 0:
+            return None
+        vol24h, vol_age = self.vol_cache.get(self.asset)
+        if vol24h is None:
+            return None
+
+        # Cost calculations which will be used to calculate the net cost
+        slippage = estimate_slippage(book, self.qty_usd, self.asset, vol24h)
+        # Exact fill of a market buy against the book, next to the regression estimate
+        book_fill = BookWalker(book).walk(self.qty_usd, "buy")
+        fee = calculate_fee(self.fee_tier, self.qty_usd)
+
+        if impact is not None:
+            impact_value, impact_breakdown = impact
+        else:
+            try:
+                impact_value, impact_breakdown = self.impact_cache.calculate_impact(
+                    orderbook=book,
+                    qty_usd=self.qty_usd,
+                    sigma=self.volatility,
+                    **self.ac_params
+                )
+            except ZeroDivisionError:
+                impact_value = 0.0
+                impact_breakdown = {'transient': 0, 'permanent': 0, 'risk': 0}
+
+        trade_price = float(book_data.get('lastPx', book.best_ask))
+        trade_side = 'buy' if book_data.get('side') == 'bid' else 'sell'
+        trade_size = float(book_data.get('sz', self.qty_usd / trade_price)) if trade_price else 0.0
+        is_taker = predict_maker_taker(book, trade_price, trade_side, trade_size)
+
+        result = {
+            'asset': self.asset,
+            'ts': book.ts,
+            'slippage': slippage,
+            'slippage_book': book_fill['slippage'],
+            'book_levels': book_fill['levels'],
+            'fee': fee,
+            'impact': impact_value,
+            'impact_breakdown': impact_breakdown,
+            'sigma': self.volatility,
+            'net_cost': slippage + impact_value + fee,
+            'maker_taker': "Taker" if is_taker else "Maker",
+            'vol24h_age': vol_age
+        }
+        if self.shortfall is not None:
+            # The simulated price paths replace the risk penalty around the expected impact
+            result['shortfall'] = self.shortfall_distribution(book, impact_value - impact_breakdown['risk'])
+        return result
+
+    def shortfall_distribution(self, book, expected):
+        """Monte Carlo shortfall of qty_usd along the optimal schedule, around the expected impact."""
+        X = self.qty_usd / book.mid
+        p = self.ac_params
+        traded = optimal_schedule(self.impact_cache, X, p['delta'], p['gamma'], p['T'], p['N'])
+        return self.shortfall.simulate(traded, book.mid, self.volatility, expected, self.ac_params['T'])
+
+    def evaluate_curve(self, sizes, book=None):
+        """
+        Cost curve over an array of USD order sizes on one BookSnapshot (the
+        current book by default), sharing the book features and the impact
+        trajectory across sizes. Returns a dict of arrays aligned with
+        `sizes`, or None if the book cannot be priced yet.
+        """
+        if book is None:
+            book = self.snapshot()
+        if book.mid <= 0:
+            return None
+        vol24h, vol_age = self.vol_cache.get(self.asset)
+        if vol24h is None:
+            return None
+
+        sizes = np.asarray(sizes, dtype=float)
+        slippage = estimate_slippage_curve(book, sizes, self.asset, vol24h)
+        book_fill = BookWalker(book).walk_many(sizes, "buy")
+        fee = calculate_fee(self.fee_tier, sizes)
+        try:
+            impact, breakdown = self.impact_cache.impact_curve(
+                book, sizes, sigma=self.volatility, **self.ac_params
+            )
+        except ZeroDivisionError:
+            impact = np.zeros_like(sizes)
+            breakdown = {'transient': impact, 'permanent': impact, 'risk': impact}
+
+        return {
+            'asset': self.asset,
+            'ts': book.ts,
+            'sizes': sizes,
+            'slippage': slippage,
+            'slippage_book': book_fill['slippage'],
+            'book_levels': book_fill['levels'],
+            'fee': fee,
+            'impact': impact,
+            'transient': breakdown['transient'],
+            'permanent': breakdown['permanent'],
+            'risk': breakdown['risk'],
+            'net_cost': slippage + impact + fee,
+            'vol24h_age': vol_age
+        }
+
+    def subscribe_args(self, trades=False):
+        args = [{"channel": "books", "instId": self.asset}]
+        if trades:
+            args.append({"channel": "trades", "instId": self.asset})
+        return args
+
+
+class ConnectionManager:
+    """
+    One WebSocket connection serving any number of CostCalculators.
+
+    Subscriptions are sent in batches, frames are demultiplexed on
+    arg.instId, and a receive task feeds a compute stage through a bounded
+    TickQueue: every delta is applied to its instrument's book, but each
+    instrument is priced once per batch, on its latest book. Results go to
+    on_result(result); connection events go to on_status(kind, detail) with
+    kind in 'connected', 'disconnected', 'resync', 'error', 'recovered'.
+
+    With an ImpactPool, impact is solved in worker processes and the result
+    is emitted when it completes; a newer book supersedes a waiting request.
+    With trades=True the `trades` channel is subscribed as well; trade frames
+    are recorded (for backtests) and passed to on_trades(calc, trades) with
+    the instrument's book as of that frame, but not priced. Frames are decoded with
+    `decoder` (see utils.decode).
+    """
+
+    def __init__(self, calculators, uri=OKX_PUBLIC_WS, on_result=None, on_status=None,
+                 reconnect_delay=2.0, queue_size=1000, recorder=None, subscribe_batch=50,
+                 impact_pool=None, trades=False, decoder="auto", on_trades=None):
+        self.calculators = {calc.asset: calc for calc in calculators}
+        self.uri = uri
+        self.on_result = on_result or (lambda result: None)
+        self.on_status = on_status or (lambda kind, detail: None)
+        self.reconnect_delay = reconnect_delay
+        self.queue_size = queue_size
+        self.recorder = recorder
+        self.subscribe_batch = subscribe_batch
+        self.impact_pool = impact_pool
+        self.trades = trades
+        self.on_trades = on_trades
+        self.decode = get_decoder(decoder)
+        self.queue = None
+        self.connected = False
+        self._running = True
+
+        # Reconnect tracking: time from losing the feed to the next processed tick
+        self.reconnects = 0
+        self.last_recovery_s = None
+        self._disconnected_at = None
+
+    def stop(self):
+        self._running = False
+
+    def subscribe_messages(self, assets=None, op="subscribe"):
+        args = []
+        for asset in assets or self.calculators:
+            args.extend(self.calculators[asset].subscribe_args(self.trades))
+        return [{"op": op, "args": args[i:i + self.subscribe_batch]}
+                for i in range(0, len(args), self.subscribe_batch)]
+
+    async def run(self):
+        """Connect, stream and reconnect until stop() is called."""
+        vol_assets = {}
+        for calc in self.calculators.values():
+            vol_assets.setdefault(calc.vol_cache, []).append(calc.asset)
+        refreshers = [asyncio.create_task(cache.run(assets, on_error=self._vol24h_error))
+                      for cache, assets in vol_assets.items()]
+        try:
+            while self._running:
+                try:
+                    async with websockets.connect(self.uri, ping_interval=25, max_size=None) as ws:
+                        if not self.connected:
+                            self.connected = True
+                            self.on_status('connected', self.uri)
+                        for calc in self.calculators.values():
+                            calc.book.reset()
+                        for msg in self.subscribe_messages():
+                            await ws.send(json.dumps(msg))
+
+                        # Receiving and pricing run as separate tasks joined by a bounded queue
+                        self.queue = TickQueue(self.queue_size)
+                        receiver = asyncio.create_task(self._receive(ws, self.queue))
+                        try:
+                            await self._compute(ws, self.queue)
+                        finally:
+                            receiver.cancel()
+
+                except Exception as e:
+                    self.connected = False
+                    self.reconnects += 1
+                    if self._disconnected_at is None:
+                        self._disconnected_at = time.perf_counter()
+                    self.on_status('disconnected', e)
+                    await asyncio.sleep(self.reconnect_delay)
+        finally:
+            for task in refreshers:
+                task.cancel()
+
+    def _vol24h_error(self, inst_id, e):
+        # Until the first value arrives every tick of inst_id is skipped, so say why
+        self.on_status('error', f"24h volume for {inst_id} unavailable, not pricing it yet: {e!r}")
+
+    async def _receive(self, ws, queue):
+        """Producer: only timestamp and enqueue raw frames."""
+        try:
+            async for msg in ws:
+                recv_wall = time.time()
+                queue.put((recv_wall, time.perf_counter(), msg))
+                if self.recorder:
+                    self.recorder.write(msg, recv_wall)
+                # Buffered frames are returned without suspending; let the compute stage run
+                await asyncio.sleep(0)
+            queue.close(ConnectionError("feed closed"))
+        except Exception as e:
+            queue.close(e)
+
+    async def _resubscribe(self, ws, assets):
+        for asset in assets:
+            self.calculators[asset].book.reset()
+            self.on_status('resync', asset)
+        for op in ("unsubscribe", "subscribe"):
+            for msg in self.subscribe_messages(assets, op):
+                await ws.send(json.dumps(msg))
+
+    async def _compute(self, ws, queue):
+        """Consumer: apply every queued delta, then price each instrument's latest book."""
+        while self._running:
+            try:
+                batch = await asyncio.wait_for(queue.get_batch(), timeout=5)
+            except asyncio.TimeoutError:
+                continue
+
+            proc_start = time.perf_counter()
+            if queue.overflowed:
+                queue.overflowed = False
+                await self._resubscribe(ws, list(self.calculators))
+                continue
+
+            latest = {}
+            resync = set()
+            applied = 0
+            for recv_wall, recv_perf, msg in batch:
+                try:
+                    # Frames for other channels or instruments are skipped before the payload is decoded
+                    peeked = peek_arg(msg)
+                    if peeked is not None and peeked[0] == 'trades' and self.on_trades is not None \
+                            and peeked[1] in self.calculators and peeked[1] not in resync:
+                        self.on_trades(self.calculators[peeked[1]], self.decode(msg).get('data', []))
+                        continue
+                    if peeked is not None and (peeked[0] != 'books' or peeked[1] in resync
+                                               or peeked[1] not in self.calculators):
+                        continue
+                    tick = self.decode(msg)
+                    arg = tick.get('arg', {})
+                    if arg.get('channel', 'books') != 'books':
+                        continue
+                    asset = arg.get('instId')
+                    calc = self.calculators.get(asset)
+                    if calc is None or asset in resync:
+                        continue
+                    if calc.apply(tick):
+                        applied += 1
+                        latest[asset] = (recv_wall, recv_perf)
+                except OutOfSync as e:
+                    resync.add(e.args[0])
+                    latest.pop(e.args[0], None)
+                except Exception as e:
+                    self.on_status('error', e)
+            if resync:
+                await self._resubscribe(ws, resync)
+            queue.conflated += max(applied - len(latest), 0)
+
+            for asset, timing in latest.items():
+                calc = self.calculators[asset]
+                timing += (proc_start, time.perf_counter())
+                if self.impact_pool is not None:
+                    self._submit_impact(calc, timing)
+                    continue
+                try:
+                    result = calc.evaluate()
+                except Exception as e:
+                    self.on_status('error', e)
+                    continue
+                self._emit(result, timing)
+
+    def _submit_impact(self, calc, timing):
+        book = calc.snapshot()
+        if book.mid <= 0:
+            return
+        fut = self.impact_pool.submit(calc.asset, book, calc.qty_usd, calc.volatility, calc.ac_params)
+        fut.add_done_callback(lambda done: self._impact_done(calc, book, done, timing))
+
+    def _impact_done(self, calc, book, done, timing):
+        if done.cancelled():
+            return  # the pool was closed with this request outstanding
+        try:
+            impact = done.result()
+            if impact is None:
+                return  # superseded by a newer book
+            result = calc.evaluate(book, impact)
+        except Exception as e:
+            self.on_status('error', e)
+            return
+        self._emit(result, timing)
+
+    def _emit(self, result, timing):
+        if result is None:
+            return
+        recv_wall, recv_perf, proc_start, eval_start = timing
+        now = time.perf_counter()
+        if self._disconnected_at is not None:
+            self.last_recovery_s = now - self._disconnected_at
+            self._disconnected_at = None
+            self.on_status('recovered', self.last_recovery_s)
+
+        result['latency'] = {
+            # Exchange timestamp to socket receive
+            'network_ms': recv_wall * 1000 - result['ts'],
+            'queue_ms': (proc_start - recv_perf) * 1000,
+            'proc_ms': (now - proc_start) * 1000,
+            # Decoding and book merging of the batch vs. running the cost models
+            'parse_ms': (eval_start - proc_start) * 1000,
+            'model_ms': (now - eval_start) * 1000,
+            'staleness_ms': measure_latency(result['ts'] / 1000.0),
+            'recv_wall': recv_wall,
+            'recv_perf': recv_perf
+        }
+        self.on_result(result)
@@ -0,0 +1,101 @@
+import numpy as np
+
+
+class BookWalker:
+    """
+    Deterministic market-order fills against a BookSnapshot: an order for a
+    USD notional sweeps levels best-first until filled. Prefix sums of
+    notional and size per side are built once (O(L)); each query is then a
+    binary search (O(log L)) and batches of notionals are vectorized.
+
+    Slippage is measured against mid: what the fill cost (buy) or gave up
+    (sell) relative to trading the same quantity at mid, in USD.
+    """
+
+    def __init__(self, book):
+        self.book = book
+        self._sides = {}
+
+    def _side(self, side):
+        prefix = self._sides.get(side)
+        if prefix is None:
+            if side == "buy":
+                px, sz, cum_qty = self.book.ask_px, self.book.ask_sz, self.book.ask_cum
+            elif side == "sell":
+                px, sz, cum_qty = self.book.bid_px, self.book.bid_sz, self.book.bid_cum
+            else:
+                raise ValueError(f"side must be 'buy' or 'sell', not {side!r}")
+            prefix = self._sides[side] = (px, cum_qty, np.cumsum(px * sz))
+        return prefix
+
+    def walk(self, notional_usd, side="buy"):
+        """
+        Fill of one order as a dict: vwap, qty, filled_usd, levels consumed,
+        residual_usd left unfilled when the book runs out, worst_price and
+        slippage (USD, vs mid).
+        """
+        px, cum_qty, cum_usd = self._side(side)
+        notional = float(notional_usd)
+        n_levels = len(px)
+        idx = int(np.searchsorted(cum_usd, notional, side="left"))
+        if idx >= n_levels:
+            # Book exhausted: fill everything that is resting
+            filled_usd = float(cum_usd[-1]) if n_levels else 0.0
+            qty = float(cum_qty[-1]) if n_levels else 0.0
+            idx = n_levels - 1
+        else:
+            before_usd = float(cum_usd[idx - 1]) if idx else 0.0
+            before_qty = float(cum_qty[idx - 1]) if idx else 0.0
+            filled_usd = notional
+            qty = before_qty + (notional - before_usd) / float(px[idx])
+
+        mid = self.book.mid
+        return {
+            'vwap': filled_usd / qty if qty > 0 else float("nan"),
+            'qty': qty,
+            'filled_usd': filled_usd,
+            'levels': idx + 1 if notional > 0 and n_levels else 0,
+            'residual_usd': notional - filled_usd,
+            'worst_price': float(px[idx]) if n_levels else float("nan"),
+            'slippage': filled_usd - qty * mid if side == "buy" else qty * mid - filled_usd
+        }
+
+    def walk_many(self, notional_usd, side="buy"):
+        """walk() for an array of notionals; returns a dict of arrays."""
+        px, cum_qty, cum_usd = self._side(side)
+        notional = np.asarray(notional_usd, dtype=float)
+        n_levels = len(px)
+        if not n_levels:
+            zeros = np.zeros_like(notional)
+            return {'vwap': np.full_like(notional, np.nan), 'qty': zeros, 'filled_usd': zeros,
+                    'levels': zeros.astype(int), 'residual_usd': notional, 'worst_price': np.full_like(notional, np.nan),
+                    'slippage': zeros}
+
+        # First level whose cumulative notional covers the order; n_levels means the book runs out
+        idx = np.searchsorted(cum_usd, notional, side="left")
+        exhausted = idx >= n_levels
+        last = np.minimum(idx, n_levels - 1)
+
+        before_usd = np.where(last > 0, cum_usd[last - 1], 0.0)
+        before_qty = np.where(last > 0, cum_qty[last - 1], 0.0)
+        filled_usd = np.where(exhausted, cum_usd[-1], notional)
+        qty = np.where(exhausted, cum_qty[-1], before_qty + (notional - before_usd) / px[last])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            vwap = np.where(qty > 0, filled_usd / qty, np.nan)
+
+        mid = self.book.mid
+        slippage = filled_usd - qty * mid if side == "buy" else qty * mid - filled_usd
+        return {
+            'vwap': vwap,
+            'qty': qty,
+            'filled_usd': filled_usd,
+            'levels': np.where(notional > 0, last + 1, 0),
+            'residual_usd': notional - filled_usd,
+            'worst_price': px[last],
+            'slippage': slippage
+        }
+
+
+def walk_book(book, notional_usd, side="buy"):
+    """One-off BookWalker(book).walk(); reuse a BookWalker for several queries."""
+    return BookWalker(book).walk(notional_usd, side)
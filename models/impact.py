@@ -1,58 +1,95 @@
 import numpy as np
-from scipy.integrate import quad
+from collections import OrderedDict
+from functools import lru_cache
+from utils.orderbook import BookSnapshot
 
-# Implementation of the Gatheral's non-linear transient impact model
-def calculate_impact(orderbook, qty_usd, sigma, delta, gamma, lam, T=1.0, N=100):
+
+@lru_cache(maxsize=8)
+def decay_matrix(T, N, gamma):
+    """
+    Lower-triangular Gatheral decay kernel on the trading grid:
+    K[i, j] = (t_i - t_j)^(-gamma) for j < i, 0 otherwise.
+    Built once per (T, N, gamma) and shared read-only between calls.
+    """
+    t_grid = np.linspace(0, T, N+1)[:N]
+    lag = np.subtract.outer(t_grid, t_grid)
+    K = np.zeros((N, N))
+    past = lag > 0
+    K[past] = lag[past] ** (-gamma)
+    K.setflags(write=False)
+    return K
+
+
+def solve_trajectory(X, sigma, delta, gamma, lam, T=1.0, N=100, tol=1e-12, max_iter=100):
+    """
+    Solve the non-linear integral equation for the optimal trading rate v
+    by damped fixed-point iteration, stopping once the update falls below tol.
+    """
+    dt = T/N
+    K = decay_matrix(T, N, gamma)
+
+    # Same exponents as the integral equation; raises ZeroDivisionError at delta = 0.5
+    p = 1/(2*delta - 1)
+    coef = (lam * sigma**2 / (2 * delta))**p
+
+    v = np.ones(N) * X/(T*N)  # Initial guess (constant rate)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        for _ in range(max_iter):
+            new_v = coef * (K @ v**delta)**(-p)
+
+            # Normalize to meet total shares constraint
+            new_v *= X / (np.sum(new_v)*dt)
+            new_v = 0.5*v + 0.5*new_v  # Damping for convergence
+
+            step = np.max(np.abs(new_v - v))
+            v = new_v
+            if not step > tol * np.max(np.abs(v)):
+                break
+    return v
 
 
-   
+def impact_costs(v, X, sigma, delta, gamma, lam, T=1.0, N=100):
+    """Transient, permanent and risk terms (in shares) for a trading rate v."""
+    dt = T/N
+    K = decay_matrix(T, N, gamma)
+    traded = v * dt
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        transient_cost = np.sum(v**(1 + delta)) * dt**(1 - gamma)
+
+        # The permanent sum runs over j <= i, so the current interval adds a zero-lag term
+        zero_lag = np.float64(0.0)**(-gamma)
+        permanent_impact = 0.5 * np.sum(v * (K @ traded + traded * zero_lag))
+
+        # Shares still to trade at the start of each interval
+        remaining = X - (np.cumsum(traded) - traded)
+        risk_term = lam * sigma**2 * np.sum(remaining**2) * dt
+
+    return transient_cost, permanent_impact, risk_term
+
+
+def _mid_price(orderbook):
+    # orderbook is a BookSnapshot or a best-first list of ask levels
+    if isinstance(orderbook, BookSnapshot):
+        return float(np.mean(orderbook.ask_px[:5]))
     bids = [float(lvl[0]) for lvl in orderbook[:5]]
     asks = [float(lvl[0]) for lvl in orderbook[:5]]
-    mid_price = (np.mean(bids) + np.mean(asks)) / 2.0
+    return (np.mean(bids) + np.mean(asks)) / 2.0
+
+
+# Implementation of the Gatheral's non-linear transient impact model
+def calculate_impact(orderbook, qty_usd, sigma, delta, gamma, lam, T=1.0, N=100, tol=1e-12, max_iter=100):
+
+    mid_price = _mid_price(orderbook)
 
     #Converting USD notional to share count
     X = qty_usd / mid_price
 
-    #Time grid discretization
-    t_grid = np.linspace(0, T, N+1)
-    dt = T/N
+    # Optimal trading trajectory (numerical solution)
+    v = solve_trajectory(X, sigma, delta, gamma, lam, T, N, tol, max_iter)
 
-    # 4) Optimal trading trajectory (numerical solution)
-    def decay_kernel(t, s):
-        return (t - s)**(-gamma) if t > s else 0.0
-
-    # Solve non-linear integral equation for optimal execution
-    # Using fixed-point iteration method
-    v = np.ones(N) * X/(T*N)  # Initial guess (constant rate)
-    
-    for _ in range(100):  # Iteration convergence
-        new_v = np.zeros(N)
-        for i in range(N):
-            integral = sum(
-                v[j]**(delta) * decay_kernel(t_grid[i], t_grid[j]) 
-                for j in range(i+1)
-            )
-            new_v[i] = (lam * sigma**2 / (2 * delta))**(1/(2*delta - 1)) * integral**(-1/(2*delta - 1))
-        
-        # Normalize to meet total shares constraint
-        total = np.sum(new_v)*dt
-        new_v *= X / total
-        v = 0.5*v + 0.5*new_v  # Damping for convergence
-
-    # 5) Calculate cost components
-    transient_cost = 0.0
-    permanent_impact = 0.0
-    risk_term = 0.0
-
-    for i in range(N):
-        
-        transient_cost += v[i]**(1 + delta) * dt**(1 - gamma)
-        
-     
-        permanent_impact += 0.5 * v[i] * np.sum(v[:i+1] * dt * (t_grid[i] - t_grid[:i+1])**(-gamma))
-        
-
-        risk_term += lam * sigma**2 * (X - np.sum(v[:i]*dt))**2 * dt
+    # Calculate cost components
+    transient_cost, permanent_impact, risk_term = impact_costs(v, X, sigma, delta, gamma, lam, T, N)
 
     # Convert costs to USD
     transient_cost *= mid_price * (1 + delta)/(delta + 1)
@@ -66,3 +103,98 @@ def calculate_impact(orderbook, qty_usd, sigma, delta, gamma, lam, T=1.0, N=100)
         'permanent': permanent_impact,
         'risk': risk_term
     }
+
+
+# Cache entry for parameters the integral equation has no solution for
+_NO_SOLUTION = object()
+
+
+class TrajectoryCache:
+    """
+    Bounded LRU cache of optimal trajectories for calculate_impact.
+
+    The fixed-point iteration is homogeneous in the share count X (the initial
+    guess and the normalization both scale with X), and the lam * sigma^2
+    coefficient cancels in the normalization. So one solution per
+    (delta, gamma, T, N) is stored for X = 1 and rescaled for the current
+    order size, mid price, sigma and lam:
+        transient ~ X^(1+delta), permanent ~ X^2, risk ~ lam * sigma^2 * X^2
+    A streamed sigma therefore hits the cache exactly. Parameters with no
+    solution (delta = 0.5) are cached too: later lookups count as hits and
+    raise the same ZeroDivisionError without re-solving.
+    """
+
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def solution(self, delta, gamma, T=1.0, N=100):
+        """
+        Unit trajectory and cost terms, solved on a miss: (u, transient,
+        permanent, risk) for X = 1, with risk given for lam * sigma^2 = 1.
+        """
+        key = (delta, gamma, T, N)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            if entry is _NO_SOLUTION:
+                raise ZeroDivisionError("no optimal trajectory at delta = 0.5")
+            return entry
+
+        self.misses += 1
+        try:
+            u = solve_trajectory(1.0, 1.0, delta, gamma, 1.0, T, N)
+        except ZeroDivisionError:
+            entry = _NO_SOLUTION
+        else:
+            u.setflags(write=False)
+            entry = (u,) + impact_costs(u, 1.0, 1.0, delta, gamma, 1.0, T, N)
+        self._entries[key] = entry
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        if entry is _NO_SOLUTION:
+            raise ZeroDivisionError("no optimal trajectory at delta = 0.5")
+        return entry
+
+    def calculate_impact(self, orderbook, qty_usd, sigma, delta, gamma, lam, T=1.0, N=100):
+        """Drop-in replacement for calculate_impact backed by the cache."""
+        mid_price = _mid_price(orderbook)
+        X = qty_usd / mid_price
+        _, transient, permanent, risk = self.solution(delta, gamma, T, N)
+
+        with np.errstate(invalid="ignore"):
+            transient_cost = transient * X**(1 + delta) * mid_price * (1 + delta)/(delta + 1)
+            permanent_impact = permanent * X**2 * mid_price * gamma
+            risk_term = lam * sigma**2 * risk * X**2 * mid_price
+
+        total_cost = transient_cost + permanent_impact + risk_term
+        return total_cost, {
+            'transient': transient_cost,
+            'permanent': permanent_impact,
+            'risk': risk_term
+        }
+
+    def impact_curve(self, orderbook, qty_usd, sigma, delta, gamma, lam, T=1.0, N=100):
+        """
+        calculate_impact for an array of order sizes: one cached trajectory
+        solve, then the X scalings evaluated elementwise. Returns arrays.
+        """
+        return self.calculate_impact(orderbook, np.asarray(qty_usd, dtype=float),
+                                     sigma, delta, gamma, lam, T, N)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._entries),
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
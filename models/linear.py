@@ -0,0 +1,179 @@
+import json
+import math
+import zlib
+import warnings
+import threading
+import numpy as np
+
+
+class LinearPredictor:
+    """
+    Coefficients of a fitted sklearn linear regressor evaluated with plain
+    arithmetic, skipping sklearn's per-call input validation.
+    """
+
+    def __init__(self, coef, intercept):
+        self.coef = np.asarray(coef, dtype=float).ravel()
+        self.intercept = float(np.ravel(intercept)[0])
+        self._coef = tuple(float(c) for c in self.coef)
+        self.n_features = len(self._coef)
+
+    @classmethod
+    def from_sklearn(cls, model):
+        return cls(model.coef_, model.intercept_)
+
+    def decision_one(self, *features):
+        z = self.intercept
+        for c, x in zip(self._coef, features):
+            z += c * x
+        return z
+
+    def predict_one(self, *features):
+        return self.decision_one(*features)
+
+    def decision(self, X):
+        """Batched decision values for an (n_rows, n_features) array."""
+        return np.asarray(X, dtype=float) @ self.coef + self.intercept
+
+    def predict(self, X):
+        return self.decision(X)
+
+
+class LogisticPredictor(LinearPredictor):
+    """Binary logistic regression; probabilities are for classes_[1]."""
+
+    @classmethod
+    def from_sklearn(cls, model):
+        if len(model.classes_) != 2:
+            raise ValueError("only binary classifiers are supported")
+        return cls(model.coef_[0], model.intercept_)
+
+    def predict_proba_one(self, *features):
+        z = self.decision_one(*features)
+        if z >= 0:
+            return 1.0 / (1.0 + math.exp(-z))
+        e = math.exp(z)
+        return e / (1.0 + e)
+
+    def predict_proba(self, X):
+        """Batched (n_rows, 2) class probabilities, as sklearn returns them."""
+        z = self.decision(X)
+        p = np.empty(z.shape + (2,))
+        p[:, 1] = 0.5 * (1.0 + np.tanh(0.5 * z))  # overflow-free sigmoid
+        p[:, 0] = 1.0 - p[:, 1]
+        return p
+
+    def predict(self, X):
+        return (self.decision(X) >= 0).astype(int)
+
+
+_PREDICTORS = {'linear': LinearPredictor, 'logistic': LogisticPredictor}
+
+
+def _fingerprint(path):
+    with open(path, "rb") as fh:
+        data = fh.read()
+    return {'size': len(data), 'crc32': zlib.crc32(data)}
+
+
+def _load_coef_cache(path, fingerprint):
+    try:
+        with open(path + ".coef.json") as fh:
+            cached = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    if cached.get('source') != fingerprint or cached.get('kind') not in _PREDICTORS:
+        return None
+    return _PREDICTORS[cached['kind']](cached['coef'], cached['intercept'])
+
+
+def _save_coef_cache(path, fingerprint, fast):
+    kind = 'logistic' if isinstance(fast, LogisticPredictor) else 'linear'
+    try:
+        with open(path + ".coef.json", "w") as fh:
+            json.dump({'kind': kind, 'coef': fast.coef.tolist(), 'intercept': fast.intercept,
+                       'source': fingerprint}, fh)
+    except OSError:
+        pass  # read-only checkout: every start falls back to unpickling
+
+
+def load_predictor(path, rtol=1e-9, cache=True):
+    """
+    Load a pickled sklearn LinearRegression/LogisticRegression and return the
+    equivalent closed-form predictor, after checking both agree on probe rows.
+
+    The verified coefficients are kept in `<path>.coef.json`, keyed on the
+    pickle's size and CRC, so later loads skip joblib and sklearn entirely.
+    """
+    fingerprint = _fingerprint(path) if cache else None
+    if cache:
+        fast = _load_coef_cache(path, fingerprint)
+        if fast is not None:
+            return fast
+
+    import joblib  # pulls in sklearn to unpickle; only needed when the cache is cold
+    model = joblib.load(path)
+    if hasattr(model, "predict_proba"):
+        fast = LogisticPredictor.from_sklearn(model)
+        reference = lambda X: model.predict_proba(X)[:, 1]
+        batched = lambda X: fast.predict_proba(X)[:, 1]
+        scalar = fast.predict_proba_one
+    else:
+        fast = LinearPredictor.from_sklearn(model)
+        reference, batched, scalar = model.predict, fast.predict, fast.predict_one
+
+    probes = np.random.default_rng(0).standard_normal((16, fast.n_features))
+    with warnings.catch_warnings():
+        # Models were fitted on DataFrames; the unnamed probe array is intentional
+        warnings.simplefilter("ignore", UserWarning)
+        expected = reference(probes)
+    if not (np.allclose(batched(probes), expected, rtol=rtol, atol=1e-12)
+            and np.allclose([scalar(*row) for row in probes], expected, rtol=rtol, atol=1e-12)):
+        raise ValueError(f"closed-form predictor disagrees with {type(model).__name__} in {path}")
+    if cache:
+        _save_coef_cache(path, fingerprint, fast)
+    return fast
+
+
+class LazyPredictor:
+    """
+    Defers load_predictor(path) to the first get(), or to a background
+    thread started by preload(), so importing a model module stays cheap.
+    swap() hot-replaces the model while the feed keeps running.
+    """
+
+    def __init__(self, path, loader=load_predictor):
+        self.path = path
+        self.loader = loader
+        self.swaps = 0
+        self._model = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        model = self._model
+        if model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = self.loader(self.path)
+                model = self._model
+        return model
+
+    @property
+    def loaded(self):
+        return self._model is not None
+
+    def swap(self, model):
+        """
+        Replace the live model (e.g. after retraining) and return the previous
+        one. A single reference assignment: callers of get() see either the
+        old or the new model, never a mix, and are never blocked.
+        """
+        with self._lock:
+            previous, self._model = self._model, model
+            self.swaps += 1
+        return previous
+
+    def preload(self):
+        """Start loading in a daemon thread; get() waits for it if called first."""
+        if self._model is None:
+            threading.Thread(target=self.get, name=f"load-{self.path}", daemon=True).start()
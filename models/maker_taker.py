@@ -1,15 +1,20 @@
-import os, joblib
+import os
+from models.linear import LazyPredictor
 
-#Load classifier once
+#Load classifier once, on first use (or in the background via preload)
 HERE = os.path.dirname(__file__)
 model_path = os.path.join(HERE, "maker_taker_model.pkl")
-clf = joblib.load(model_path)
+clf = LazyPredictor(model_path)
 
-def predict_maker_taker(asks, bids, price, side, size):
 
-    best_bid = float(bids[0][0])
-    best_ask = float(asks[0][0])
-    spread = best_ask - best_bid
+def preload():
+    clf.preload()
+
+def predict_maker_taker(book, price, side, size):
+
+    best_bid = book.best_bid
+    best_ask = book.best_ask
+    spread = book.spread
 
     # Aggressiveness
     if side == "buy":
@@ -19,9 +24,9 @@ def predict_maker_taker(asks, bids, price, side, size):
     rel_aggr = aggr / spread if spread>0 else 0.0
 
     # Depth ratio (using top 5 pre-fetched)
-    depth5 = sum(float(l[1]) for l in bids[:5]) + sum(float(l[1]) for l in asks[:5])
+    depth5 = book.depth(5)
     size_depth_ratio = size / depth5 if depth5>0 else 0.0
 
     # Predicting probability
-    prob_taker = clf.predict_proba([[rel_aggr, size_depth_ratio]])[0][1]
+    prob_taker = clf.get().predict_proba_one(rel_aggr, size_depth_ratio)
     return 1 if prob_taker >= 0.5 else 0
@@ -0,0 +1,143 @@
+import asyncio
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from models.impact import TrajectoryCache
+from utils.orderbook import BookSnapshot
+
+# Worker-process state: one trajectory cache and the shared blocks attached so far
+_worker_cache = None
+_worker_blocks = {}
+
+
+def _block_view(buf, depth):
+    """Two book slots of (ask_px, ask_sz, bid_px, bid_sz) rows over a shared buffer."""
+    return np.ndarray((2, 4, depth), dtype=np.float64, buffer=buf)
+
+
+def _init_worker():
+    global _worker_cache
+    _worker_cache = TrajectoryCache()
+
+
+def _impact_task(shm_name, depth, slot, n_ask, n_bid, ts, qty_usd, sigma, ac_params):
+    if shm_name not in _worker_blocks:
+        shm = shared_memory.SharedMemory(name=shm_name)
+        _worker_blocks[shm_name] = (shm, _block_view(shm.buf, depth))
+    rows = _worker_blocks[shm_name][1][slot]
+    book = BookSnapshot(rows[0, :n_ask].copy(), rows[1, :n_ask].copy(),
+                        rows[2, :n_bid].copy(), rows[3, :n_bid].copy(), ts)
+    try:
+        return _worker_cache.calculate_impact(book, qty_usd, sigma, **ac_params)
+    except ZeroDivisionError:
+        return 0.0, {'transient': 0, 'permanent': 0, 'risk': 0}
+
+
+class _Instrument:
+    __slots__ = ("shm", "view", "slot", "inflight", "pending")
+
+    def __init__(self, depth):
+        self.shm = shared_memory.SharedMemory(create=True, size=2 * 4 * depth * 8)
+        self.view = _block_view(self.shm.buf, depth)
+        self.slot = 0
+        self.inflight = False
+        self.pending = None
+
+
+class ImpactPool:
+    """
+    Persistent process pool for calculate_impact, so the solve runs outside
+    the GIL of the feed/UI process.
+
+    Each instrument owns a shared-memory block with two book slots: one read
+    by the request in flight, one written for the next request, so books are
+    never pickled. At most one request per instrument is in flight; a newer
+    submit replaces the waiting one, whose future resolves to None
+    (superseded). Must be used from a running event loop. close() cancels
+    the futures of requests still in flight or waiting.
+    """
+
+    def __init__(self, workers=4, depth=400, mp_context=None):
+        self.workers = workers
+        self.depth = depth
+        self.submitted = 0
+        self.completed = 0
+        self.superseded = 0
+        self._executor = ProcessPoolExecutor(workers, mp_context=mp_context, initializer=_init_worker)
+        self._instruments = {}
+        self._closed = False
+
+    def submit(self, asset, book, qty_usd, sigma, ac_params):
+        """Future of (impact_value, impact_breakdown), or None if superseded."""
+        if self._closed:
+            raise RuntimeError("ImpactPool is closed")
+        fut = asyncio.get_running_loop().create_future()
+        state = self._instruments.get(asset)
+        if state is None:
+            state = self._instruments[asset] = _Instrument(self.depth)
+        self.submitted += 1
+
+        request = (book, qty_usd, sigma, ac_params, fut)
+        if not state.inflight:
+            self._dispatch(state, request)
+        else:
+            if state.pending is not None:
+                self.superseded += 1
+                state.pending[-1].set_result(None)
+            state.pending = request
+        return fut
+
+    def _dispatch(self, state, request):
+        book, qty_usd, sigma, ac_params, fut = request
+        slot = state.slot
+        state.slot ^= 1
+        n_ask = min(len(book.ask_px), self.depth)
+        n_bid = min(len(book.bid_px), self.depth)
+        rows = state.view[slot]
+        rows[0, :n_ask] = book.ask_px[:n_ask]
+        rows[1, :n_ask] = book.ask_sz[:n_ask]
+        rows[2, :n_bid] = book.bid_px[:n_bid]
+        rows[3, :n_bid] = book.bid_sz[:n_bid]
+
+        state.inflight = True
+        job = self._executor.submit(_impact_task, state.shm.name, self.depth, slot, n_ask, n_bid,
+                                    book.ts, qty_usd, sigma, ac_params)
+        asyncio.wrap_future(job).add_done_callback(lambda done: self._finish(state, fut, done))
+
+    def _finish(self, state, fut, done):
+        state.inflight = False
+        if not fut.done():
+            if done.cancelled():
+                fut.cancel()
+            elif done.exception() is not None:
+                fut.set_exception(done.exception())
+            else:
+                self.completed += 1
+                fut.set_result(done.result())
+        if state.pending is not None:
+            request, state.pending = state.pending, None
+            if self._closed:
+                request[-1].cancel()
+            else:
+                self._dispatch(state, request)
+
+    def stats(self):
+        return {
+            'workers': self.workers,
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'superseded': self.superseded
+        }
+
+    def close(self):
+        self._closed = True
+        for state in self._instruments.values():
+            if state.pending is not None:
+                state.pending[-1].cancel()
+                state.pending = None
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        for state in self._instruments.values():
+            state.view = None
+            state.shm.close()
+            state.shm.unlink()
+        self._instruments.clear()
@@ -0,0 +1,224 @@
+"""
+Online retraining of the slippage regressor and the maker/taker classifier
+from streamed fills, hot-swapped into the live LazyPredictors.
+
+Fills (trades joined with the book they hit) go into a fixed-size ring
+buffer. A retrain takes the window in time order and fits on the older part
+with vectorized features. The newest `holdout` fraction is used to score the
+candidate and the live model; the candidate is swapped in only if it scores
+better. Retraining runs in a background thread, and the swap is a single
+reference assignment, so the feed is never paused.
+"""
+import time
+import threading
+import numpy as np
+from models.linear import LinearPredictor, LogisticPredictor
+
+# Columns of a fill, as in the MarketStore `trades` table (utils/store.py)
+FILL_FIELDS = ('ts', 'px', 'sz', 'side', 'best_bid', 'best_ask', 'bid_depth5', 'ask_depth5', 'vol24h', 'is_taker')
+
+
+class FillBuffer:
+    """Ring buffer of the last `capacity` fills, one float64 array per column."""
+
+    def __init__(self, capacity=50000):
+        self.capacity = capacity
+        self.total = 0
+        self._cols = {name: np.zeros(capacity) for name in FILL_FIELDS}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    def append(self, *row):
+        """One fill, values in FILL_FIELDS order."""
+        with self._lock:
+            i = self.total % self.capacity
+            for name, value in zip(FILL_FIELDS, row):
+                self._cols[name][i] = value
+            self.total += 1
+
+    def extend(self, cols):
+        """A batch of fills as a dict of equal-length arrays (e.g. a MarketStore read)."""
+        n = len(cols['ts'])
+        skipped = 0
+        if n > self.capacity:
+            # Only the newest `capacity` fills fit; the older ones still count towards total
+            cols = {name: np.asarray(cols[name])[-self.capacity:] for name in FILL_FIELDS}
+            skipped, n = n - self.capacity, self.capacity
+        with self._lock:
+            idx = (self.total + skipped + np.arange(n)) % self.capacity
+            for name in FILL_FIELDS:
+                self._cols[name][idx] = cols[name]
+            self.total += skipped + n
+
+    def window(self):
+        """Copy of the buffered fills, oldest first."""
+        with self._lock:
+            n = len(self)
+            start = self.total - n
+            idx = (start + np.arange(n)) % self.capacity
+            return {name: col[idx] for name, col in self._cols.items()}
+
+
+def slippage_xy(cols):
+    """Features [spread, depth5, vol24h, order_size] and target (px - mid) / mid, as in train_slippage_model."""
+    mid = (cols['best_bid'] + cols['best_ask']) / 2
+    X = np.column_stack(((cols['best_ask'] - cols['best_bid']) / mid,
+                         cols['bid_depth5'] + cols['ask_depth5'],
+                         cols['vol24h'],
+                         cols['sz'] * mid))
+    return X, (cols['px'] - mid) / mid
+
+
+def maker_taker_xy(cols):
+    """Features [rel_aggr, size_depth_ratio] and target is_taker, as in train_maker_taker."""
+    spread = cols['best_ask'] - cols['best_bid']
+    aggr = np.where(cols['side'] > 0, cols['px'] - cols['best_bid'], cols['best_ask'] - cols['px'])
+    depth5 = cols['bid_depth5'] + cols['ask_depth5']
+    X = np.column_stack((aggr / np.where(spread == 0, 1e-9, spread),
+                         cols['sz'] / np.where(depth5 == 0, 1e-9, depth5)))
+    return X, cols['is_taker']
+
+
+def _standardize(X):
+    mu = X.mean(axis=0)
+    sd = X.std(axis=0)
+    sd[sd == 0] = 1.0
+    return (X - mu) / sd, mu, sd
+
+
+def fit_linear(X, y, ridge=1e-8, init=None):
+    """Least squares on standardized features (a tiny ridge keeps constant columns at 0)."""
+    Z, mu, sd = _standardize(X)
+    y_mean = y.mean()
+    A = Z.T @ Z + ridge * len(y) * np.eye(Z.shape[1])
+    w = np.linalg.solve(A, Z.T @ (y - y_mean))
+    coef = w / sd
+    return LinearPredictor(coef, y_mean - mu @ coef)
+
+
+def fit_logistic(X, y, l2=1e-4, init=None, iters=25, tol=1e-8):
+    """L2-regularized logistic regression by Newton/IRLS, warm-started from `init`."""
+    Z, mu, sd = _standardize(X)
+    Z1 = np.column_stack((np.ones(len(Z)), Z))
+    w = np.zeros(Z1.shape[1])
+    if init is not None and init.n_features == X.shape[1]:
+        w[1:] = init.coef * sd
+        w[0] = init.intercept + mu @ init.coef
+    reg = l2 * len(y) * np.r_[0.0, np.ones(Z.shape[1])]
+    for _ in range(iters):
+        p = 0.5 * (1.0 + np.tanh(0.5 * (Z1 @ w)))
+        grad = Z1.T @ (p - y) + reg * w
+        hess = (Z1 * (p * (1 - p))[:, None]).T @ Z1 + np.diag(reg + 1e-12)
+        step = np.linalg.solve(hess, grad)
+        w -= step
+        if np.abs(step).max() < tol:
+            break
+    coef = w[1:] / sd
+    return LogisticPredictor(coef, w[0] - mu @ coef)
+
+
+def mean_abs_error(model, X, y):
+    return float(np.abs(model.predict(X) - y).mean())
+
+
+def log_loss(model, X, y):
+    p = np.clip(model.predict_proba(X)[:, 1], 1e-12, 1 - 1e-12)
+    return float(-(y * np.log(p) + (1 - y) * np.log(1 - p)).mean())
+
+
+class OnlineTrainer:
+    """
+    Retrains the live slippage and maker/taker predictors from fills.
+    add_fill()/add_fills() feed the buffer. Every `retrain_every` new fills,
+    a background retrain is started, once at least `min_rows` are buffered.
+    The classifier is skipped while the window holds only one class; public
+    trades, for example, are all taker fills.
+    """
+
+    def __init__(self, slippage_model=None, maker_taker_model=None, capacity=50000, holdout=0.2,
+                 min_rows=500, retrain_every=2000):
+        if slippage_model is None:
+            from models.slippage import _slip_model as slippage_model
+        if maker_taker_model is None:
+            from models.maker_taker import clf as maker_taker_model
+        self.buffer = FillBuffer(capacity)
+        self.holdout = holdout
+        self.min_rows = min_rows
+        self.retrain_every = retrain_every
+        self.models = {
+            'slippage': (slippage_model, slippage_xy, fit_linear, mean_abs_error),
+            'maker_taker': (maker_taker_model, maker_taker_xy, fit_logistic, log_loss),
+        }
+        self.retrains = 0
+        self.swaps = 0
+        self.last = {}
+        self._since = 0
+        self._thread = None
+
+    def add_fill(self, *row):
+        self.buffer.append(*row)
+        self._since += 1
+        self._maybe_retrain()
+
+    def add_fills(self, cols):
+        self.buffer.extend(cols)
+        self._since += len(cols['ts'])
+        self._maybe_retrain()
+
+    def _maybe_retrain(self):
+        if self._since < self.retrain_every or len(self.buffer) < self.min_rows:
+            return
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._since = 0
+        self._thread = threading.Thread(target=self.retrain, name="online-retrain", daemon=True)
+        self._thread.start()
+
+    def wait(self, timeout=None):
+        """Block until a running background retrain has finished."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def retrain(self):
+        """Fit, validate and possibly swap every model now; returns {name: report}."""
+        window = self.buffer.window()
+        n = len(window['ts'])
+        split = int(n * (1 - self.holdout))
+        reports = {}
+        for name, (live, xy, fit, score) in self.models.items():
+            X, y = xy(window)
+            ok = np.isfinite(X).all(axis=1) & np.isfinite(y)
+            train = ok[:split]
+            test = ok[split:]
+            X_train, y_train = X[:split][train], y[:split][train]
+            X_test, y_test = X[split:][test], y[split:][test]
+            report = {'train_rows': len(y_train), 'holdout_rows': len(y_test), 'accepted': False}
+            if len(y_train) < self.min_rows * (1 - self.holdout) or not len(y_test):
+                reports[name] = dict(report, skipped="not enough rows")
+                continue
+            if fit is fit_logistic and len(np.unique(y_train)) < 2:
+                reports[name] = dict(report, skipped="one class only")
+                continue
+
+            current = live.get()
+            start = time.perf_counter()
+            candidate = fit(X_train, y_train, init=current)
+            report['fit_ms'] = (time.perf_counter() - start) * 1000
+            report['score_live'] = score(current, X_test, y_test)
+            report['score_new'] = score(candidate, X_test, y_test)
+            if np.isfinite(report['score_new']) and not report['score_new'] >= report['score_live']:
+                start = time.perf_counter()
+                live.swap(candidate)
+                report['swap_us'] = (time.perf_counter() - start) * 1e6
+                report['accepted'] = True
+                self.swaps += 1
+            reports[name] = report
+        self.retrains += 1
+        self.last = reports
+        return reports
+
+    def stats(self):
+        return {'fills': self.buffer.total, 'buffered': len(self.buffer), 'retrains': self.retrains,
+                'swaps': self.swaps, 'last': self.last}
@@ -0,0 +1,104 @@
+"""
+Monte Carlo distribution of the implementation shortfall of the optimal
+execution schedule, next to the impact model's point estimate.
+
+The order is worked along the trajectory from models/impact.py while the
+mid price diffuses with the session volatility. Price moves are charged on
+the shares still to trade. So for a unit-variance shock matrix Z of shape
+(paths, N), the shortfall of every path is one matrix-vector product:
+
+    shortfall = expected_impact + Z @ (sigma * mid * sqrt(dt) * remaining)
+
+The shocks are drawn once per grid size N, in `chunk`-row blocks. The same
+scenarios are then reused on every tick (common random numbers), so
+percentiles move with the market rather than with sampling noise, and a
+tick costs the product plus two partial sorts. Call refresh() to draw new
+scenarios.
+"""
+import numpy as np
+
+DISTRIBUTIONS = ("normal", "t")
+
+
+class ShortfallSimulator:
+    """
+    Scenario set of `paths` price paths. dist="t" draws Student-t shocks
+    with `df` degrees of freedom, rescaled to unit variance, for fatter
+    tails than the Gaussian.
+    """
+
+    def __init__(self, paths=10000, chunk=2048, dist="normal", df=4.0, seed=None):
+        if dist not in DISTRIBUTIONS:
+            raise ValueError(f"unknown shock distribution {dist!r}, expected one of {DISTRIBUTIONS}")
+        if dist == "t" and df <= 2:
+            raise ValueError("Student-t shocks need df > 2 for a finite variance")
+        self.paths = int(paths)
+        self.chunk = int(chunk)
+        self.dist = dist
+        self.df = float(df)
+        self.rng = np.random.default_rng(seed)
+        self.draws = 0
+        self._shocks = {}
+
+    def shocks(self, N):
+        """(paths, N) float32 unit-variance shocks, drawn on first use."""
+        Z = self._shocks.get(N)
+        if Z is None:
+            Z = np.empty((self.paths, N), dtype=np.float32)
+            for i in range(0, self.paths, self.chunk):
+                block = Z[i:i + self.chunk]
+                if self.dist == "normal":
+                    self.rng.standard_normal(out=block, dtype=np.float32)
+                else:
+                    t = self.rng.standard_t(self.df, block.shape)
+                    block[:] = t * np.sqrt((self.df - 2) / self.df)
+            Z.setflags(write=False)
+            self._shocks[N] = Z
+            self.draws += 1
+        return Z
+
+    def refresh(self):
+        """Drop the scenario sets; the next simulate() draws new ones."""
+        self._shocks.clear()
+
+    def simulate(self, traded, mid, sigma, expected=0.0, T=1.0):
+        """
+        Shortfall distribution (USD) for `traded[k]` shares executed in each
+        of N intervals over horizon T, with relative volatility sigma per
+        unit of T. Returns mean, std, p95, p99 and the number of paths.
+        """
+        traded = np.asarray(traded, dtype=float)
+        N = len(traded)
+        Z = self.shocks(N)
+        # Shares still to trade once interval k's price move has happened
+        remaining = traded.sum() - np.cumsum(traded)
+        w = (sigma * mid * np.sqrt(T / N) * remaining).astype(np.float32)
+
+        out = np.empty(self.paths)
+        for i in range(0, self.paths, self.chunk):
+            np.matmul(Z[i:i + self.chunk], w, out=out[i:i + self.chunk], casting="unsafe")
+        out += expected
+
+        k95 = int(np.ceil(0.95 * self.paths)) - 1
+        k99 = int(np.ceil(0.99 * self.paths)) - 1
+        tail = np.partition(out, (k95, k99))
+        return {
+            'mean': float(out.mean()),
+            'std': float(out.std()),
+            'p95': float(tail[k95]),
+            'p99': float(tail[k99]),
+            'paths': self.paths,
+        }
+
+
+def optimal_schedule(impact_cache, X, delta, gamma, T=1.0, N=100):
+    """
+    Shares traded per interval on the cached optimal trajectory for X shares.
+    At delta = 0.5 the integral equation has no solution and the order is
+    spread evenly instead (TWAP), as evaluate() reports zero impact there.
+    """
+    try:
+        u = impact_cache.solution(delta, gamma, T, N)[0]
+    except ZeroDivisionError:
+        return np.full(N, X / N)
+    return u * (X * T / N)
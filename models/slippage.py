@@ -1,49 +1,53 @@
-import joblib
-import requests
 import os
+import numpy as np
+from models.linear import LazyPredictor
+from utils.volume import fetch_vol24h
 
 
 HERE = os.path.dirname(__file__)
 model_path = os.path.join(HERE, "slippage_model.pkl")
 
-# Load the pre-trained slippage model once
+# Load the pre-trained slippage model once, on first use (or in the background via preload)
 
-_slip_model = joblib.load(model_path)
+_slip_model = LazyPredictor(model_path)
+
+
+def preload():
+    _slip_model.preload()
             
 
-def estimate_slippage(asks, bids, qty_usd, inst_id):
+def estimate_slippage(book, qty_usd, inst_id, vol24h=None):
     """
-    Predict slippage ($) using a linear regression model.
+    Predict slippage ($) using a linear regression model on a BookSnapshot.
     Features:
       - spread = (best_ask - best_bid) / mid_price
       - depth5 = sum of volumes at top 5 levels on both sides
-      - vol24h = 24h trading volume in USD (fetched via OKX REST)
+      - vol24h = 24h trading volume in USD (pass a cached value; fetched via OKX REST if None)
       - order_size = qty_usd
     """
 
-    best_ask = float(asks[0][0])
-    best_bid = float(bids[0][0])
-    mid_price = (best_ask + best_bid) / 2
-
-
-    spread = (best_ask - best_bid) / mid_price             
-
-   
-    depth_ask = sum(float(level[1]) for level in asks[:5])
-    depth_bid = sum(float(level[1]) for level in bids[:5])
-    depth5 = depth_ask + depth_bid                       
+    spread = book.spread / book.mid
+    depth5 = book.depth(5)
 
     #Fetch 24h volume from OKX ticker endpoint
-    resp = requests.get(
-        f"https://www.okx.com/api/v5/market/ticker?instId={inst_id}",
-        timeout=2
-    )                                                       
-    data24 = resp.json().get("data", [{}])[0]
-    vol24h = float(data24.get("vol24h", 0.0))               
+    if vol24h is None:
+        vol24h = fetch_vol24h(inst_id)
 
     #Feature vector for prediction
-    X = [[spread, depth5, vol24h, qty_usd]]
+    return _slip_model.get().predict_one(spread, depth5, vol24h, qty_usd)
+
 
-   
-    slippage = _slip_model.predict(X)[0]                    
-    return slippage
+def estimate_slippage_curve(book, qty_usd, inst_id, vol24h=None):
+    """
+    estimate_slippage for an array of order sizes on one BookSnapshot; the
+    book features are computed once and only the size term varies.
+    """
+    qty_usd = np.asarray(qty_usd, dtype=float)
+    spread = book.spread / book.mid
+    depth5 = book.depth(5)
+    if vol24h is None:
+        vol24h = fetch_vol24h(inst_id)
+
+    model = _slip_model.get()
+    base = model.decision_one(spread, depth5, vol24h, 0.0)
+    return base + model.coef[3] * qty_usd
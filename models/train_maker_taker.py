@@ -1,26 +1,33 @@
 import os
+import sys
+import numpy as np
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import classification_report, roc_auc_score
 import joblib
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from utils.store import MarketStore, maker_taker_history
 
-csv_path = os.path.join(os.path.dirname(__file__), "../maker_taker_history.csv")
-df = pd.read_csv(csv_path)
+# Trades collected by scripts/build_makertaker_history.py; the CSV is the fallback
+STORE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "store")
+INST = "BTCUSDT"
+
+store = MarketStore(STORE)
+if INST in store.instruments("trades"):
+    df = pd.DataFrame(maker_taker_history(store.read("trades", INST)))
+else:
+    csv_path = os.path.join(os.path.dirname(__file__), "../maker_taker_history.csv")
+    df = pd.read_csv(csv_path)
 
 
 
 df["spread"] = df["best_ask"] - df["best_bid"]
 
 #Aggressiveness: how deep into the spread the trade executed
-def compute_aggr(row):
-    if row["side"].lower() == "buy":
-        return row["trade_price"] - row["best_bid"]
-    else:
-        return row["best_ask"] - row["trade_price"]
-
-df["aggr"] = df.apply(compute_aggr, axis=1)
+buy = df["side"].str.lower() == "buy"
+df["aggr"] = np.where(buy, df["trade_price"] - df["best_bid"], df["best_ask"] - df["trade_price"])
 df["rel_aggr"] = df["aggr"] / df["spread"].replace(0, 1e-9)
 
 # Depth ratio: trade size vs total top-5 depth
@@ -1,12 +1,23 @@
+import os
+import sys
 import pandas as pd
 from sklearn.model_selection import train_test_split, cross_val_score
 from sklearn.linear_model import LinearRegression
 from sklearn.metrics import mean_absolute_error, r2_score
 import joblib
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from utils.store import MarketStore, slippage_history
 
+# Trades collected by scripts/build_slippage_history.py; the CSV is the fallback
+STORE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "store")
+INST = "BTC-USDT"
 
-df = pd.read_csv("slippage_history.csv")
+store = MarketStore(STORE)
+if INST in store.instruments("trades"):
+    df = pd.DataFrame(slippage_history(store.read("trades", INST)))
+else:
+    df = pd.read_csv("slippage_history.csv")
 
 
 df["slippage"] = (df["exec_price"] - df["mid_price_at_submit"]) / df["mid_price_at_submit"] 
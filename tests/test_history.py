@@ -0,0 +1,117 @@
+import os
+import json
+import asyncio
+import pytest
+from utils.history import HistoryCollector, OkxSource, RequestsClient
+from utils.mock_rest import MockRestServer
+
+SYMBOLS = ["BTC-USDT", "ETH-USDT"]
+ROWS = 300
+
+
+@pytest.fixture(scope="module")
+def server():
+    server = MockRestServer(port=0, pool=ROWS * 2).start()
+    yield server
+    server.stop()
+
+
+def collector(server, tmp_path, client, rows=ROWS):
+    return HistoryCollector(OkxSource(), client, SYMBOLS, max_rows=rows, batch=50, rate=1000,
+                            csv_path=str(tmp_path / "history.csv"), checkpoint=str(tmp_path / "checkpoint.json"),
+                            checkpoint_every=1)
+
+
+def csv_rows(tmp_path):
+    with open(tmp_path / "history.csv") as fh:
+        return sum(1 for _ in fh) - 1
+
+
+def run(server, tmp_path, cancel_after=None):
+    client = RequestsClient(server.url)
+    c = collector(server, tmp_path, client)
+
+    async def main():
+        task = asyncio.ensure_future(c.run())
+        while cancel_after is not None and not task.done() and c.rows < cancel_after:
+            await asyncio.sleep(0.001)
+        if cancel_after is not None and not task.done():
+            task.cancel()
+        try:
+            return await task
+        except asyncio.CancelledError:
+            return c.stats()
+
+    try:
+        return asyncio.run(main())
+    finally:
+        client.close()
+
+
+def test_rerun_after_completion_starts_fresh(server, tmp_path):
+    first = run(server, tmp_path)
+    assert first['rows'] == ROWS * len(SYMBOLS)
+    assert not os.path.exists(tmp_path / "checkpoint.json")
+    second = run(server, tmp_path)
+    assert second['rows'] == ROWS * len(SYMBOLS)
+    assert csv_rows(tmp_path) == ROWS * len(SYMBOLS)
+
+
+def test_resume_drops_rows_written_after_the_checkpoint(server, tmp_path):
+    first = run(server, tmp_path, cancel_after=ROWS)
+    assert 0 < first['rows'] < ROWS * len(SYMBOLS)
+    with open(tmp_path / "checkpoint.json") as fh:
+        saved = json.load(fh)
+    assert saved['csv_offset'] == os.path.getsize(tmp_path / "history.csv")
+
+    # A hard kill after more rows were flushed but before the next checkpoint
+    with open(tmp_path / "history.csv", "a") as fh:
+        fh.write("1,2,3,4,5,6\n" * 7)
+    second = run(server, tmp_path)
+    assert first['rows'] + second['rows'] == ROWS * len(SYMBOLS)
+    assert csv_rows(tmp_path) == ROWS * len(SYMBOLS)
+    assert not os.path.exists(tmp_path / "checkpoint.json")
+
+
+class EmptyBooks:
+    """Serves empty books for `symbol`: the first `times` book requests, or all of them."""
+
+    def __init__(self, client, symbol, times=None):
+        self.client = client
+        self.symbol = symbol
+        self.times = times
+
+    async def get_json(self, path, params=None):
+        payload = await self.client.get_json(path, params)
+        if path.endswith("/books") and params['instId'] == self.symbol and self.times != 0:
+            if self.times is not None:
+                self.times -= 1
+            # Both an empty data list and a book with no levels
+            payload = {'code': "0", 'data': [{'asks': [], 'bids': [], 'ts': "0"}] if self.times else []}
+        return payload
+
+
+def collect_with(server, client):
+    c = HistoryCollector(OkxSource(), client, SYMBOLS, max_rows=ROWS, batch=50, rate=1000, retries=2, backoff=0)
+    return asyncio.run(c.run())
+
+
+def test_empty_book_is_retried(server):
+    client = RequestsClient(server.url)
+    try:
+        stats = collect_with(server, EmptyBooks(client, "ETH-USDT", times=2))
+    finally:
+        client.close()
+    assert stats['rows'] == ROWS * len(SYMBOLS)
+    assert stats['skipped_pages'] == 0 and stats['retried'] == 2
+
+
+def test_one_sided_book_skips_the_page_not_the_run(server):
+    client = RequestsClient(server.url)
+    try:
+        stats = collect_with(server, EmptyBooks(client, "ETH-USDT"))
+    finally:
+        client.close()
+    assert stats['symbols']['BTC-USDT']['rows'] == ROWS
+    assert stats['symbols']['ETH-USDT']['rows'] == 0
+    assert stats['skipped_pages'] > 0
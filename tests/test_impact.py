@@ -0,0 +1,24 @@
+import pytest
+from models.impact import TrajectoryCache, calculate_impact
+
+BOOK = [[100.0 + 0.01 * i, 1.0] for i in range(5)]
+PARAMS = {'gamma': 0.45, 'T': 1.0, 'N': 100}
+
+
+def test_unsolvable_parameters_are_cached():
+    cache = TrajectoryCache()
+    for _ in range(3):
+        with pytest.raises(ZeroDivisionError):
+            cache.calculate_impact(BOOK, 1e5, 0.5, delta=0.5, lam=1e-6, **PARAMS)
+    assert cache.stats()['misses'] == 1
+    assert cache.stats()['hits'] == 2
+
+
+def test_one_solve_serves_every_sigma_and_lam():
+    cache = TrajectoryCache()
+    for sigma, lam in ((0.1, 1e-6), (0.5, 1e-6), (0.73, 1e-4)):
+        _, cached = cache.calculate_impact(BOOK, 1e5, sigma, delta=0.3, gamma=0.45, lam=lam)
+        _, exact = calculate_impact(BOOK, 1e5, sigma, delta=0.3, gamma=0.45, lam=lam)
+        assert cached['transient'] == pytest.approx(exact['transient'], rel=1e-12)
+        assert cached['risk'] == pytest.approx(exact['risk'], rel=1e-12)
+    assert cache.stats()['misses'] == 1
@@ -0,0 +1,62 @@
+import sys
+import threading
+from utils.latency import LatencyTracker
+
+RECORDS = 100_000
+
+
+class StepClock:
+    """Monotonic clock advanced by the recording thread: one 1 s interval every 1000 records."""
+
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+def test_concurrent_record_and_summary():
+    clock = StepClock()
+    tracker = LatencyTracker(stages=('model',), clock=clock)
+    stop = threading.Event()
+    mismatched = []
+
+    def reader():
+        while not stop.is_set():
+            for window in ('1s', '1m'):
+                hist = tracker.stages['model'].window(tracker.WINDOWS[window])
+                if int(hist.counts.sum()) != hist.count:
+                    mismatched.append((window, int(hist.counts.sum()), hist.count))
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        thread = threading.Thread(target=reader)
+        thread.start()
+        for i in range(RECORDS):
+            if i % 1000 == 0:
+                clock.t += 1.0
+            tracker.record('model', 0.5)
+        stop.set()
+        thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+
+    assert mismatched == []
+    assert tracker.stages['model'].session.count == RECORDS
+    # The current interval and the 60 before it
+    assert tracker.stages['model'].window(60.0).count == 61 * 1000
+    assert tracker.stages['model'].window(1.0).count == 2 * 1000
+
+
+def test_window_covers_the_previous_interval():
+    clock = StepClock()
+    tracker = LatencyTracker(stages=('model',), clock=clock)
+    clock.t = 10.9
+    tracker.record('model', 1.0)
+    # Just after the second boundary the last second's samples are still reported
+    clock.t = 11.01
+    assert tracker.summary('1s')['model']['count'] == 1
+    clock.t = 12.01
+    assert tracker.summary('1s')['model']['count'] == 0
+    assert tracker.summary('session')['model']['count'] == 1
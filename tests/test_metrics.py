@@ -0,0 +1,25 @@
+from utils.metrics import FIELDS, MetricsSink, read_metrics
+
+
+def record(path, ts):
+    with MetricsSink(path) as sink:
+        for t in ts:
+            sink.record((t,) + (0.0,) * (len(FIELDS) - 1))
+
+
+def test_sessions_append_to_the_file(tmp_path):
+    path = str(tmp_path / "tick_metrics.vlm")
+    record(path, range(10))
+    record(path, range(10, 15))
+    assert list(read_metrics(path)['ts']) == list(range(15))
+
+
+def test_incomplete_block_is_cut_before_appending(tmp_path):
+    path = str(tmp_path / "tick_metrics.vlm")
+    record(path, range(10))
+    # An interrupted session: block header and part of a column
+    with open(path, "ab") as fh:
+        fh.write((3).to_bytes(4, "little") + b"\0" * 5)
+    assert list(read_metrics(path)['ts']) == list(range(10))
+    record(path, range(10, 12))
+    assert list(read_metrics(path)['ts']) == list(range(12))
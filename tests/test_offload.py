@@ -0,0 +1,42 @@
+import asyncio
+from engine import ConnectionManager, CostCalculator
+from models.offload import ImpactPool
+from utils.synthetic import SyntheticBook
+from utils.volume import VolumeCache
+
+AC_PARAMS = {'delta': 0.3, 'gamma': 0.45, 'lam': 1e-6, 'T': 1.0, 'N': 400}
+INSTRUMENTS = 4
+
+
+def test_close_with_outstanding_work():
+    async def main():
+        loop = asyncio.get_running_loop()
+        unhandled = []
+        loop.set_exception_handler(lambda loop, context: unhandled.append(context))
+        statuses, results = [], []
+        calcs = []
+        for i in range(INSTRUMENTS):
+            calc = CostCalculator(f"SYN{i}-USDT", 1e5, "Tier 1", 0.5, VolumeCache(lambda inst: 5000.0),
+                                  dict(AC_PARAMS, delta=0.3 + 0.01 * i))
+            calc.vol_cache.set(calc.asset, 5000.0)
+            calc.process(SyntheticBook(calc.asset, depth=50).snapshot())
+            calcs.append(calc)
+        pool = ImpactPool(1, depth=50)
+        manager = ConnectionManager(calcs, on_result=results.append,
+                                    on_status=lambda kind, detail: statuses.append((kind, detail)),
+                                    impact_pool=pool)
+        # One request in flight and one waiting per instrument, most of them queued behind a single worker
+        futures = []
+        for _ in range(2):
+            for calc in calcs:
+                manager._submit_impact(calc, (0.0, 0.0, 0.0, 0.0))
+        for state in pool._instruments.values():
+            futures.append(state.pending[-1])
+        pool.close()
+        await asyncio.sleep(0.2)
+        return unhandled, statuses, futures
+
+    unhandled, statuses, futures = asyncio.run(main())
+    assert unhandled == []
+    assert [s for s in statuses if s[0] == 'error'] == []
+    assert all(fut.cancelled() for fut in futures)
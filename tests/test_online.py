@@ -0,0 +1,10 @@
+import numpy as np
+from models.online import FILL_FIELDS, FillBuffer
+
+
+def test_extend_past_capacity_keeps_the_newest_fills():
+    buf = FillBuffer(capacity=100)
+    buf.append(*range(len(FILL_FIELDS)))
+    buf.extend({name: np.arange(250.0) for name in FILL_FIELDS})
+    assert buf.total == 251
+    assert list(buf.window()['ts']) == list(np.arange(150.0, 250.0))
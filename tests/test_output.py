@@ -0,0 +1,35 @@
+import asyncio
+from veloz.output import JsonLinesWriter
+
+
+def test_writer_batches_lines_and_closes_its_file(tmp_path):
+    path = tmp_path / "out.jsonl"
+    writer = JsonLinesWriter(str(path), flush_interval=0.05)
+
+    async def main():
+        for i in range(100):
+            writer.publish(b'{"n":%d}\n' % i)
+        assert path.read_bytes() == b""
+        await asyncio.sleep(0.1)
+        assert len(path.read_bytes().splitlines()) == 100
+        writer.publish(b'{"n":100}\n')
+
+    asyncio.run(main())
+    writer.close()
+    assert writer.stream.closed
+    assert writer.flushes == 2
+    assert len(path.read_bytes().splitlines()) == 101
+
+
+def test_writer_leaves_a_given_stream_open(tmp_path):
+    with open(tmp_path / "out.jsonl", "wb") as fh:
+        writer = JsonLinesWriter(fh, max_buffer=10)
+
+        async def main():
+            writer.publish(b'{"n":0}\n')
+            writer.publish(b'{"n":1}\n')  # over max_buffer: written without waiting
+            assert writer.flushes == 1
+
+        asyncio.run(main())
+        writer.close()
+        assert not fh.closed
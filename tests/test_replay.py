@@ -0,0 +1,54 @@
+import json
+import pytest
+from engine import CostCalculator
+from utils.replay import FrameRecorder, replay
+from utils.synthetic import SyntheticBook
+from utils.volume import VolumeCache
+
+UPDATES = 200
+
+
+def calculator():
+    calc = CostCalculator("SYN-USDT", 1e5, "Tier 1", 0.5, VolumeCache(lambda inst: 5000.0))
+    calc.vol_cache.set(calc.asset, 5000.0)
+    return calc
+
+
+def record(path, trade_every):
+    feed = SyntheticBook("SYN-USDT", depth=50, seed=3)
+    messages = list(feed.messages(UPDATES, trade_every=trade_every))
+    with FrameRecorder(str(path)) as rec:
+        for msg in messages:
+            rec.write(msg)
+    return messages
+
+
+@pytest.mark.parametrize("trade_every", [0, 4])
+def test_replay_with_interleaved_trades(tmp_path, trade_every):
+    path = tmp_path / "feed.bin"
+    messages = record(path, trade_every)
+    books = sum(1 for msg in messages if json.loads(msg)['arg']['channel'] == 'books')
+    calc = calculator()
+    stats = replay(str(path), calc.process)
+    assert stats['errors'] == 0
+    assert stats['ticks'] == books == UPDATES + 1
+    assert calc.book.resyncs == 0
+    assert len(calc.book.asks()) and len(calc.book.bids())
+
+
+def test_frames_without_action_or_for_other_channels_leave_the_book_alone():
+    feed = SyntheticBook("SYN-USDT", depth=50, seed=3)
+    calc = calculator()
+    assert calc.process(feed.snapshot()) is not None
+    depth = len(calc.book.asks())
+    trade = feed.trade()
+    assert calc.process(trade) is None
+    assert calc.apply(json.loads(trade)) is False
+    # A books frame without an action is not taken for a snapshot
+    no_action = json.loads(feed.update())
+    del no_action['action']
+    no_action['data'][0]['asks'] = [["1.0", "1", "0", "1"]]
+    assert calc.apply(no_action) is False
+    assert len(calc.book.asks()) == depth
+    other = feed.snapshot().replace('"instId": "SYN-USDT"', '"instId": "OTHER-USDT"')
+    assert calc.process(other) is None
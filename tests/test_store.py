@@ -0,0 +1,125 @@
+import json
+import asyncio
+import numpy as np
+import pytest
+from utils.history import HistoryCollector, OkxSource, RequestsClient
+from utils.mock_rest import MockRestServer
+from utils.replay import FrameRecorder
+from utils.store import MarketStore, ingest_recording
+
+ROWS = 300
+DAY0 = 1_700_000_000_000
+
+
+def write(store, ts, **kwargs):
+    with store.writer("books", "BTC-USDT", **kwargs) as w:
+        w.extend({'ts': ts, 'best_bid': ts * 0.0 + 1, 'best_ask': ts * 0.0 + 2,
+                  'bid_depth5': ts * 0.0 + 3, 'ask_depth5': ts * 0.0 + 4})
+    return w
+
+
+def test_replace_rebuilds_instead_of_appending(tmp_path):
+    store = MarketStore(str(tmp_path))
+    ts = DAY0 + np.arange(100)
+    write(store, ts, build="x-1", replace="x-")
+    write(store, ts, build="x-2", replace="x-")
+    assert len(store.read("books", "BTC-USDT")['ts']) == 100
+    # Without replace, parts are appended
+    write(store, ts)
+    assert len(store.read("books", "BTC-USDT")['ts']) == 200
+
+
+def test_replace_only_touches_its_time_range(tmp_path):
+    store = MarketStore(str(tmp_path))
+    write(store, DAY0 + np.arange(100), build="x-1", replace="x-")
+    write(store, DAY0 + np.arange(50, 150), build="x-2", replace="x-")
+    write(store, DAY0 + 86400 * 1000 * 2 + np.arange(10), build="x-3", replace="x-")
+    assert list(store.read("books", "BTC-USDT")['ts']) == list(DAY0 + np.arange(150)) + \
+        list(DAY0 + 86400 * 1000 * 2 + np.arange(10))
+
+
+def test_drop_build(tmp_path):
+    store = MarketStore(str(tmp_path))
+    a = write(store, DAY0 + np.arange(10), build="a")
+    write(store, DAY0 + np.arange(10, 20), build="a")
+    write(store, DAY0 + np.arange(20, 30), build="b")
+    assert store.drop_build("a", keep=a.written) == 1
+    assert list(store.read("books")['ts']) == list(DAY0 + np.r_[np.arange(10), np.arange(20, 30)])
+
+
+@pytest.fixture(scope="module")
+def server():
+    server = MockRestServer(port=0, pool=ROWS * 2).start()
+    yield server
+    server.stop()
+
+
+def collect(server, root, checkpoint, cancel_after=None):
+    client = RequestsClient(server.url)
+    collector = HistoryCollector(OkxSource(), client, ["BTC-USDT"], max_rows=ROWS, batch=50, rate=1000,
+                                 store=MarketStore(root), checkpoint=checkpoint, checkpoint_every=1)
+
+    async def main():
+        task = asyncio.ensure_future(collector.run())
+        while cancel_after is not None and not task.done() and collector.rows < cancel_after:
+            await asyncio.sleep(0.001)
+        if cancel_after is not None and not task.done():
+            task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    try:
+        asyncio.run(main())
+    finally:
+        client.close()
+    return collector
+
+
+def test_history_rebuild_is_idempotent(server, tmp_path):
+    root, checkpoint = str(tmp_path / "store"), str(tmp_path / "checkpoint.json")
+    collect(server, root, checkpoint)
+    first = MarketStore(root).read("trades", "BTC-USDT")
+    collect(server, root, checkpoint)
+    second = MarketStore(root).read("trades", "BTC-USDT")
+    assert len(first['ts']) == len(second['ts']) == ROWS
+    assert (first['ts'] == second['ts']).all()
+
+
+def test_history_resume_drops_parts_after_the_checkpoint(server, tmp_path):
+    root, checkpoint = str(tmp_path / "store"), str(tmp_path / "checkpoint.json")
+    collect(server, root, checkpoint, cancel_after=ROWS // 2)
+    with open(checkpoint) as fh:
+        build = json.load(fh)['build']
+    # A part flushed by a hard-killed run just before its next checkpoint
+    write_trades = MarketStore(root).writer("trades", "BTC-USDT", build=build)
+    write_trades.append(DAY0, 1.0, 1.0, 1, 1.0, 2.0, 3.0, 4.0, 5.0, 1)
+    write_trades.close()
+    collect(server, root, checkpoint)
+    cols = MarketStore(root).read("trades", "BTC-USDT")
+    assert len(cols['ts']) == ROWS
+    assert DAY0 not in cols['ts']
+
+
+def record_trades(path, n, ts0=DAY0):
+    book = {'asks': [["101", "1", "0", "1"]], 'bids': [["99", "1", "0", "1"]], 'ts': str(ts0)}
+    with FrameRecorder(path) as rec:
+        rec.write(json.dumps({'arg': {'channel': 'books', 'instId': 'BTC-USDT'}, 'action': 'snapshot',
+                              'data': [book]}))
+        for i in range(n):
+            trade = {'ts': str(ts0 + i), 'px': "100", 'sz': "1", 'side': "buy"}
+            rec.write(json.dumps({'arg': {'channel': 'trades', 'instId': 'BTC-USDT'}, 'data': [trade]}))
+
+
+def test_history_rebuild_keeps_ingested_parts(server, tmp_path):
+    root, checkpoint = str(tmp_path / "store"), str(tmp_path / "checkpoint.json")
+    collector = collect(server, root, checkpoint)
+    cols = MarketStore(root).read("trades", "BTC-USDT")
+    # A recording of the same day, an hour before the collected trades
+    recording = str(tmp_path / "day.rec")
+    record_trades(recording, 100, int(cols['ts'].min()) - 3600 * 1000)
+    assert ingest_recording(recording, MarketStore(root))['trades'] == 100
+    collect(server, root, checkpoint)
+    assert len(MarketStore(root).read("trades", "BTC-USDT")['ts']) == ROWS + 100
+    assert collector.build.startswith("history-okx-")
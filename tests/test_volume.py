@@ -0,0 +1,31 @@
+import asyncio
+from utils.volume import VolumeCache
+
+
+def test_fetch_errors_are_reported_until_the_first_value():
+    calls = []
+
+    def fetch(inst):
+        calls.append(inst)
+        if len(calls) <= 2:
+            raise IndexError("list index out of range")
+        return 5000.0
+
+    cache = VolumeCache(fetch, ttl=0.0)
+    errors = []
+
+    async def main():
+        task = asyncio.ensure_future(cache.run(["NOPE-USDT"], poll=0.001, on_error=lambda *e: errors.append(e)))
+        while len(calls) < 3:
+            await asyncio.sleep(0.001)
+        # Once a value is cached, later failures only count
+        cache.fetcher = lambda inst: 1 / 0
+        while cache.errors < 3:
+            await asyncio.sleep(0.001)
+        task.cancel()
+
+    asyncio.run(main())
+    assert [(inst, type(e)) for inst, e in errors] == [("NOPE-USDT", IndexError)] * 2
+    assert cache.get("NOPE-USDT")[0] == 5000.0
+    assert cache.stats()['errors'] >= 3
+    assert "ZeroDivisionError" in cache.stats()['last_error']
@@ -1,8 +1,55 @@
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QTextEdit, QComboBox
+import time
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, QLineEdit, QPushButton,
+                             QPlainTextEdit, QComboBox)
 from PyQt5.QtGui import QFont
-from PyQt5.QtCore import Qt
-from websocket_client import fetch_available_assets
+from PyQt5.QtCore import Qt, QTimer
+from websocket_client import AssetListLoader, load_cached_assets
 from websocket_client import WebSocketClient
+from utils.decode import format_ts
+
+# The output panel shows the latest result at most RENDER_HZ times a second;
+# results published in between are counted as dropped frames
+RENDER_HZ = 20
+SCROLLBACK_LINES = 500
+
+OUTPUT_FIELDS = [
+    ("timestamp", "Timestamp:"),
+    ("slippage", "Slippage:"),
+    ("slippage_book", "Book Slippage:"),
+    ("impact", "Impact:"),
+    ("sigma", "Sigma:"),
+    ("fee", "Fee:"),
+    ("net_cost", "Net Cost:"),
+    ("maker_taker", "Maker/Taker:"),
+    ("network", "Network Lat:"),
+    ("queue", "Queue Wait:"),
+    ("staleness", "Staleness:"),
+    ("vol_age", "Vol24h Age:"),
+    ("frames", "Frames:"),
+]
+
+
+def format_result(result):
+    """Display strings for the output fields of one cost result."""
+    latency = result['latency']
+    impact_breakdown = result['impact_breakdown']
+    return {
+        "timestamp": format_ts(result['ts']),
+        "slippage": f"{result['slippage']:.2f}",
+        "slippage_book": f"{result['slippage_book']:.2f} ({result['book_levels']} levels)",
+        "impact": (f"{result['impact']:.2f} "
+                   f"(transient={impact_breakdown.get('transient',0):.2f}, "
+                   f"perm={impact_breakdown.get('permanent',0):.2f}, "
+                   f"risk={impact_breakdown.get('risk',0):.2f})"),
+        "sigma": f"{result['sigma']:.4f}",
+        "fee": f"{result['fee']:.2f}",
+        "net_cost": f"{result['net_cost']:.2f}",
+        "maker_taker": result['maker_taker'],
+        "network": f"{latency['network_ms']:.3f} ms",
+        "queue": f"{latency['queue_ms']:.3f} ms",
+        "staleness": f"{latency['staleness_ms']:.3f} ms",
+        "vol_age": f"{result['vol24h_age']:.1f} s",
+    }
 
 class TradeSimulatorUI(QWidget):
     def __init__(self):
@@ -30,6 +77,14 @@ class TradeSimulatorUI(QWidget):
         self.populate_assets()
         self.ws_thread = None
 
+        # Rendering is driven by a timer, not by every tick
+        self.rendered = 0
+        self.dropped_frames = 0
+        self._last_published = 0
+        self.render_timer = QTimer(self)
+        self.render_timer.setInterval(1000 // RENDER_HZ)
+        self.render_timer.timeout.connect(self._render)
+
     def _init_input_panel(self):
         input_layout = QVBoxLayout()
         font = QFont("Arial", 28, QFont.Bold)
@@ -41,6 +96,9 @@ class TradeSimulatorUI(QWidget):
         self.order_type = QLineEdit("Market")
         self.qty_input = QLineEdit("100")
         self.vol_input = QLineEdit("0.5")
+        # Static: the value above; EWMA/Window: realized volatility of the mid, starting from it
+        self.sigma_input = QComboBox()
+        self.sigma_input.addItems(["Static", "EWMA", "Window"])
         self.fee_input = QComboBox()
         self.fee_input.addItems(["Tier 1", "Tier 2", "Tier 3"])
         start_btn = QPushButton("Start Simulation")
@@ -54,6 +112,7 @@ class TradeSimulatorUI(QWidget):
             ("Order Type:", self.order_type),
             ("Order Quantity (USD):", self.qty_input),
             ("Volatility:", self.vol_input),
+            ("Volatility Source:", self.sigma_input),
             ("Fee Tier:", self.fee_input),
         ]:
             label = QLabel(label_text)
@@ -66,13 +125,56 @@ class TradeSimulatorUI(QWidget):
         self.layout.addLayout(input_layout)
 
     def _init_output_panel(self):
-        self.output_box = QTextEdit()
-        self.output_box.setReadOnly(True)
-        self.output_box.setStyleSheet("""
-            QTextEdit { background-color: black; color: white; font-weight: bold;
-                       font-size: 14pt; border-radius: 20px; padding: 8px; }
+        self.output_panel = QWidget()
+        self.output_panel.setStyleSheet("""
+            QWidget { background-color: black; color: white; font-weight: bold;
+                      font-size: 14pt; border-radius: 20px; }
+            QLabel { font-size: 14pt; padding: 2px 8px; }
         """)
-        self.layout.addWidget(self.output_box)
+        output_layout = QVBoxLayout(self.output_panel)
+
+        # Fixed fields, overwritten in place with the latest result
+        fields = QGridLayout()
+        self.output_fields = {}
+        for row, (key, label_text) in enumerate(OUTPUT_FIELDS):
+            fields.addWidget(QLabel(label_text), row, 0)
+            value = QLabel("-")
+            value.setTextInteractionFlags(Qt.TextSelectableByMouse)
+            fields.addWidget(value, row, 1)
+            self.output_fields[key] = value
+        output_layout.addLayout(fields)
+
+        # Bounded scrollback of rendered results and status messages
+        self.output_box = QPlainTextEdit()
+        self.output_box.setReadOnly(True)
+        self.output_box.setMaximumBlockCount(SCROLLBACK_LINES)
+        self.output_box.setStyleSheet("QPlainTextEdit { font-size: 11pt; padding: 8px; }")
+        output_layout.addWidget(self.output_box)
+        self.layout.addWidget(self.output_panel)
+
+    def _log(self, text):
+        self.output_box.appendPlainText(text.rstrip("\n"))
+
+    def _render(self):
+        if not self.ws_thread:
+            return
+        published, result = self.ws_thread.latest()
+        if result is None or published == self._last_published:
+            return
+        self.dropped_frames += published - self._last_published - 1
+        self._last_published = published
+
+        render_start = time.perf_counter()
+        values = format_result(result)
+        values["frames"] = f"{self.rendered + 1} rendered, {self.dropped_frames} dropped"
+        for key, text in values.items():
+            self.output_fields[key].setText(text)
+        self._log(f"{values['timestamp']}  net={values['net_cost']}  slip={values['slippage']}  "
+                  f"impact={result['impact']:.2f}  fee={values['fee']}  {values['maker_taker']}")
+        # Paint now so the measurement covers the actual redraw, not just the setText calls
+        self.output_panel.repaint()
+        self.ws_thread.record_render(result, (time.perf_counter() - render_start) * 1000)
+        self.rendered += 1
 
     def start_simulation(self):
         self.output_box.clear()
@@ -81,7 +183,7 @@ class TradeSimulatorUI(QWidget):
         # Disconnect previous connections
         if self.ws_thread:
             try:
-                self.ws_thread.tick_signal.disconnect()
+                self.ws_thread.status_signal.disconnect()
             except:
                 pass
         
@@ -89,21 +191,45 @@ class TradeSimulatorUI(QWidget):
         qty = self.qty_input.text().strip()
         vol = self.vol_input.text().strip()
         fee_tier = self.fee_input.currentText()
+        sigma_source = self.sigma_input.currentText().lower()
         
-        self.ws_thread = WebSocketClient(asset, qty, fee_tier, vol)
-        self.ws_thread.tick_signal.connect(self.output_box.append)
+        self.ws_thread = WebSocketClient(asset, qty, fee_tier, vol, sigma_source=sigma_source)
+        self.ws_thread.status_signal.connect(self._log)
+        self.rendered = 0
+        self.dropped_frames = 0
+        self._last_published = 0
         self.ws_thread.start()
+        self.render_timer.start()
 
     def stop_simulation(self):
         if self.ws_thread:
             self.ws_thread.stop()
             self.ws_thread.wait()
-            self.output_box.append("Simulation stopped.\n")
+            self.render_timer.stop()
+            self._render()
+            self._log(f"Simulation stopped. {self.rendered} frames rendered, "
+                      f"{self.dropped_frames} dropped.")
 
     def populate_assets(self):
-        assets = fetch_available_assets()
+        # Show the cached list immediately and refresh it in the background
+        self._set_assets(load_cached_assets())
+        self.asset_loader = AssetListLoader(self)
+        self.asset_loader.assets_signal.connect(self._on_assets_loaded)
+        self.asset_loader.start()
+
+    def _on_assets_loaded(self, assets):
+        if assets:
+            self._set_assets(assets)
+        elif self.asset_input.currentText() == "Loading assets...":
+            # Nothing cached and the fetch failed
+            self.asset_input.setItemText(0, "Failed to load assets")
+
+    def _set_assets(self, assets):
+        current = self.asset_input.currentText()
         self.asset_input.clear()
         if assets:
             self.asset_input.addItems(assets)
+            if current in assets:
+                self.asset_input.setCurrentText(current)
         else:
-            self.asset_input.addItem("Failed to load assets")
+            self.asset_input.addItem("Loading assets...")
@@ -0,0 +1,54 @@
+"""
+Frame decoding for the feed: a pluggable JSON decoder (orjson when it is
+installed, the stdlib otherwise), a cheap look at a frame's channel and
+instrument before the payload is decoded, and timestamp formatting for the
+presentation layer.
+"""
+import json
+from datetime import datetime
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+DECODERS = {'json': json.loads}
+if orjson is not None:
+    DECODERS['orjson'] = orjson.loads
+
+
+def get_decoder(name="auto"):
+    """Decoder function by name; 'auto' is the fastest one available."""
+    if name == "auto":
+        return DECODERS.get('orjson', json.loads)
+    if name not in DECODERS:
+        raise ValueError(f"unknown decoder {name!r}; available: {', '.join(DECODERS)}")
+    return DECODERS[name]
+
+
+def _string_field(text, key):
+    start = text.find(key)
+    if start < 0:
+        return None
+    start = text.find('"', start + len(key)) + 1
+    return text[start:text.find('"', start)]
+
+
+def peek_arg(msg):
+    """
+    (channel, instId) of an OKX push frame, read from its leading `arg`
+    object without decoding the rest of the message; None for frames that
+    do not start with one (events, errors).
+    """
+    if not msg.startswith('{"arg"'):
+        return None
+    end = msg.find('}', 6, 256)
+    if end < 0:
+        return None
+    arg = msg[6:end]
+    return _string_field(arg, '"channel"'), _string_field(arg, '"instId"')
+
+
+def format_ts(ts_ms):
+    """Exchange timestamp (ms) as local 'YYYY-MM-DD HH:MM:SS.mmm' for display."""
+    return datetime.fromtimestamp(ts_ms / 1000.0).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
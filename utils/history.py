@@ -0,0 +1,387 @@
+"""
+Concurrent, resumable collectors for the model training data: trade
+history paged from the exchange REST API, each page joined with a top-5
+book snapshot taken alongside it, streamed to CSV and the columnar store.
+
+    python -m utils.history okx BTC-USDT ETH-USDT --rows 5000 --csv slippage_history.csv
+    python -m utils.history binance BTCUSDT --csv maker_taker_history.csv --base-url http://127.0.0.1:8780
+
+Symbols are collected concurrently under one token-bucket rate limit over a
+pooled keep-alive HTTP session. Cursors are checkpointed after the rows
+before them are flushed, so an interrupted run resumes where it stopped.
+The HTTP layer is any object with `async get_json(path, params)`;
+utils/mock_rest.py serves the same endpoints locally.
+"""
+import os
+import csv
+import json
+import time
+import asyncio
+import argparse
+
+
+class TokenBucket:
+    """Async rate limiter: `rate` requests/s on average, bursts of up to `burst`."""
+
+    def __init__(self, rate, burst=None, clock=time.monotonic):
+        self.rate = float(rate)
+        self.burst = float(burst or max(rate, 1.0))
+        self.clock = clock
+        self.tokens = self.burst
+        self.waits = 0
+        self._last = clock()
+
+    async def acquire(self, n=1):
+        while True:
+            now = self.clock()
+            self.tokens = min(self.burst, self.tokens + (now - self._last) * self.rate)
+            self._last = now
+            if self.tokens >= n:
+                self.tokens -= n
+                return
+            self.waits += 1
+            await asyncio.sleep((n - self.tokens) / self.rate)
+
+
+class HttpError(Exception):
+    """Non-2xx response; `status` is the HTTP status code."""
+
+    def __init__(self, status, body=""):
+        super().__init__(f"HTTP {status}: {body[:200]}")
+        self.status = status
+
+
+class RequestsClient:
+    """
+    requests.Session with a keep-alive connection pool, each blocking call
+    run in a worker thread so several requests are in flight at once.
+    """
+
+    def __init__(self, base_url, pool_size=8, timeout=5.0):
+        import requests  # deferred like utils.volume: slow to import
+        from requests.adapters import HTTPAdapter
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _get(self, path, params):
+        resp = self.session.get(self.base_url + path, params=params, timeout=self.timeout)
+        if resp.status_code >= 300:
+            raise HttpError(resp.status_code, resp.text)
+        return resp.json()
+
+    async def get_json(self, path, params=None):
+        return await asyncio.to_thread(self._get, path, params)
+
+    def close(self):
+        self.session.close()
+
+
+class OkxSource:
+    """OKX history-trades paged newest first; rows for slippage_history.csv."""
+
+    name = "okx"
+    base_url = "https://www.okx.com"
+    max_batch = 100
+    csv_header = ["exec_price", "mid_price_at_submit", "spread", "depth5", "vol24h", "order_size"]
+
+    def volume_request(self, symbol):
+        return "/api/v5/market/ticker", {"instId": symbol}
+
+    def parse_volume(self, payload):
+        return float(payload.get("data", [{}])[0].get("vol24h", 0.0))
+
+    def trades_request(self, symbol, cursor, limit):
+        return "/api/v5/market/history-trades", {"instId": symbol, "limit": limit, "after": cursor or ""}
+
+    def parse_trades(self, payload):
+        """([(ts, px, sz, side, is_taker)], next cursor); public trades are taker fills."""
+        data = payload.get("data", [])
+        rows = [(int(t["ts"]), float(t["px"]), float(t["sz"]), 1 if t["side"] == "buy" else -1, 1) for t in data]
+        return rows, (data[-1]["tradeId"] if data else None)
+
+    def book_request(self, symbol):
+        return "/api/v5/market/books", {"instId": symbol, "sz": 5}
+
+    def parse_book(self, payload):
+        data = (payload.get("data") or [{}])[0]
+        return data.get("bids", []), data.get("asks", [])
+
+    def csv_row(self, trade, book, vol24h):
+        ts, px, sz, side, is_taker = trade
+        best_bid, best_ask, bid_depth5, ask_depth5 = book
+        mid = (best_bid + best_ask) / 2
+        return [px, mid, (best_ask - best_bid) / mid, bid_depth5 + ask_depth5, vol24h, sz * mid]
+
+
+class BinanceSource:
+    """Binance historicalTrades paged backwards by id; rows for maker_taker_history.csv."""
+
+    name = "binance"
+    base_url = "https://api.binance.com"
+    max_batch = 1000
+    csv_header = ["trade_price", "trade_size", "side", "best_bid", "best_ask", "bid_depth5", "ask_depth5", "is_taker"]
+
+    def volume_request(self, symbol):
+        return None
+
+    def trades_request(self, symbol, cursor, limit):
+        # cursor is the first id of the previous page; pages walk back to id 1
+        if cursor is None:
+            return "/api/v3/historicalTrades", {"symbol": symbol, "limit": limit}
+        cursor = int(cursor)
+        if cursor <= 1:
+            return None
+        return "/api/v3/historicalTrades", {"symbol": symbol, "limit": min(limit, cursor - 1),
+                                            "fromId": max(cursor - limit, 1)}
+
+    def parse_trades(self, payload):
+        rows = [(int(t["time"]), float(t["price"]), float(t["qty"]), -1 if t["isBuyerMaker"] else 1,
+                 int(t["isBuyerMaker"])) for t in payload]
+        return rows, (str(payload[0]["id"]) if payload else None)
+
+    def book_request(self, symbol):
+        return "/api/v3/depth", {"symbol": symbol, "limit": 5}
+
+    def parse_book(self, payload):
+        return payload.get("bids", []), payload.get("asks", [])
+
+    def csv_row(self, trade, book, vol24h):
+        ts, px, sz, side, is_taker = trade
+        best_bid, best_ask, bid_depth5, ask_depth5 = book
+        return [px, sz, "buy" if side > 0 else "sell", best_bid, best_ask, bid_depth5, ask_depth5, is_taker]
+
+
+SOURCES = {'okx': OkxSource, 'binance': BinanceSource}
+
+
+class HistoryCollector:
+    """
+    Collects up to `max_rows` trades per symbol from `source` through
+    `client`, all symbols concurrently. Each trades page is fetched together
+    with a book snapshot so the page's features are taken at the same
+    moment. Rows stream to `csv_path` and/or `store` (a MarketStore); every
+    `checkpoint_every` pages both are flushed and the cursors saved to
+    `checkpoint` with the CSV length, which a later run with the same path
+    resumes from (dropping CSV rows written after the save). Once every
+    symbol has finished the checkpoint is removed, so the next run starts
+    a fresh collection.
+    Store rows replace those of earlier collections from the same source in
+    the time range they cover; other builds (e.g. ingested recordings) are
+    kept.
+    Failed requests (HTTP errors, timeouts) are retried with exponential
+    backoff up to `retries` times; so are book snapshots missing a side, and
+    a page whose book is still one-sided after that is skipped.
+    """
+
+    def __init__(self, source, client, symbols, max_rows=5000, batch=None, rate=10.0, burst=None,
+                 csv_path=None, store=None, checkpoint=None, checkpoint_every=10, retries=5, backoff=0.5):
+        self.source = source
+        self.client = client
+        self.symbols = list(symbols)
+        self.max_rows = max_rows
+        self.batch = min(batch or source.max_batch, source.max_batch)
+        self.bucket = TokenBucket(rate, burst)
+        self.csv_path = csv_path
+        self.store = store
+        self.checkpoint = checkpoint
+        self.checkpoint_every = checkpoint_every
+        self.retries = retries
+        self.backoff = backoff
+        self.requests = 0
+        self.retried = 0
+        self.pages = 0
+        self.skipped_pages = 0
+        self.rows = 0
+        self.elapsed = 0.0
+        self.csv_offset = None
+        self.build = None
+        self.state = self._load_checkpoint()
+        # One build id per collection: its store rows replace those of earlier collections from this source
+        self.build_prefix = f"history-{source.name}-"
+        self.build = self.build or f"{self.build_prefix}{os.getpid()}-{time.time_ns()}"
+        self._writers = {}
+        self._csv_fh = None
+        self._csv = None
+
+    def _load_checkpoint(self):
+        if self.checkpoint and os.path.exists(self.checkpoint):
+            with open(self.checkpoint) as fh:
+                saved = json.load(fh)
+            if saved.get('source') == self.source.name:
+                self.csv_offset = saved.get('csv_offset')
+                self.build = saved.get('build')
+                return saved['symbols']
+        return {}
+
+    def _save_checkpoint(self):
+        """Flush every sink, then atomically replace the checkpoint."""
+        if self._csv_fh is not None:
+            self._csv_fh.flush()
+            self.csv_offset = self._csv_fh.tell()
+        for symbol, writer in self._writers.items():
+            writer.flush()
+            self.state[symbol].setdefault('parts', []).extend(writer.written)
+            writer.written = []
+        if not self.checkpoint:
+            return
+        tmp = self.checkpoint + ".tmp"
+        with open(tmp, "w") as fh:
+            json.dump({'source': self.source.name, 'build': self.build, 'symbols': self.state,
+                       'csv_offset': self.csv_offset}, fh)
+        os.replace(tmp, self.checkpoint)
+
+    async def _get(self, request):
+        path, params = request
+        for attempt in range(self.retries + 1):
+            await self.bucket.acquire()
+            self.requests += 1
+            try:
+                return await self.client.get_json(path, params)
+            except Exception:
+                if attempt == self.retries:
+                    raise
+                self.retried += 1
+                await asyncio.sleep(self.backoff * 2 ** attempt)
+
+    async def _book(self, symbol):
+        """(best bid, best ask, bid depth5, ask depth5), or None if the book stays empty or one-sided."""
+        for attempt in range(self.retries + 1):
+            bids, asks = self.source.parse_book(await self._get(self.source.book_request(symbol)))
+            if bids and asks:
+                return (float(bids[0][0]), float(asks[0][0]),
+                        sum(float(lvl[1]) for lvl in bids[:5]), sum(float(lvl[1]) for lvl in asks[:5]))
+            if attempt < self.retries:
+                self.retried += 1
+                await asyncio.sleep(self.backoff * 2 ** attempt)
+        return None
+
+    def _write(self, symbol, trades, book, vol24h):
+        if self._csv is not None:
+            self._csv.writerows(self.source.csv_row(trade, book, vol24h) for trade in trades)
+        if self.store is not None:
+            writer = self._writers.get(symbol)
+            if writer is None:
+                writer = self._writers[symbol] = self.store.writer("trades", symbol, build=self.build,
+                                                                   replace=self.build_prefix)
+            for trade in trades:
+                ts, px, sz, side, is_taker = trade
+                writer.append(ts, px, sz, side, *book, vol24h, is_taker)
+
+    async def _collect(self, symbol):
+        state = self.state.setdefault(symbol, {'cursor': None, 'rows': 0, 'done': False})
+        vol24h = float("nan")
+        volume = self.source.volume_request(symbol)
+        if volume is not None:
+            vol24h = self.source.parse_volume(await self._get(volume))
+
+        pages = 0
+        while not state['done'] and state['rows'] < self.max_rows:
+            request = self.source.trades_request(symbol, state['cursor'], self.batch)
+            if request is None:
+                state['done'] = True
+                break
+            trades_payload, book = await asyncio.gather(self._get(request), self._book(symbol))
+            trades, cursor = self.source.parse_trades(trades_payload)
+            if not trades:
+                state['done'] = True
+                break
+            trades = trades[:self.max_rows - state['rows']]
+            state['cursor'] = cursor
+            if book is None:
+                # No features to join the trades with; move on to the next page
+                self.skipped_pages += 1
+            else:
+                self._write(symbol, trades, book, vol24h)
+                state['rows'] += len(trades)
+                self.rows += len(trades)
+            self.pages += 1
+            pages += 1
+            if pages % self.checkpoint_every == 0:
+                self._save_checkpoint()
+        self._save_checkpoint()
+
+    async def run(self):
+        if self.csv_path:
+            new = not os.path.exists(self.csv_path) or not self.state
+            self._csv_fh = open(self.csv_path, "w" if new else "a", newline="")
+            if not new and self.csv_offset is not None:
+                # Rows flushed after the last checkpoint are collected again
+                self._csv_fh.truncate(self.csv_offset)
+            self._csv = csv.writer(self._csv_fh)
+            if new:
+                self._csv.writerow(self.source.csv_header)
+        if self.store is not None:
+            # Parts written after the last checkpoint are collected again
+            for symbol, state in self.state.items():
+                self.store.drop_build(self.build, "trades", symbol, keep=state.get('parts', ()))
+        start = time.perf_counter()
+        complete = False
+        try:
+            await asyncio.gather(*(self._collect(symbol) for symbol in self.symbols))
+            complete = True
+        finally:
+            self.elapsed = time.perf_counter() - start
+            self._save_checkpoint()
+            for writer in self._writers.values():
+                writer.close()
+            if self._csv_fh is not None:
+                self._csv_fh.close()
+            if complete and self.checkpoint and os.path.exists(self.checkpoint):
+                os.remove(self.checkpoint)
+        return self.stats()
+
+    def stats(self):
+        return {
+            'rows': self.rows,
+            'pages': self.pages,
+            'skipped_pages': self.skipped_pages,
+            'requests': self.requests,
+            'retried': self.retried,
+            'rate_limited': self.bucket.waits,
+            'elapsed_s': self.elapsed,
+            'rows_per_sec': self.rows / self.elapsed if self.elapsed > 0 else 0.0,
+            'symbols': {symbol: dict(state) for symbol, state in self.state.items()}
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", choices=sorted(SOURCES))
+    parser.add_argument("symbols", nargs="+")
+    parser.add_argument("--rows", type=int, default=5000, help="trades to collect per symbol")
+    parser.add_argument("--batch", type=int, help="trades per page (default: the API maximum)")
+    parser.add_argument("--rate", type=float, default=10.0, help="requests/s across all symbols")
+    parser.add_argument("--csv", help="CSV output, appended to when resuming")
+    parser.add_argument("--store", help="MarketStore root for the trades table")
+    parser.add_argument("--checkpoint", help="cursor checkpoint file; resumes an unfinished run, removed once complete")
+    parser.add_argument("--base-url", help="API root, e.g. a utils.mock_rest server")
+    parser.add_argument("--pool-size", type=int, default=8, help="keep-alive HTTP connections")
+    args = parser.parse_args(argv)
+
+    source = SOURCES[args.source]()
+    client = RequestsClient(args.base_url or source.base_url, pool_size=args.pool_size)
+    store = None
+    if args.store:
+        from utils.store import MarketStore
+        store = MarketStore(args.store)
+    collector = HistoryCollector(source, client, args.symbols, max_rows=args.rows, batch=args.batch,
+                                 rate=args.rate, csv_path=args.csv, store=store, checkpoint=args.checkpoint)
+    try:
+        stats = asyncio.run(collector.run())
+    except KeyboardInterrupt:
+        stats = collector.stats()
+        print("interrupted; rerun with the same --checkpoint to resume")
+    finally:
+        client.close()
+    print(f"{stats['rows']} rows in {stats['elapsed_s']:.1f}s ({stats['rows_per_sec']:.0f} rows/s), "
+          f"{stats['requests']} requests, {stats['retried']} retried, {stats['skipped_pages']} pages skipped "
+          f"(one-sided book)")
+    return stats
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,180 @@
 import time
+import numpy as np
 
 def measure_latency(start_time):
     return (time.time() - start_time) * 1000  # ms
+
+
+# Log-linear buckets: values below 2*_HALF us are exact, above that each
+# power of two is split into _HALF buckets (< 1% relative error)
+_SUB_BITS = 8
+_HALF = 1 << (_SUB_BITS - 1)
+
+
+def _bucket(us):
+    if us < 2 * _HALF:
+        return us
+    shift = us.bit_length() - _SUB_BITS
+    return shift * _HALF + (us >> shift)
+
+
+def _bucket_bounds(n):
+    """Lower and upper (exclusive) edge in microseconds of the first n buckets."""
+    idx = np.arange(n)
+    shift = np.maximum((idx - _HALF) // _HALF, 0)
+    lower = (idx - shift * _HALF) << shift
+    return lower, lower + (1 << shift)
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket (HDR-style) histogram of latencies in milliseconds, stored
+    with microsecond resolution up to `highest_ms`; larger values land in the
+    last bucket but still count towards max. record() is O(1) and allocation
+    free, histograms with the same range merge by adding counts.
+
+    Meant for a single writer; readers should take a copy() first.
+    """
+
+    def __init__(self, highest_ms=60000.0):
+        self.highest_ms = highest_ms
+        self._top = _bucket(int(highest_ms * 1000))
+        self.counts = np.zeros(self._top + 1, dtype=np.int64)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, ms):
+        us = int(ms * 1000)
+        if us < 0:
+            us = 0
+        idx = _bucket(us)
+        self.counts[idx if idx < self._top else self._top] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def reset(self):
+        self.counts[:] = 0
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def copy(self):
+        hist = LatencyHistogram(self.highest_ms)
+        hist.merge(self)
+        return hist
+
+    def merge(self, other):
+        if other._top != self._top:
+            raise ValueError("cannot merge histograms with different ranges")
+        self.counts += other.counts
+        self.count += other.count
+        self.total_ms += other.total_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+        return self
+
+    def percentiles(self, qs=(50, 99, 99.9)):
+        """Values (ms) at the given percentiles; bucket midpoints, capped at max."""
+        if not self.count:
+            return [0.0] * len(qs)
+        cum = self.counts.cumsum()
+        ranks = np.ceil(np.asarray(qs, dtype=float) / 100 * self.count).clip(1, self.count)
+        idx = np.searchsorted(cum, ranks)
+        lower, upper = _bucket_bounds(len(self.counts))
+        mid_ms = (lower[idx] + upper[idx] - 1) / 2000.0
+        return [min(float(v), self.max_ms) for v in mid_ms]
+
+    def summary(self):
+        p50, p99, p999 = self.percentiles()
+        return {
+            'count': self.count,
+            'mean_ms': self.total_ms / self.count if self.count else 0.0,
+            'p50_ms': p50,
+            'p99_ms': p99,
+            'p999_ms': p999,
+            'max_ms': self.max_ms
+        }
+
+
+class WindowedHistogram:
+    """
+    Rolling latency histogram: a ring of histograms of `interval_s` seconds
+    each, holding the current interval and the `intervals` before it, plus
+    a session-wide one. Reading a window merges the intervals it covers, so
+    recording stays O(1).
+
+    Lock-free for one recording thread per histogram (each stage has a
+    single writer) and any number of readers. Every slot is tagged with
+    the interval it holds; the writer recycles a slot by untagging it,
+    resetting it and tagging it again, and readers only merge slots whose
+    tag matches, before and after their copy, without modifying anything.
+    """
+
+    def __init__(self, interval_s=1.0, intervals=60, highest_ms=60000.0, clock=time.monotonic):
+        self.interval_s = interval_s
+        self.clock = clock
+        self.session = LatencyHistogram(highest_ms)
+        self._ring = [LatencyHistogram(highest_ms) for _ in range(intervals + 1)]
+        self._epochs = [-1] * len(self._ring)
+
+    def record(self, ms, now=None):
+        if now is None:
+            now = self.clock()
+        epoch = int(now / self.interval_s)
+        i = epoch % len(self._ring)
+        hist = self._ring[i]
+        if self._epochs[i] != epoch:
+            if self._epochs[i] > epoch:
+                # Older than the ring: counts towards the session only
+                self.session.record(ms)
+                return
+            self._epochs[i] = -1
+            hist.reset()
+            self._epochs[i] = epoch
+        hist.record(ms)
+        self.session.record(ms)
+
+    def window(self, seconds=None, now=None):
+        """
+        Merged histogram of the last `seconds` (None for the whole session):
+        the current, partial interval and the complete ones before it.
+        """
+        if now is None:
+            now = self.clock()
+        if seconds is None:
+            hist = self.session.copy()
+        else:
+            epoch = int(now / self.interval_s)
+            n = min(max(int(round(seconds / self.interval_s)), 1), len(self._ring) - 1)
+            hist = LatencyHistogram(self.session.highest_ms)
+            for e in range(epoch - n, epoch + 1):
+                i = e % len(self._ring)
+                if self._epochs[i] != e:
+                    continue
+                part = self._ring[i].copy()
+                if self._epochs[i] == e:
+                    hist.merge(part)
+        # A record in flight during the copy may have bumped counts but not count yet
+        hist.count = int(hist.counts.sum())
+        return hist
+
+
+class LatencyTracker:
+    """Per-stage rolling histograms; summaries cover 1 s, 1 min or the whole session."""
+
+    STAGES = ('network', 'parse', 'model', 'ui', 'e2e')
+    WINDOWS = {'1s': 1.0, '1m': 60.0, 'session': None}
+
+    def __init__(self, stages=STAGES, clock=time.monotonic):
+        self.clock = clock
+        self.stages = {stage: WindowedHistogram(clock=clock) for stage in stages}
+
+    def record(self, stage, ms, now=None):
+        self.stages[stage].record(ms, now)
+
+    def summary(self, window='1m'):
+        seconds = self.WINDOWS[window]
+        now = self.clock()
+        return {stage: hist.window(seconds, now).summary() for stage, hist in self.stages.items()}
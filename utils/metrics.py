@@ -0,0 +1,237 @@
+"""
+Per-tick metrics sink: a preallocated ring buffer filled on the hot path
+and flushed in batches by a background thread to a compact block-columnar
+file. Each session appends a header and its blocks to the file, so earlier
+recordings are kept. Inspect recordings with:
+
+    python -m utils.metrics summary logs/tick_metrics.vlm
+    python -m utils.metrics csv logs/tick_metrics.vlm out.csv
+"""
+import os
+import sys
+import json
+import struct
+import argparse
+import threading
+import numpy as np
+
+MAGIC = b"VLZM1\n"
+
+# Per-tick stage timings; `ts` is the exchange timestamp (ms), `recv` the local receive time (s)
+# and `publish_ms` the time from receive to the result being handed to the UI
+FIELDS = (
+    ('ts', '<f8'),
+    ('recv', '<f8'),
+    ('network_ms', '<f4'),
+    ('queue_ms', '<f4'),
+    ('parse_ms', '<f4'),
+    ('model_ms', '<f4'),
+    ('publish_ms', '<f4'),
+)
+
+_LEN = struct.Struct("<I")
+
+
+class MetricsSink:
+    """
+    Single-producer metrics recorder. record() copies one row into the ring
+    buffer and never touches the file; a writer thread drains the buffer
+    every `flush_interval` seconds (or once it is half full) and appends one
+    block per flush: a row count followed by each column's raw values.
+    When the writer falls a whole ring behind, new rows are counted in
+    `dropped` instead of blocking the producer.
+
+    An existing file is appended to, after cutting off a block left
+    incomplete by an interrupted session.
+    """
+
+    def __init__(self, path, fields=FIELDS, capacity=8192, flush_interval=1.0):
+        self.path = path
+        self.dtype = np.dtype(list(fields))
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.recorded = 0
+        self.written = 0
+        self.dropped = 0
+        self.blocks = 0
+        self._buf = np.zeros(capacity, dtype=self.dtype)
+        self._head = 0   # rows recorded, only advanced by the producer
+        self._tail = 0   # rows written, only advanced by the writer
+        self._wake = threading.Event()
+        self._closed = False
+
+        self._fh = open(path, "ab")
+        if self._fh.tell():
+            with open(path, "rb") as fh:
+                _, _, end = _index(fh)
+            self._fh.truncate(end)
+        header = json.dumps({'fields': [[name, fmt] for name, fmt in fields]}).encode()
+        self._fh.write(MAGIC + _LEN.pack(len(header)) + header)
+        self._writer = threading.Thread(target=self._run, name="metrics-writer", daemon=True)
+        self._writer.start()
+
+    def record(self, row):
+        """Store one tuple of values in field order; O(1), no I/O."""
+        head = self._head
+        if head - self._tail >= self.capacity:
+            self.dropped += 1
+            return False
+        self._buf[head % self.capacity] = row
+        self._head = head + 1
+        self.recorded += 1
+        if head - self._tail == self.capacity // 2:
+            self._wake.set()
+        return True
+
+    def _drain(self):
+        head, tail = self._head, self._tail
+        if head == tail:
+            return
+        start, stop = tail % self.capacity, head % self.capacity
+        if start < stop:
+            rows = self._buf[start:stop].copy()
+        else:
+            rows = np.concatenate((self._buf[start:], self._buf[:stop]))
+        self._tail = head
+
+        self._fh.write(_LEN.pack(len(rows)))
+        for name in self.dtype.names:
+            self._fh.write(np.ascontiguousarray(rows[name]).tobytes())
+        self._fh.flush()
+        self.written += len(rows)
+        self.blocks += 1
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self._drain()
+
+    def flush(self):
+        """Wake the writer to drain now; returns without waiting for it."""
+        self._wake.set()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._writer.join()
+        self._drain()
+        self._fh.close()
+
+    def stats(self):
+        return {
+            'recorded': self.recorded,
+            'written': self.written,
+            'dropped': self.dropped,
+            'blocks': self.blocks,
+            'pending': self._head - self._tail
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _index(fh):
+    """
+    (fields, [(rows, offset of the first column)], end of the last complete
+    block) of a metrics file, across the sessions appended to it. A block
+    cut short by an interrupted session ends the file.
+    """
+    size = os.fstat(fh.fileno()).st_size
+    fields, blocks, pos = None, [], 0
+    while pos < size:
+        fh.seek(pos)
+        head = fh.read(len(MAGIC))
+        if head == MAGIC:
+            raw = fh.read(_LEN.size)
+            if len(raw) < _LEN.size:
+                break
+            (n,) = _LEN.unpack(raw)
+            header = fh.read(n)
+            if len(header) < n:
+                break
+            session = [tuple(f) for f in json.loads(header)['fields']]
+            if fields is not None and session != fields:
+                raise ValueError(f"{fh.name}: sessions recorded different fields")
+            fields = session
+            row_size = sum(np.dtype(fmt).itemsize for _, fmt in fields)
+            pos += len(MAGIC) + _LEN.size + n
+            continue
+        if fields is None:
+            raise ValueError(f"{fh.name} is not a metrics file")
+        if len(head) < _LEN.size:
+            break
+        (rows,) = _LEN.unpack(head[:_LEN.size])
+        if pos + _LEN.size + rows * row_size > size:
+            break
+        blocks.append((rows, pos + _LEN.size))
+        pos += _LEN.size + rows * row_size
+    if fields is None:
+        raise ValueError(f"{fh.name} is not a metrics file")
+    return fields, blocks, pos
+
+
+def read_metrics(path):
+    """Columns of a metrics file (every session in it) as a dict of name -> ndarray."""
+    with open(path, "rb") as fh:
+        fields, blocks, _ = _index(fh)
+        dtypes = [(name, np.dtype(fmt)) for name, fmt in fields]
+        chunks = {name: [] for name, _ in fields}
+        for rows, offset in blocks:
+            fh.seek(offset)
+            for name, dt in dtypes:
+                chunks[name].append(np.frombuffer(fh.read(rows * dt.itemsize), dtype=dt))
+    return {name: np.concatenate(cols) if cols else np.empty(0, dt)
+            for (name, dt), cols in zip(dtypes, chunks.values())}
+
+
+def summarize(columns):
+    """Percentiles (ms) of every *_ms column."""
+    summary = {}
+    for name, col in columns.items():
+        if not name.endswith('_ms') or not len(col):
+            continue
+        p50, p99, p999 = np.percentile(col, [50, 99, 99.9])
+        summary[name] = {'count': len(col), 'p50_ms': p50, 'p99_ms': p99,
+                         'p999_ms': p999, 'max_ms': float(col.max())}
+    return summary
+
+
+def to_csv(columns, out):
+    names = list(columns)
+    out.write(",".join(names) + "\n")
+    for row in zip(*(columns[name].tolist() for name in names)):
+        out.write(",".join(repr(v) for v in row) + "\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_sum = sub.add_parser("summary", help="print per-stage percentiles")
+    p_sum.add_argument("path")
+    p_csv = sub.add_parser("csv", help="convert to CSV")
+    p_csv.add_argument("path")
+    p_csv.add_argument("out", nargs="?", help="output file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    columns = read_metrics(args.path)
+    if args.command == "summary":
+        n = len(next(iter(columns.values()))) if columns else 0
+        print(f"{args.path}: {n} ticks")
+        for name, s in summarize(columns).items():
+            print(f"  {name:<12} p50={s['p50_ms']:9.3f}  p99={s['p99_ms']:9.3f}  "
+                  f"p999={s['p999_ms']:9.3f}  max={s['max_ms']:9.3f}")
+    elif args.out:
+        with open(args.out, "w") as out:
+            to_csv(columns, out)
+    else:
+        to_csv(columns, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
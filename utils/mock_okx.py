@@ -0,0 +1,183 @@
+"""
+Local stand-in for the OKX v5 public WebSocket, for load and reconnection
+testing without network access:
+
+    python -m utils.mock_okx --port 8765 --rate 10000 --depth 400
+
+Point the client at ws://127.0.0.1:8765. Subscribed `books` channels get a
+snapshot followed by updates at `rate` messages/s per instrument, and
+subscribed `trades` channels a trade against that book every `trade_every`
+updates; faults
+(disconnects, stalls, malformed frames, slow-consumer cut-offs) are injected
+on request.
+"""
+import json
+import zlib
+import asyncio
+import argparse
+import websockets
+from utils.synthetic import SyntheticBook, stamp
+
+
+class MockOkxServer:
+
+    def __init__(self, host="127.0.0.1", port=8765, rate=1000.0, depth=400, pool=2000,
+                 disconnect_every=0, malformed_every=0, stall_every=0, stall_ms=0.0,
+                 max_buffer=0, trade_every=10):
+        self.host = host
+        self.port = port
+        self.rate = rate
+        self.depth = depth
+        self.pool = pool                          # pre-generated updates per instrument
+        self.disconnect_every = disconnect_every  # close the connection after N messages
+        self.malformed_every = malformed_every    # every Nth frame is truncated JSON
+        self.stall_every = stall_every            # pause stall_ms after every N messages
+        self.stall_ms = stall_ms
+        self.max_buffer = max_buffer              # drop consumers with more unsent bytes than this
+        self.trade_every = trade_every            # trades channel: one trade per N updates
+        self._frames = {}
+        self._server = None
+        self.stats = {'connections': 0, 'sent': 0, 'disconnects': 0,
+                      'malformed': 0, 'stalls': 0, 'slow_consumers': 0}
+
+    @property
+    def uri(self):
+        return f"ws://{self.host}:{self.port}"
+
+    def frames(self, inst_id):
+        """
+        Snapshot, a pool of updates and a trade after each update for inst_id,
+        generated once and replayed in a loop.
+        """
+        if inst_id not in self._frames:
+            feed = SyntheticBook(inst_id, depth=self.depth, seed=zlib.crc32(inst_id.encode()), live_ts=False)
+            snapshot, updates, trades = feed.snapshot(), [], []
+            for _ in range(self.pool):
+                updates.append(feed.update())
+                trades.append(feed.trade())
+            self._frames[inst_id] = (snapshot, updates, trades)
+        return self._frames[inst_id]
+
+    async def start(self):
+        self._server = await websockets.serve(self._handler, self.host, self.port, max_size=None)
+        return self
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handler(self, ws):
+        self.stats['connections'] += 1
+        streams = {}
+        trades = set()
+        try:
+            async for raw in ws:
+                try:
+                    req = json.loads(raw)
+                except ValueError:
+                    await ws.send(json.dumps({"event": "error", "code": "60012", "msg": "Invalid request"}))
+                    continue
+                op = req.get("op")
+                for arg in req.get("args", []):
+                    inst_id = arg.get("instId")
+                    if op == "subscribe" and arg.get("channel") == "trades":
+                        trades.add(inst_id)
+                        await ws.send(json.dumps({"event": "subscribe", "arg": arg, "connId": "mock"}))
+                    elif op == "unsubscribe" and arg.get("channel") == "trades":
+                        trades.discard(inst_id)
+                        await ws.send(json.dumps({"event": "unsubscribe", "arg": arg, "connId": "mock"}))
+                    elif op == "subscribe" and arg.get("channel") == "books" and inst_id not in streams:
+                        await ws.send(json.dumps({"event": "subscribe", "arg": arg, "connId": "mock"}))
+                        streams[inst_id] = asyncio.create_task(self._stream(ws, inst_id, trades))
+                    elif op == "unsubscribe" and inst_id in streams:
+                        streams.pop(inst_id).cancel()
+                        await ws.send(json.dumps({"event": "unsubscribe", "arg": arg, "connId": "mock"}))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            for task in streams.values():
+                task.cancel()
+
+    async def _stream(self, ws, inst_id, trades=()):
+        snapshot, updates, trade_msgs = self.frames(inst_id)
+        loop = asyncio.get_running_loop()
+        transport = getattr(ws, "transport", None)
+        i = 0
+        try:
+            await ws.send(stamp(snapshot))
+            self.stats['sent'] += 1
+            sent = 1
+            start = loop.time()
+            while True:
+                due = (loop.time() - start) * self.rate
+                while sent < due:
+                    if i == len(updates):
+                        # Wrap around with a fresh snapshot so seqIds stay consistent
+                        msg, i = snapshot, 0
+                    else:
+                        msg, i = updates[i], i + 1
+                        if inst_id in trades and self.trade_every and i % self.trade_every == 0:
+                            await ws.send(stamp(msg))
+                            self.stats['sent'] += 1
+                            msg = trade_msgs[i - 1]
+                    msg = stamp(msg)
+                    sent += 1
+
+                    if self.malformed_every and sent % self.malformed_every == 0:
+                        msg = msg[:len(msg) // 2]
+                        self.stats['malformed'] += 1
+                    await ws.send(msg)
+                    self.stats['sent'] += 1
+
+                    if self.disconnect_every and sent % self.disconnect_every == 0:
+                        self.stats['disconnects'] += 1
+                        await ws.close(1011, "injected disconnect")
+                        return
+                    if self.max_buffer and transport and transport.get_write_buffer_size() > self.max_buffer:
+                        self.stats['slow_consumers'] += 1
+                        await ws.close(4000, "slow consumer")
+                        return
+                    if self.stall_every and sent % self.stall_every == 0:
+                        self.stats['stalls'] += 1
+                        await asyncio.sleep(self.stall_ms / 1000)
+                await asyncio.sleep(0.001)
+        except websockets.ConnectionClosed:
+            pass
+
+
+async def _serve_forever(server):
+    await server.start()
+    print(f"Mock OKX feed on {server.uri} ({server.rate:g} msg/s per instrument, depth {server.depth})")
+    try:
+        while True:
+            await asyncio.sleep(5)
+            print(server.stats)
+    finally:
+        await server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rate", type=float, default=1000.0, help="messages/s per instrument")
+    parser.add_argument("--depth", type=int, default=400)
+    parser.add_argument("--disconnect-every", type=int, default=0)
+    parser.add_argument("--malformed-every", type=int, default=0)
+    parser.add_argument("--stall-every", type=int, default=0)
+    parser.add_argument("--stall-ms", type=float, default=0.0)
+    parser.add_argument("--max-buffer", type=int, default=0, help="bytes; 0 disables slow-consumer cut-off")
+    parser.add_argument("--trade-every", type=int, default=10, help="updates per trade on the trades channel")
+    args = parser.parse_args()
+    server = MockOkxServer(args.host, args.port, args.rate, args.depth,
+                           disconnect_every=args.disconnect_every, malformed_every=args.malformed_every,
+                           stall_every=args.stall_every, stall_ms=args.stall_ms, max_buffer=args.max_buffer,
+                           trade_every=args.trade_every)
+    try:
+        asyncio.run(_serve_forever(server))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
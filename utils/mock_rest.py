@@ -0,0 +1,185 @@
+"""
+Local stand-in for the REST endpoints used by the history builders, so the
+collectors can run offline:
+
+    python -m utils.mock_rest --port 8780 --latency-ms 20
+
+OKX (/api/v5/market/history-trades, books, ticker) and Binance
+(/api/v3/historicalTrades, depth) are served from a deterministic pool of
+trades per symbol with the exchanges' paging semantics. Every request can
+be delayed by `latency_ms`, and every Nth one fails with HTTP 500 or 429.
+"""
+import json
+import time
+import random
+import argparse
+import threading
+from urllib.parse import urlparse, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _TradePool:
+    """`size` trades with ids 1..size, rising timestamps and a random-walk price."""
+
+    def __init__(self, symbol, size, mid=100000.0, start_ms=1_700_000_000_000):
+        rng = random.Random(symbol)
+        self.ids, self.ts, self.px, self.sz, self.buy = [], [], [], [], []
+        px, ts = mid, start_ms
+        for i in range(1, size + 1):
+            px *= 1 + rng.gauss(0, 2e-5)
+            ts += rng.randint(1, 500)
+            self.ids.append(i)
+            self.ts.append(ts)
+            self.px.append(round(px, 1))
+            self.sz.append(round(rng.expovariate(4.0), 6))
+            self.buy.append(rng.random() < 0.5)
+
+    def __len__(self):
+        return len(self.ids)
+
+
+class MockRestServer:
+
+    def __init__(self, host="127.0.0.1", port=8780, latency_ms=0.0, fail_every=0, throttle_every=0,
+                 pool=20000):
+        self.host = host
+        self.port = port
+        self.latency_ms = latency_ms
+        self.fail_every = fail_every          # every Nth request answers HTTP 500
+        self.throttle_every = throttle_every  # every Nth request answers HTTP 429
+        self.pool = pool
+        self.stats = {'requests': 0, 'failed': 0, 'throttled': 0}
+        self._pools = {}
+        self._lock = threading.Lock()
+        self._httpd = None
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def trades(self, symbol):
+        with self._lock:
+            if symbol not in self._pools:
+                self._pools[symbol] = _TradePool(symbol, self.pool)
+            return self._pools[symbol]
+
+    def start(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                status, body = server.handle(self.path)
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def handle(self, path):
+        """(HTTP status, JSON body) for one GET request."""
+        with self._lock:
+            self.stats['requests'] += 1
+            n = self.stats['requests']
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        if self.fail_every and n % self.fail_every == 0:
+            self.stats['failed'] += 1
+            return 500, {"code": "50001", "msg": "injected failure"}
+        if self.throttle_every and n % self.throttle_every == 0:
+            self.stats['throttled'] += 1
+            return 429, {"code": "50011", "msg": "Too Many Requests"}
+
+        url = urlparse(path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        route = {
+            "/api/v5/market/history-trades": self._okx_trades,
+            "/api/v5/market/books": self._okx_books,
+            "/api/v5/market/ticker": self._okx_ticker,
+            "/api/v3/historicalTrades": self._binance_trades,
+            "/api/v3/depth": self._binance_depth,
+        }.get(url.path)
+        if route is None:
+            return 404, {"msg": f"unknown path {url.path}"}
+        return 200, route(query)
+
+    def _levels(self, symbol, depth):
+        pool = self.trades(symbol)
+        rng = random.Random(time.monotonic_ns())
+        mid = pool.px[-1]
+        asks = [[f"{mid + 0.1 * (i + 1):.1f}", f"{rng.uniform(0.01, 2):.6f}"] for i in range(depth)]
+        bids = [[f"{mid - 0.1 * (i + 1):.1f}", f"{rng.uniform(0.01, 2):.6f}"] for i in range(depth)]
+        return asks, bids
+
+    def _okx_trades(self, q):
+        # Newest first; `after` pages to trades older than that tradeId
+        pool = self.trades(q["instId"])
+        limit = min(int(q.get("limit", 100)), 100)
+        end = int(q["after"]) - 1 if q.get("after") else len(pool)
+        data = [{"instId": q["instId"], "tradeId": str(pool.ids[i]), "px": str(pool.px[i]),
+                 "sz": str(pool.sz[i]), "side": "buy" if pool.buy[i] else "sell", "ts": str(pool.ts[i])}
+                for i in range(end - 1, max(end - 1 - limit, -1), -1)]
+        return {"code": "0", "msg": "", "data": data}
+
+    def _okx_books(self, q):
+        asks, bids = self._levels(q["instId"], int(q.get("sz", 5)))
+        return {"code": "0", "msg": "", "data": [{
+            "asks": [lvl + ["0", "1"] for lvl in asks], "bids": [lvl + ["0", "1"] for lvl in bids],
+            "ts": str(int(time.time() * 1000))}]}
+
+    def _okx_ticker(self, q):
+        return {"code": "0", "msg": "", "data": [{"instId": q["instId"], "vol24h": "5000.0"}]}
+
+    def _binance_trades(self, q):
+        # Oldest first; `fromId` starts the page at that id, otherwise the latest trades
+        pool = self.trades(q["symbol"])
+        limit = min(int(q.get("limit", 500)), 1000)
+        start = int(q["fromId"]) - 1 if q.get("fromId") else max(len(pool) - limit, 0)
+        return [{"id": pool.ids[i], "price": str(pool.px[i]), "qty": str(pool.sz[i]),
+                 "time": pool.ts[i], "isBuyerMaker": not pool.buy[i]}
+                for i in range(max(start, 0), min(start + limit, len(pool)))]
+
+    def _binance_depth(self, q):
+        asks, bids = self._levels(q["symbol"], int(q.get("limit", 5)))
+        return {"lastUpdateId": 1, "bids": bids, "asks": asks}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8780)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--fail-every", type=int, default=0)
+    parser.add_argument("--throttle-every", type=int, default=0)
+    parser.add_argument("--pool", type=int, default=20000, help="trades per symbol")
+    args = parser.parse_args()
+    server = MockRestServer(args.host, args.port, args.latency_ms, args.fail_every, args.throttle_every,
+                            args.pool).start()
+    print(f"Mock REST API on {server.url}")
+    try:
+        while True:
+            time.sleep(5)
+            print(server.stats)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
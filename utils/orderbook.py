@@ -0,0 +1,201 @@
+import zlib
+import numpy as np
+from bisect import bisect_left
+
+
+class BookSnapshot:
+    """
+    Immutable per-tick book shared by the cost models: contiguous best-first
+    price/size arrays plus the derived quantities every model needs, computed
+    once when the snapshot is built.
+    """
+
+    __slots__ = ("ask_px", "ask_sz", "bid_px", "bid_sz", "ask_cum", "bid_cum",
+                 "best_ask", "best_bid", "mid", "spread", "ts")
+
+    def __init__(self, ask_px, ask_sz, bid_px, bid_sz, ts=0):
+        self.ask_px = ask_px
+        self.ask_sz = ask_sz
+        self.bid_px = bid_px
+        self.bid_sz = bid_sz
+        self.ask_cum = np.cumsum(ask_sz)
+        self.bid_cum = np.cumsum(bid_sz)
+        self.best_ask = float(ask_px[0])
+        self.best_bid = float(bid_px[0])
+        self.mid = (self.best_ask + self.best_bid) / 2
+        self.spread = self.best_ask - self.best_bid
+        self.ts = ts
+        for arr in (ask_px, ask_sz, bid_px, bid_sz, self.ask_cum, self.bid_cum):
+            arr.setflags(write=False)
+
+    @classmethod
+    def from_levels(cls, asks, bids, ts=0):
+        """Build from best-first [price, size, ...] levels (strings or numbers)."""
+        ask = np.array([lvl[:2] for lvl in asks], dtype=float).reshape(-1, 2)
+        bid = np.array([lvl[:2] for lvl in bids], dtype=float).reshape(-1, 2)
+        return cls(ask[:, 0].copy(), ask[:, 1].copy(), bid[:, 0].copy(), bid[:, 1].copy(), ts)
+
+    def depth(self, n):
+        """Total size resting in the top n levels of both sides."""
+        return float(self.ask_cum[min(n, len(self.ask_cum)) - 1] + self.bid_cum[min(n, len(self.bid_cum)) - 1])
+
+
+class BookSide:
+    """
+    Read-only, best-first view over one side of a LocalOrderBook.
+    Levels are (price, size) tuples; nothing is copied until indexed.
+    """
+
+    def __init__(self, keys, sizes, levels, sign, depth=None):
+        self._keys = keys
+        self._sizes = sizes
+        self._levels = levels
+        self._sign = sign
+        self._depth = depth
+
+    def __len__(self):
+        n = len(self._keys)
+        return n if self._depth is None else min(n, self._depth)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("book level out of range")
+        return (self._keys[i] * self._sign, self._sizes[i])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def raw(self, i):
+        """Exchange strings (price, size) of level i, as used by the checksum."""
+        return self._levels[self._keys[i]]
+
+
+class LocalOrderBook:
+    """
+    OKX `books` channel order book maintained from a snapshot plus
+    incremental updates. Each side keeps a sorted list of price keys (bids
+    negated so index 0 is always the best level), a parallel list of sizes
+    and a dict of the exchange strings, so a level change is a binary search
+    plus an in-place list/dict update.
+
+    apply() returns False when the sequence or CRC32 checksum does not match;
+    the book is then cleared and needs a fresh snapshot (resubscribe).
+    """
+
+    CHECKSUM_DEPTH = 25
+
+    def __init__(self, inst_id=None):
+        self.inst_id = inst_id
+        self.reset()
+
+    def reset(self):
+        self._ask_keys = []
+        self._bid_keys = []
+        self._ask_sizes = []
+        self._bid_sizes = []
+        self._asks = {}
+        self._bids = {}
+        self.seq_id = None
+        self.ts = 0
+        self.ready = False
+        self.resyncs = 0
+
+    def apply(self, action, data):
+        """Apply one `data` entry of a books message; action is 'snapshot' or 'update'."""
+        if action == "snapshot":
+            resyncs = self.resyncs
+            self.reset()
+            self.resyncs = resyncs
+        elif not self.ready:
+            # Updates are meaningless until a snapshot has been seen
+            return False
+        elif data.get("prevSeqId") is not None and self.seq_id is not None \
+                and int(data["prevSeqId"]) != self.seq_id:
+            return self._desync()
+
+        try:
+            self._apply_side(self._ask_keys, self._ask_sizes, self._asks, data.get("asks", []), 1)
+            self._apply_side(self._bid_keys, self._bid_sizes, self._bids, data.get("bids", []), -1)
+        except (ValueError, TypeError, IndexError):
+            return self._desync()
+
+        if data.get("seqId") is not None:
+            self.seq_id = int(data["seqId"])
+        self.ts = int(data.get("ts", 0))
+        self.ready = True
+
+        if data.get("checksum") is not None and self.checksum() != int(data["checksum"]):
+            return self._desync()
+        return True
+
+    def _desync(self):
+        resyncs = self.resyncs + 1
+        self.reset()
+        self.resyncs = resyncs
+        return False
+
+    @staticmethod
+    def _apply_side(keys, sizes, levels, changes, sign):
+        for change in changes:
+            px, sz = change[0], change[1]
+            price = float(px)
+            size = float(sz)
+            if price <= 0 or size < 0:
+                continue
+            key = price * sign
+            i = bisect_left(keys, key)
+            exists = i < len(keys) and keys[i] == key
+            if size == 0:
+                if exists:
+                    del keys[i]
+                    del sizes[i]
+                    del levels[key]
+            elif exists:
+                sizes[i] = size
+                levels[key] = (px, sz)
+            else:
+                keys.insert(i, key)
+                sizes.insert(i, size)
+                levels[key] = (px, sz)
+
+    def asks(self, depth=None):
+        return BookSide(self._ask_keys, self._ask_sizes, self._asks, 1, depth)
+
+    def bids(self, depth=None):
+        return BookSide(self._bid_keys, self._bid_sizes, self._bids, -1, depth)
+
+    def top(self, n=5):
+        """(best_bid, best_ask, bid size, ask size) over the top n levels; the book must not be empty."""
+        return (-self._bid_keys[0], self._ask_keys[0], sum(self._bid_sizes[:n]), sum(self._ask_sizes[:n]))
+
+    def mid(self):
+        """Mid of the best bid and ask; the book must not be empty."""
+        return (self._ask_keys[0] - self._bid_keys[0]) / 2
+
+    def snapshot(self, depth=None):
+        """Array-backed BookSnapshot of the top `depth` levels (all levels by default)."""
+        return BookSnapshot(
+            np.array(self._ask_keys[:depth], dtype=float),
+            np.array(self._ask_sizes[:depth], dtype=float),
+            -np.array(self._bid_keys[:depth], dtype=float),
+            np.array(self._bid_sizes[:depth], dtype=float),
+            self.ts
+        )
+
+    def checksum(self):
+        """OKX checksum: signed CRC32 of the top 25 levels as bid:size:ask:size:..."""
+        bids = [self._bids[k] for k in self._bid_keys[:self.CHECKSUM_DEPTH]]
+        asks = [self._asks[k] for k in self._ask_keys[:self.CHECKSUM_DEPTH]]
+        parts = []
+        for i in range(max(len(bids), len(asks))):
+            if i < len(bids):
+                parts.extend(bids[i])
+            if i < len(asks):
+                parts.extend(asks[i])
+        crc = zlib.crc32(":".join(parts).encode())
+        return crc - (1 << 32) if crc >= (1 << 31) else crc
@@ -0,0 +1,107 @@
+import gzip
+import time
+import struct
+import numpy as np
+
+# Frame header: receive wall-clock time (s) and payload length
+_HEADER = struct.Struct("<dI")
+
+
+def _open(path, mode):
+    return gzip.open(path, mode) if str(path).endswith(".gz") else open(path, mode)
+
+
+class FrameRecorder:
+    """
+    Append-only recorder of raw feed messages. Each frame is a fixed
+    12-byte header (receive time, length) followed by the UTF-8 payload;
+    paths ending in .gz are gzip-compressed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.frames = 0
+        self._fh = _open(path, "ab")
+
+    def write(self, msg, recv_time=None):
+        payload = msg.encode() if isinstance(msg, str) else msg
+        self._fh.write(_HEADER.pack(time.time() if recv_time is None else recv_time, len(payload)))
+        self._fh.write(payload)
+        self.frames += 1
+
+    def close(self):
+        self._fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_frames(path):
+    """Yield (recv_time, message) pairs from a recording, in order."""
+    with _open(path, "rb") as fh:
+        while True:
+            header = fh.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                return
+            recv_time, length = _HEADER.unpack(header)
+            payload = fh.read(length)
+            if len(payload) < length:
+                return  # truncated final frame of an interrupted recording
+            yield recv_time, payload.decode()
+
+
+def latency_summary(samples_s):
+    """p50/p99/p999/max of per-tick latencies, in milliseconds."""
+    if not len(samples_s):
+        return {'p50_ms': 0.0, 'p99_ms': 0.0, 'p999_ms': 0.0, 'max_ms': 0.0}
+    ms = np.asarray(samples_s) * 1000
+    p50, p99, p999 = np.percentile(ms, [50, 99, 99.9])
+    return {'p50_ms': p50, 'p99_ms': p99, 'p999_ms': p999, 'max_ms': ms.max()}
+
+
+def replay(path, process, speed=None):
+    """
+    Feed a recording through process(msg) and report throughput and
+    per-message processing latency.
+
+    speed=1.0 replays at the recorded pace, speed=N at N times that pace and
+    speed=None (or 0) as fast as possible. Ticks are messages for which
+    process returned a result; exceptions are counted, not raised.
+    """
+    latencies = []
+    frames = ticks = errors = 0
+    first_recv = None
+    start = time.perf_counter()
+
+    for recv_time, msg in read_frames(path):
+        if speed:
+            if first_recv is None:
+                first_recv = recv_time
+            wait = (recv_time - first_recv) / speed - (time.perf_counter() - start)
+            if wait > 0:
+                time.sleep(wait)
+
+        frames += 1
+        t0 = time.perf_counter()
+        try:
+            result = process(msg)
+        except Exception:
+            errors += 1
+            continue
+        latencies.append(time.perf_counter() - t0)
+        if result is not None:
+            ticks += 1
+
+    elapsed = time.perf_counter() - start
+    stats = {
+        'frames': frames,
+        'ticks': ticks,
+        'errors': errors,
+        'elapsed_s': elapsed,
+        'ticks_per_sec': ticks / elapsed if elapsed > 0 else 0.0
+    }
+    stats.update(latency_summary(latencies))
+    return stats
@@ -0,0 +1,398 @@
+"""
+Partitioned columnar market data store. Each table is split per instrument
+and UTC day into immutable parts, one typed .npy file per column:
+
+    <root>/<table>/<instId>/<YYYY-MM-DD>/part-00000/{ts,px,...}.npy + meta.json
+
+Rows inside a part are sorted by `ts` (exchange time, ms) and columns that
+hold a single value for the whole part (e.g. vol24h) are kept in meta.json
+instead of being repeated per row. Reads memory-map only the requested
+columns of the parts overlapping the time range, so a query touches the
+bytes it returns and little else. Parts are tagged with the build that
+wrote them: ingest replaces its own earlier output, and a history
+collection replaces the rows of earlier collections from the same source
+in the time range it covers, so rebuilding does not duplicate rows.
+
+    python -m utils.store ingest logs/day1.rec.gz data/store --vol24h 5000
+    python -m utils.store info data/store
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import numpy as np
+from datetime import datetime, timezone
+
+# ts is the exchange timestamp in ms; side is +1 for buys and -1 for sells
+SCHEMAS = {
+    'books': (
+        ('ts', '<i8'),
+        ('best_bid', '<f8'),
+        ('best_ask', '<f8'),
+        ('bid_depth5', '<f8'),
+        ('ask_depth5', '<f8'),
+    ),
+    'trades': (
+        ('ts', '<i8'),
+        ('px', '<f8'),
+        ('sz', '<f8'),
+        ('side', '<i1'),
+        ('best_bid', '<f8'),
+        ('best_ask', '<f8'),
+        ('bid_depth5', '<f8'),
+        ('ask_depth5', '<f8'),
+        ('vol24h', '<f8'),
+        ('is_taker', '<i1'),
+    ),
+}
+
+DAY_MS = 86400 * 1000
+
+
+def _day(ts_ms):
+    return datetime.fromtimestamp(ts_ms / 1000, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def _day_start(day):
+    return int(datetime.strptime(day, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def _day_parts(day_dir):
+    """(name, meta) of the committed parts in one day directory, in name order."""
+    parts = []
+    for name in sorted(os.listdir(day_dir)):
+        if name.startswith("part-"):
+            with open(os.path.join(day_dir, name, "meta.json")) as fh:
+                parts.append((name, json.load(fh)))
+    return parts
+
+
+def _load_part(path, meta):
+    """Every column of one part as in-memory arrays, constants expanded."""
+    ts = np.load(os.path.join(path, "ts.npy"))
+    cols = {}
+    for name, fmt in meta['fields']:
+        if name in meta['constants']:
+            cols[name] = np.full(len(ts), meta['constants'][name], dtype=fmt)
+        else:
+            cols[name] = ts if name == 'ts' else np.load(os.path.join(path, name + ".npy"))
+    return cols
+
+
+def _remove_part(path):
+    # Renamed out of sight first, so readers see the part either whole or not at all
+    hidden = os.path.join(os.path.dirname(path), f".old-{os.getpid()}-{time.time_ns()}")
+    os.rename(path, hidden)
+    shutil.rmtree(hidden)
+
+
+class StoreWriter:
+    """
+    Buffered appender for one table and instrument. Rows are collected in
+    memory and written as one part per UTC day every `chunk_rows` rows and
+    on close(); each part directory is renamed into place once complete, so
+    readers never see a partial part.
+
+    Every part records the `build` that wrote it (a fresh id by default).
+    With `replace` set to a build prefix, each part written removes the rows
+    in its [ts_min, ts_max] range from parts of other builds starting with
+    that prefix (rewriting those parts without them), so a rebuild replaces
+    the rows it covers instead of adding a second copy. Parts of unrelated
+    builds and rows outside the range are left alone.
+    """
+
+    def __init__(self, root, table, inst_id, fields=None, chunk_rows=65536, build=None, replace=None):
+        self.root = root
+        self.table = table
+        self.inst_id = inst_id
+        self.fields = tuple(fields or SCHEMAS[table])
+        self.names = [name for name, _ in self.fields]
+        self.chunk_rows = chunk_rows
+        self.build = build or f"{os.getpid()}-{time.time_ns()}"
+        self.replace = replace
+        self.rows = 0
+        self.parts = 0
+        # Paths of the parts written, relative to root
+        self.written = []
+        self._rows = []
+        self._chunks = []
+        self._pending = 0
+
+    def append(self, *row):
+        """One row with a value per field, in schema order."""
+        self._rows.append(row)
+        self._pending += 1
+        if self._pending >= self.chunk_rows:
+            self.flush()
+
+    def extend(self, columns):
+        """Columnar append: a dict of equal-length arrays, one per field."""
+        chunk = {name: np.asarray(columns[name], dtype=fmt) for name, fmt in self.fields}
+        self._chunks.append(chunk)
+        self._pending += len(chunk['ts'])
+        if self._pending >= self.chunk_rows:
+            self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+        if self._rows:
+            self._chunks.append({name: np.array([row[i] for row in self._rows], dtype=fmt)
+                                 for i, (name, fmt) in enumerate(self.fields)})
+        chunks, self._chunks, self._rows = self._chunks, [], []
+        rows, self._pending = self._pending, 0
+        cols = {name: np.concatenate([chunk[name] for chunk in chunks]) for name in self.names}
+        order = np.argsort(cols['ts'], kind="stable")
+        cols = {name: col[order] for name, col in cols.items()}
+
+        # One part per UTC day the chunk spans
+        day_idx = cols['ts'] // DAY_MS
+        bounds = np.flatnonzero(np.diff(day_idx)) + 1
+        for lo, hi in zip(np.r_[0, bounds], np.r_[bounds, len(day_idx)]):
+            self._write_part({name: col[lo:hi] for name, col in cols.items()})
+        self.rows += rows
+
+    def _write_part(self, cols):
+        ts = cols['ts']
+        day_dir = os.path.join(self.root, self.table, self.inst_id, _day(int(ts[0])))
+        os.makedirs(day_dir, exist_ok=True)
+        if self.replace:
+            self._replace(day_dir, int(ts[0]), int(ts[-1]))
+        tmp = os.path.join(day_dir, f".tmp-{os.getpid()}-{id(self)}")
+        os.makedirs(tmp)
+
+        meta = {'rows': len(ts), 'ts_min': int(ts[0]), 'ts_max': int(ts[-1]), 'build': self.build,
+                'fields': [[name, fmt] for name, fmt in self.fields], 'constants': {}}
+        for name, col in cols.items():
+            constant = (col == col[0]).all() or (col.dtype.kind == 'f' and np.isnan(col).all())
+            if name != 'ts' and len(col) > 1 and constant:
+                meta['constants'][name] = col[0].item()
+            else:
+                np.save(os.path.join(tmp, name + ".npy"), col)
+        with open(os.path.join(tmp, "meta.json"), "w") as fh:
+            json.dump(meta, fh)
+
+        # Part names are claimed by rename, so concurrent writers never clobber each other
+        n = len([d for d in os.listdir(day_dir) if d.startswith("part-")])
+        while True:
+            try:
+                os.rename(tmp, os.path.join(day_dir, f"part-{n:05d}"))
+                break
+            except OSError:
+                n += 1
+        self.parts += 1
+        self.written.append(os.path.relpath(os.path.join(day_dir, f"part-{n:05d}"), self.root))
+
+    def _replace(self, day_dir, lo, hi):
+        for name, meta in _day_parts(day_dir):
+            build = meta.get('build', '')
+            if build == self.build or not build.startswith(self.replace) or meta['ts_max'] < lo or meta['ts_min'] > hi:
+                continue
+            path = os.path.join(day_dir, name)
+            cols = _load_part(path, meta)
+            keep = (cols['ts'] < lo) | (cols['ts'] > hi)
+            if keep.any():
+                rest = StoreWriter(self.root, self.table, self.inst_id, [tuple(f) for f in meta['fields']], build=build)
+                rest._write_part({col: values[keep] for col, values in cols.items()})
+            _remove_part(path)
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class MarketStore:
+    """Reader (and writer factory) for a store rooted at `root`."""
+
+    def __init__(self, root):
+        self.root = root
+
+    def writer(self, table, inst_id, **kwargs):
+        return StoreWriter(self.root, table, inst_id, **kwargs)
+
+    def instruments(self, table):
+        path = os.path.join(self.root, table)
+        return sorted(os.listdir(path)) if os.path.isdir(path) else []
+
+    def days(self, table, inst_id):
+        path = os.path.join(self.root, table, inst_id)
+        return sorted(os.listdir(path)) if os.path.isdir(path) else []
+
+    def parts(self, table, inst_id=None, start=None, end=None):
+        """(instId, part directory, meta) of every part overlapping [start, end) ms."""
+        found = []
+        for inst in ([inst_id] if inst_id else self.instruments(table)):
+            for day in self.days(table, inst):
+                day_ms = _day_start(day)
+                if (start is not None and day_ms + DAY_MS <= start) or (end is not None and day_ms >= end):
+                    continue
+                day_dir = os.path.join(self.root, table, inst, day)
+                for name, meta in _day_parts(day_dir):
+                    if (start is not None and meta['ts_max'] < start) or (end is not None and meta['ts_min'] >= end):
+                        continue
+                    found.append((inst, os.path.join(day_dir, name), meta))
+        return found
+
+    def drop_build(self, build, table=None, inst_id=None, keep=()):
+        """Remove the parts written by `build`, except those in `keep` (paths relative to root)."""
+        keep = set(keep)
+        removed = 0
+        for t in [table] if table else (sorted(os.listdir(self.root)) if os.path.isdir(self.root) else []):
+            for _, path, meta in self.parts(t, inst_id):
+                if meta.get('build') == build and os.path.relpath(path, self.root) not in keep:
+                    _remove_part(path)
+                    removed += 1
+        return removed
+
+    def scan(self, table, inst_id=None, start=None, end=None, columns=None):
+        """
+        Yield one dict of read-only column arrays per part: memory-mapped
+        views sliced to the time range, and broadcast views for constants.
+        `instId` is added to each chunk.
+        """
+        for inst, path, meta in self.parts(table, inst_id, start, end):
+            dtypes = dict(meta['fields'])
+            names = list(columns or dtypes)
+            ts = np.load(os.path.join(path, "ts.npy"), mmap_mode="r")
+            lo = 0 if start is None else int(np.searchsorted(ts, start, side="left"))
+            hi = len(ts) if end is None else int(np.searchsorted(ts, end, side="left"))
+            if hi <= lo:
+                continue
+            chunk = {'instId': inst}
+            for name in names:
+                if name in meta['constants']:
+                    chunk[name] = np.broadcast_to(np.array(meta['constants'][name], dtype=dtypes[name]), (hi - lo,))
+                elif name == 'ts':
+                    chunk[name] = ts[lo:hi]
+                else:
+                    chunk[name] = np.load(os.path.join(path, name + ".npy"), mmap_mode="r")[lo:hi]
+            yield chunk
+
+    def read(self, table, inst_id=None, start=None, end=None, columns=None):
+        """scan() concatenated into one dict of arrays, ordered by ts."""
+        chunks = list(self.scan(table, inst_id, start, end, columns))
+        names = list(columns or dict(SCHEMAS.get(table, ())))
+        if not chunks:
+            return {name: np.empty(0, dtype=dict(SCHEMAS[table])[name]) for name in names}
+        cols = {name: np.concatenate([chunk[name] for chunk in chunks]) for name in chunks[0] if name != 'instId'}
+        cols['instId'] = np.concatenate([np.full(len(chunk[names[0]]), chunk['instId']) for chunk in chunks])
+        if len(chunks) > 1 and 'ts' in cols and (np.diff(cols['ts']) < 0).any():
+            order = np.argsort(cols['ts'], kind="stable")
+            cols = {name: col[order] for name, col in cols.items()}
+        return cols
+
+    def info(self):
+        """{table: {instId: {'days': n, 'parts': n, 'rows': n}}}."""
+        summary = {}
+        for table in sorted(os.listdir(self.root)) if os.path.isdir(self.root) else []:
+            for inst in self.instruments(table):
+                parts = self.parts(table, inst)
+                summary.setdefault(table, {})[inst] = {
+                    'days': len(self.days(table, inst)),
+                    'parts': len(parts),
+                    'rows': sum(meta['rows'] for _, _, meta in parts)
+                }
+        return summary
+
+
+def slippage_history(cols):
+    """slippage_history.csv columns derived from a `trades` read()."""
+    mid = (cols['best_bid'] + cols['best_ask']) / 2
+    return {
+        'exec_price': cols['px'],
+        'mid_price_at_submit': mid,
+        'spread': (cols['best_ask'] - cols['best_bid']) / mid,
+        'depth5': cols['bid_depth5'] + cols['ask_depth5'],
+        'vol24h': cols['vol24h'],
+        'order_size': cols['sz'] * mid
+    }
+
+
+def maker_taker_history(cols):
+    """maker_taker_history.csv columns derived from a `trades` read()."""
+    return {
+        'trade_price': cols['px'],
+        'trade_size': cols['sz'],
+        'side': np.where(cols['side'] > 0, "buy", "sell"),
+        'best_bid': cols['best_bid'],
+        'best_ask': cols['best_ask'],
+        'bid_depth5': cols['bid_depth5'],
+        'ask_depth5': cols['ask_depth5'],
+        'is_taker': cols['is_taker']
+    }
+
+
+def ingest_recording(path, store, vol24h=float("nan"), chunk_rows=65536):
+    """
+    Convert a FrameRecorder file into `books` (top-of-book features after
+    every update) and `trades` (each trade with the book just before it)
+    tables. Public trades are recorded as taker fills. Returns row counts.
+    Ingesting the same recording again replaces its earlier parts.
+    """
+    from utils.orderbook import LocalOrderBook
+    from utils.replay import read_frames
+
+    books, writers = {}, {}
+    build = "ingest:" + os.path.abspath(path)
+    store.drop_build(build)
+
+    def writer(table, inst):
+        if (table, inst) not in writers:
+            writers[table, inst] = store.writer(table, inst, chunk_rows=chunk_rows, build=build)
+        return writers[table, inst]
+
+    for _, msg in read_frames(path):
+        tick = json.loads(msg)
+        arg = tick.get('arg', {})
+        inst = arg.get('instId')
+        if inst is None or not tick.get('data'):
+            continue
+        book = books.get(inst)
+        if book is None:
+            book = books[inst] = LocalOrderBook(inst)
+        if arg.get('channel', 'books') == 'books':
+            if 'action' in tick and book.apply(tick['action'], tick['data'][0]) and book.asks() and book.bids():
+                writer('books', inst).append(book.ts, *book.top(5))
+        elif arg['channel'] == 'trades' and book.ready and book.asks() and book.bids():
+            features = book.top(5)
+            for trade in tick['data']:
+                writer('trades', inst).append(int(trade['ts']), float(trade['px']), float(trade['sz']),
+                                              1 if trade['side'] == 'buy' else -1, *features, vol24h, 1)
+
+    counts = {}
+    for (table, inst), w in writers.items():
+        w.close()
+        counts[table] = counts.get(table, 0) + w.rows
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Partitioned columnar market data store")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("ingest", help="convert frame recordings into books/trades tables")
+    p.add_argument("recordings", nargs="+")
+    p.add_argument("root")
+    p.add_argument("--vol24h", type=float, default=float("nan"), help="24h volume stored with each trade")
+    p = sub.add_parser("info", help="rows, days and parts per table and instrument")
+    p.add_argument("root")
+    args = parser.parse_args(argv)
+
+    store = MarketStore(args.root)
+    if args.command == "ingest":
+        for path in args.recordings:
+            counts = ingest_recording(path, store, args.vol24h)
+            print(f"{path}: " + " ".join(f"{table}={n}" for table, n in sorted(counts.items())))
+    else:
+        json.dump(store.info(), sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
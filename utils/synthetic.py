@@ -0,0 +1,102 @@
+import json
+import time
+import random
+from utils.orderbook import LocalOrderBook
+
+
+class SyntheticBook:
+    """
+    Randomized OKX `books` feed for one instrument: a snapshot followed by
+    incremental updates with consistent seqId/prevSeqId and checksums.
+
+    With live_ts=False the `ts` field holds TS_PLACEHOLDER so pre-generated
+    messages can be re-stamped cheaply at send time with stamp().
+    """
+
+    TS_PLACEHOLDER = "%TS%"
+
+    def __init__(self, inst_id="BTC-USDT", depth=400, mid=100000.0, tick=0.1, seed=0, live_ts=True):
+        self.inst_id = inst_id
+        self.live_ts = live_ts
+        self.depth = depth
+        self.mid = mid
+        self.tick = tick
+        self.seq_id = 0
+        self.trade_id = 0
+        self._rng = random.Random(seed)
+        self._book = LocalOrderBook(inst_id)
+
+    def _size(self):
+        return f"{self._rng.uniform(0.001, 2.0):.6f}"
+
+    def _price(self, steps):
+        return f"{self.mid + steps*self.tick:.1f}"
+
+    def _message(self, action, asks, bids):
+        prev, self.seq_id = self.seq_id, self.seq_id + 1
+        data = {
+            "asks": asks,
+            "bids": bids,
+            "ts": str(int(time.time() * 1000)) if self.live_ts else self.TS_PLACEHOLDER,
+            "seqId": self.seq_id,
+            "prevSeqId": -1 if action == "snapshot" else prev
+        }
+        self._book.apply(action, dict(data, ts=0))
+        data["checksum"] = self._book.checksum()
+        return json.dumps({
+            "arg": {"channel": "books", "instId": self.inst_id},
+            "action": action,
+            "data": [data]
+        })
+
+    def snapshot(self):
+        asks = [[self._price(i + 1), self._size(), "0", "1"] for i in range(self.depth)]
+        bids = [[self._price(-i - 1), self._size(), "0", "1"] for i in range(self.depth)]
+        return self._message("snapshot", asks, bids)
+
+    def update(self, changes=4):
+        """An update touching `changes` levels near the top of each side."""
+        asks, bids = [], []
+        for side, sign in ((asks, 1), (bids, -1)):
+            for _ in range(changes):
+                steps = sign * self._rng.randint(1, min(self.depth, 25))
+                size = "0" if self._rng.random() < 0.2 else self._size()
+                side.append([self._price(steps), size, "0", "1"])
+        return self._message("update", asks, bids)
+
+    def trade(self):
+        """
+        A `trades` channel message for a market order against the current
+        book: mostly inside the best level, sometimes sweeping a few levels
+        (px is then the last level reached).
+        """
+        side = "buy" if self._rng.random() < 0.5 else "sell"
+        levels = self._book.asks(5) if side == "buy" else self._book.bids(5)
+        reach = 1 if self._rng.random() < 0.8 else self._rng.randint(2, max(len(levels), 2))
+        reach = min(reach, len(levels))
+        sz = sum(size for _, size in levels[:reach - 1]) + levels[reach - 1][1] * self._rng.uniform(0.05, 1.0)
+        self.trade_id += 1
+        return json.dumps({
+            "arg": {"channel": "trades", "instId": self.inst_id},
+            "data": [{
+                "instId": self.inst_id,
+                "tradeId": str(self.trade_id),
+                "px": f"{levels[reach - 1][0]:.1f}",
+                "sz": f"{sz:.6f}",
+                "side": side,
+                "ts": str(int(time.time() * 1000)) if self.live_ts else self.TS_PLACEHOLDER
+            }]
+        })
+
+    def messages(self, n_updates, changes=4, trade_every=0):
+        """Snapshot then updates; with trade_every=N a trade follows every Nth update."""
+        yield self.snapshot()
+        for i in range(n_updates):
+            yield self.update(changes)
+            if trade_every and (i + 1) % trade_every == 0:
+                yield self.trade()
+
+
+def stamp(msg, ts_ms=None):
+    """Fill the ts placeholder of a pre-generated message with the current time."""
+    return msg.replace(SyntheticBook.TS_PLACEHOLDER, str(int(time.time() * 1000) if ts_ms is None else ts_ms), 1)
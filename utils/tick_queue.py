@@ -0,0 +1,74 @@
+import asyncio
+from collections import deque
+
+
+class QueueClosed(Exception):
+    """Raised by get_batch() once the producer has closed the queue."""
+
+
+class TickQueue:
+    """
+    Bounded single-producer/single-consumer queue between the socket reader
+    and the compute stage. The consumer takes everything pending at once, so
+    it can apply every book delta but price only the latest book.
+
+    put() never blocks the reader: when the queue is full the backlog is
+    discarded (counted in `dropped`) and `overflowed` is set, since a book
+    built from incremental updates cannot skip frames and has to resync.
+    """
+
+    def __init__(self, maxsize=1000):
+        self.maxsize = maxsize
+        self.enqueued = 0
+        self.dropped = 0
+        self.conflated = 0
+        self.max_depth = 0
+        self.overflowed = False
+        self._items = deque()
+        self._ready = asyncio.Event()
+        self._error = None
+
+    def __len__(self):
+        return len(self._items)
+
+    def put(self, item):
+        """Enqueue without blocking; returns False if the backlog had to be dropped."""
+        if self._error is not None:
+            return False
+        ok = True
+        if len(self._items) >= self.maxsize:
+            self.dropped += len(self._items)
+            self._items.clear()
+            self.overflowed = True
+            ok = False
+        self._items.append(item)
+        self.enqueued += 1
+        if len(self._items) > self.max_depth:
+            self.max_depth = len(self._items)
+        self._ready.set()
+        return ok
+
+    async def get_batch(self):
+        """Wait for and return every pending item, oldest first."""
+        while not self._items:
+            if self._error is not None:
+                raise self._error
+            self._ready.clear()
+            await self._ready.wait()
+        batch = list(self._items)
+        self._items.clear()
+        return batch
+
+    def close(self, error=None):
+        """Wake the consumer; get_batch() raises `error` once the queue is drained."""
+        self._error = error or QueueClosed()
+        self._ready.set()
+
+    def stats(self):
+        return {
+            'depth': len(self._items),
+            'max_depth': self.max_depth,
+            'enqueued': self.enqueued,
+            'dropped': self.dropped,
+            'conflated': self.conflated
+        }
@@ -0,0 +1,74 @@
+import time
+import asyncio
+
+
+def fetch_vol24h(inst_id):
+    """24h trading volume for inst_id from the OKX ticker endpoint."""
+    import requests  # deferred: only the REST path needs it, and it is slow to import
+    resp = requests.get(
+        f"https://www.okx.com/api/v5/market/ticker?instId={inst_id}",
+        timeout=2
+    )
+    data24 = resp.json().get("data", [{}])[0]
+    return float(data24.get("vol24h", 0.0))
+
+
+class VolumeCache:
+    """
+    Per-instrument 24h volume kept fresh by a background task, so the tick
+    path only does a dict lookup. `fetcher` is any callable (or coroutine
+    function) taking an instId and returning the volume; blocking fetchers
+    run in a worker thread.
+    """
+
+    def __init__(self, fetcher=fetch_vol24h, ttl=30.0):
+        self.fetcher = fetcher
+        self.ttl = ttl
+        self.errors = 0
+        self.last_error = None
+        self._values = {}
+
+    def get(self, inst_id):
+        """Return (vol24h, age in seconds), or (None, None) before the first fetch."""
+        entry = self._values.get(inst_id)
+        if entry is None:
+            return None, None
+        vol24h, fetched_at = entry
+        return vol24h, time.monotonic() - fetched_at
+
+    def set(self, inst_id, vol24h):
+        self._values[inst_id] = (float(vol24h), time.monotonic())
+
+    async def refresh(self, inst_id):
+        try:
+            if asyncio.iscoroutinefunction(self.fetcher):
+                vol24h = await self.fetcher(inst_id)
+            else:
+                vol24h = await asyncio.to_thread(self.fetcher, inst_id)
+        except Exception as e:
+            self.errors += 1
+            self.last_error = e
+            return False
+        self.set(inst_id, vol24h)
+        return True
+
+    async def run(self, inst_ids, poll=1.0, on_error=None):
+        """
+        Refresh every instrument whose value is missing or older than ttl,
+        until cancelled. Failed fetches for instruments without a value yet
+        (whose ticks cannot be priced) go to on_error(inst_id, exception).
+        """
+        while True:
+            for inst_id in list(inst_ids):
+                _, age = self.get(inst_id)
+                if age is None or age >= self.ttl:
+                    if not await self.refresh(inst_id) and age is None and on_error is not None:
+                        on_error(inst_id, self.last_error)
+            await asyncio.sleep(poll)
+
+    def stats(self):
+        return {
+            'instruments': len(self._values),
+            'errors': self.errors,
+            'last_error': repr(self.last_error) if self.last_error is not None else None
+        }
@@ -0,0 +1,241 @@
+"""
+Headless cost simulator: streams per-tick cost results without Qt.
+
+    python -m veloz run --inst BTC-USDT --qty 1e5 --fee-tier "Tier 1" --volatility 0.5
+    python -m veloz run --inst BTC-USDT --inst ETH-USDT --serve 127.0.0.1:8766 --output none
+    python -m veloz backtest logs/day1.rec.gz logs/day2.rec.gz --workers 4
+
+Results go to stdout (or --output FILE) as JSON lines and, with --serve, to
+every TCP client connected to HOST:PORT. Status, startup time, memory and
+periodic latency reports go to stderr.
+"""
+import time
+
+_START = time.perf_counter()
+
+import os
+import sys
+import signal
+import asyncio
+import argparse
+import resource
+
+
+def rss_mb():
+    """Current resident set size in MB (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/status") as fh:
+            for line in fh:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _log(msg):
+    print(f"[veloz] {msg}", file=sys.stderr, flush=True)
+
+
+async def run(args):
+    from engine import OKX_PUBLIC_WS, CostCalculator
+    from utils.volume import VolumeCache, fetch_vol24h
+    from veloz.output import JsonLinesServer, JsonLinesWriter, encode_result
+    from veloz.session import Session, configure_logging
+    imported = time.perf_counter()
+    _log(f"startup imports={(imported - _START) * 1000:.0f}ms rss={rss_mb():.1f}MB")
+
+    configure_logging(args.log_file)
+    if args.vol24h is not None:
+        vol_cache = VolumeCache(lambda inst: args.vol24h)
+    else:
+        vol_cache = VolumeCache(fetch_vol24h)
+    shortfall = None
+    if args.shortfall_paths:
+        from models.shortfall import ShortfallSimulator
+        shortfall = ShortfallSimulator(args.shortfall_paths, dist=args.shortfall_dist)
+
+    def realized_vol():
+        # One estimator per instrument
+        if args.sigma_source == "static":
+            return None
+        from utils.realized_vol import RealizedVolatility
+        return RealizedVolatility(args.sigma_source, window=args.vol_window, halflife=args.vol_halflife,
+                                  sample_ms=args.vol_sample_ms)
+
+    calculators = [CostCalculator(inst, args.qty, args.fee_tier, args.volatility, vol_cache,
+                                  decoder=args.decoder, book_depth=args.book_depth, shortfall=shortfall,
+                                  realized_vol=realized_vol())
+                   for inst in args.inst]
+
+    impact_pool = None
+    if args.impact_workers:
+        from models.offload import ImpactPool
+        impact_pool = ImpactPool(args.impact_workers)
+
+    trainer = None
+    if args.retrain_every:
+        from models.online import OnlineTrainer
+        trainer = OnlineTrainer(retrain_every=args.retrain_every)
+
+    session = Session(
+        calculators, args.uri or OKX_PUBLIC_WS,
+        reconnect_delay=args.reconnect_delay,
+        queue_size=args.queue_size,
+        record_path=args.record,
+        metrics_path=args.metrics or None,
+        report_every=args.report_every,
+        report_stream=sys.stderr,
+        impact_pool=impact_pool,
+        trades=args.trades,
+        decoder=args.decoder,
+        trainer=trainer
+    )
+
+    outputs = []
+    if args.output == "-":
+        outputs.append(JsonLinesWriter(sys.stdout.buffer))
+    elif args.output != "none":
+        outputs.append(JsonLinesWriter(args.output))
+    if args.serve:
+        host, _, port = args.serve.rpartition(":")
+        server = await JsonLinesServer(host or "127.0.0.1", int(port)).start()
+        _log(f"serving JSON lines on {server.host}:{server.port}")
+        outputs.append(server)
+
+    first = []
+
+    def on_result(result):
+        if not first:
+            first.append(time.perf_counter())
+            _log(f"first result after {(first[0] - _START) * 1000:.0f}ms rss={rss_mb():.1f}MB")
+        line = encode_result(result)
+        for out in outputs:
+            out.publish(line)
+
+    def on_status(kind, detail):
+        _log(f"{kind}: {detail}")
+
+    session.subscribe(on_result, on_status)
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, session.stop)
+        except (NotImplementedError, RuntimeError):
+            pass
+    if args.duration:
+        loop.call_later(args.duration, session.stop)
+
+    started = time.perf_counter()
+    try:
+        await session.run()
+    finally:
+        for out in outputs:
+            out.close()
+        if impact_pool:
+            impact_pool.close()
+        elapsed = time.perf_counter() - started
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        _log(f"stopped results={session.published} rate={session.published / elapsed:.1f}/s "
+             f"rss={rss_mb():.1f}MB peak_rss={peak:.1f}MB")
+
+
+def backtest(args):
+    import json
+    from veloz.backtest import backtest, backtest_csv, backtest_store, format_report
+
+    csvs = [path for path in args.paths if path.endswith(".csv")]
+    stores = [path for path in args.paths if os.path.isdir(path)]
+    recordings = [path for path in args.paths if path not in csvs and path not in stores]
+    started = time.perf_counter()
+    reports = []
+    if recordings:
+        ac_params = {'delta': args.delta, 'gamma': 0.45, 'lam': 1e-6, 'T': 1.0, 'N': 100}
+        merged = backtest(recordings, args.inst, args.workers, qty_usd=args.qty, fee_tier=args.fee_tier,
+                          volatility=args.volatility, vol24h=args.vol24h, ac_params=ac_params,
+                          price_every=args.price_every)
+        reports.extend(stats.summary() for stats in merged.values())
+    for path in csvs:
+        reports.append(dict(backtest_csv(path), source=path))
+    for path in stores:
+        reports.extend(backtest_store(path, args.inst).values())
+    _log(f"backtest done in {time.perf_counter() - started:.2f}s")
+
+    if args.json:
+        for report in reports:
+            print(json.dumps(report, default=float))
+    else:
+        for report in reports:
+            if 'source' in report:
+                err = report['slippage_error']
+                line = (f"{report['source']}: rows={report['rows']} slippage model "
+                        f"mae={err.get('mae', float('nan')) * 1e4:.4f}bp rmse={err.get('rmse', float('nan')) * 1e4:.4f}bp")
+                if report.get('maker_taker_accuracy') is not None:
+                    line += f" maker/taker accuracy={report['maker_taker_accuracy']:.3f}"
+                print(line)
+            else:
+                print(format_report(report))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="veloz", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("run", help="stream cost results for one or more instruments")
+    p.add_argument("--inst", action="append", required=True, help="instrument id; repeat for several")
+    p.add_argument("--qty", type=float, default=100.0, help="order quantity in USD")
+    p.add_argument("--fee-tier", default="Tier 1")
+    p.add_argument("--volatility", type=float, default=0.5)
+    p.add_argument("--uri", help="feed endpoint (default: OKX public WebSocket)")
+    p.add_argument("--output", default="-", help="JSON lines file, '-' for stdout or 'none'")
+    p.add_argument("--serve", metavar="HOST:PORT", help="also fan results out to TCP subscribers")
+    p.add_argument("--vol24h", type=float, help="fixed 24h volume instead of polling the REST API")
+    p.add_argument("--duration", type=float, help="stop after this many seconds")
+    p.add_argument("--record", help="record raw frames for offline replay")
+    p.add_argument("--trades", action="store_true", help="also subscribe to (and record) the trades channel")
+    p.add_argument("--metrics", default=os.path.join("logs", "tick_metrics.vlm"),
+                   help="per-tick metrics file ('' to disable)")
+    p.add_argument("--log-file", default=os.path.join("logs", "latency_metrics.log"))
+    p.add_argument("--report-every", type=int, default=1000, help="latency report interval in results")
+    p.add_argument("--reconnect-delay", type=float, default=2.0)
+    p.add_argument("--queue-size", type=int, default=1000)
+    p.add_argument("--impact-workers", type=int, default=0, help="solve impact in a process pool")
+    p.add_argument("--decoder", default="auto", help="frame decoder: auto, json or orjson")
+    p.add_argument("--book-depth", type=int, help="levels per side handed to the models (default: whole book)")
+    p.add_argument("--retrain-every", type=int, default=0,
+                   help="retrain the models online every N streamed trades (implies --trades)")
+    p.add_argument("--shortfall-paths", type=int, default=0,
+                   help="Monte Carlo paths for the execution cost distribution per tick (0: off)")
+    p.add_argument("--shortfall-dist", default="normal", choices=("normal", "t"),
+                   help="price shock distribution for --shortfall-paths")
+    p.add_argument("--sigma-source", default="static", choices=("static", "ewma", "window"),
+                   help="impact model sigma: --volatility, or realized volatility of the mid (from --volatility until warm)")
+    p.add_argument("--vol-window", type=int, default=1000, help="mid returns in the realized variance window")
+    p.add_argument("--vol-halflife", type=float, default=200, help="EWMA half-life in mid returns")
+    p.add_argument("--vol-sample-ms", type=float, default=0, help="minimum time between sampled mid returns")
+
+    p = sub.add_parser("backtest", help="replay recorded books/trades and score the models")
+    p.add_argument("paths", nargs="+", help="frame recordings (--record --trades), MarketStore directories or slippage_history.csv files")
+    p.add_argument("--inst", action="append", help="only these instruments; each file is split per instrument")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    p.add_argument("--qty", type=float, default=100.0, help="order quantity in USD for cost statistics")
+    p.add_argument("--fee-tier", default="Tier 1")
+    p.add_argument("--volatility", type=float, default=0.5)
+    p.add_argument("--delta", type=float, default=0.5, help="impact exponent")
+    p.add_argument("--vol24h", type=float, default=5000.0, help="24h volume used for the slippage model")
+    p.add_argument("--price-every", type=int, default=100, help="run the full cost pipeline every N books")
+    p.add_argument("--json", action="store_true", help="one JSON report per line instead of text")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        try:
+            asyncio.run(run(args))
+        except KeyboardInterrupt:
+            pass
+    elif args.command == "backtest":
+        backtest(args)
+
+
+if __name__ == "__main__":
+    main()
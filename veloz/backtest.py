@@ -0,0 +1,334 @@
+"""
+Historical backtest: replays recorded `books`/`trades` frames (FrameRecorder
+files, see `python -m veloz run --record ... --trades`) through the same cost
+pipeline as the live session and compares the models with realized fills.
+
+Every recorded trade is priced against the book as it stood just before it:
+  - slippage model: predicted vs realized (px - mid) / mid, the target the
+    regression was trained on
+  - book walk: VWAP of sweeping the book for the trade's notional vs px
+  - maker/taker: public trades are taker fills, so the taker rate is the
+    classifier's hit rate
+and every `price_every` books the full evaluate() is run for cost statistics.
+
+Files are streamed frame by frame, so memory does not grow with the size of
+the dataset; (file, instrument) tasks run in a process pool and their
+statistics are merged. Trades already converted to a MarketStore are scored
+vectorized, straight from the memory-mapped columns.
+"""
+import os
+import csv
+import random
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+COST_FIELDS = ('net_cost', 'slippage', 'slippage_book', 'fee', 'impact')
+
+
+class RunningStats:
+    """
+    Mergeable count/mean/RMS/min/max of a stream of values, with a bounded
+    uniform reservoir sample for percentiles.
+    """
+
+    def __init__(self, reservoir=4096, seed=0):
+        self.count = 0
+        self.total = 0.0
+        self.total_abs = 0.0
+        self.total_sq = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+        self.size = reservoir
+        self.sample = []
+        self._rng = random.Random(seed)
+
+    def add(self, x):
+        x = float(x)
+        if x != x:
+            return
+        self.count += 1
+        self.total += x
+        self.total_abs += abs(x)
+        self.total_sq += x * x
+        if x < self.min:
+            self.min = x
+        if x > self.max:
+            self.max = x
+        if len(self.sample) < self.size:
+            self.sample.append(x)
+        else:
+            i = self._rng.randrange(self.count)
+            if i < self.size:
+                self.sample[i] = x
+
+    def add_many(self, values):
+        for x in np.asarray(values, dtype=float).tolist():
+            self.add(x)
+
+    def merge(self, other):
+        """Fold another RunningStats in; the reservoir keeps each side in proportion to its count."""
+        if not other.count:
+            return self
+        count = self.count + other.count
+        if len(self.sample) + len(other.sample) > self.size:
+            keep = round(self.size * self.count / count)
+            keep = min(keep, len(self.sample))
+            take = min(self.size - keep, len(other.sample))
+            self.sample = self._rng.sample(self.sample, keep) + self._rng.sample(other.sample, take)
+        else:
+            self.sample = self.sample + other.sample
+        self.count = count
+        self.total += other.total
+        self.total_abs += other.total_abs
+        self.total_sq += other.total_sq
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def summary(self):
+        if not self.count:
+            return {'count': 0}
+        p50, p95, p99 = np.percentile(self.sample, [50, 95, 99])
+        return {
+            'count': self.count,
+            'mean': self.total / self.count,
+            'mae': self.total_abs / self.count,
+            'rmse': (self.total_sq / self.count) ** 0.5,
+            'min': self.min,
+            'p50': p50,
+            'p95': p95,
+            'p99': p99,
+            'max': self.max
+        }
+
+
+class InstrumentStats:
+    """Backtest counters and error/cost statistics for one instrument."""
+
+    def __init__(self, asset):
+        self.asset = asset
+        self.frames = 0
+        self.books = 0
+        self.trades = 0
+        self.resyncs = 0
+        self.taker = 0
+        self.slippage_error = RunningStats()
+        self.book_walk_error = RunningStats()
+        self.realized = RunningStats()
+        self.costs = {field: RunningStats() for field in COST_FIELDS}
+
+    def merge(self, other):
+        self.frames += other.frames
+        self.books += other.books
+        self.trades += other.trades
+        self.resyncs += other.resyncs
+        self.taker += other.taker
+        self.slippage_error.merge(other.slippage_error)
+        self.book_walk_error.merge(other.book_walk_error)
+        self.realized.merge(other.realized)
+        for field in COST_FIELDS:
+            self.costs[field].merge(other.costs[field])
+        return self
+
+    def summary(self):
+        return {
+            'asset': self.asset,
+            'frames': self.frames,
+            'books': self.books,
+            'trades': self.trades,
+            'resyncs': self.resyncs,
+            'taker_rate': self.taker / self.trades if self.trades else None,
+            'realized_slippage': self.realized.summary(),
+            'slippage_error': self.slippage_error.summary(),
+            'book_walk_error': self.book_walk_error.summary(),
+            'costs': {field: stats.summary() for field, stats in self.costs.items()}
+        }
+
+
+def backtest_file(path, inst=None, qty_usd=1e5, fee_tier="Tier 1", volatility=0.5,
+                  vol24h=5000.0, ac_params=None, price_every=100):
+    """
+    Replay one recording (optionally one instrument of it) and return
+    {instId: InstrumentStats}.
+    """
+    from engine import CostCalculator, OutOfSync
+    from models.book_walk import BookWalker
+    from models.maker_taker import predict_maker_taker
+    from models.slippage import _slip_model
+    from utils.decode import get_decoder, peek_arg
+    from utils.replay import read_frames
+    from utils.volume import VolumeCache
+
+    vol_cache = VolumeCache(lambda asset: vol24h)
+    calculators = {}
+    stats = {}
+    model = _slip_model.get()
+    decode = get_decoder()
+
+    for _, msg in read_frames(path):
+        if inst is not None and (peek_arg(msg) or (None, None))[1] != inst:
+            continue
+        tick = decode(msg)
+        arg = tick.get('arg', {})
+        asset = arg.get('instId')
+        if asset is None or not tick.get('data'):
+            continue
+        calc = calculators.get(asset)
+        if calc is None:
+            calc = calculators[asset] = CostCalculator(asset, qty_usd, fee_tier, volatility, vol_cache, ac_params)
+            vol_cache.set(asset, vol24h)
+            stats[asset] = InstrumentStats(asset)
+        s = stats[asset]
+        s.frames += 1
+
+        channel = arg.get('channel', 'books')
+        if channel == 'books':
+            try:
+                if not calc.apply(tick):
+                    continue
+            except OutOfSync:
+                s.resyncs += 1
+                continue
+            s.books += 1
+            if price_every and s.books % price_every == 0:
+                result = calc.evaluate()
+                if result is not None:
+                    for field in COST_FIELDS:
+                        s.costs[field].add(result[field])
+        elif channel == 'trades' and calc.book.ready:
+            book = calc.book.snapshot()
+            if book.mid <= 0:
+                continue
+            walker = BookWalker(book)
+            spread = book.spread / book.mid
+            depth5 = book.depth(5)
+            for trade in tick['data']:
+                px, sz, side = float(trade['px']), float(trade['sz']), trade['side']
+                realized = (px - book.mid) / book.mid
+                predicted = model.predict_one(spread, depth5, vol24h, sz * book.mid)
+                fill = walker.walk(sz * book.mid, side)
+                s.trades += 1
+                s.realized.add(realized)
+                s.slippage_error.add(predicted - realized)
+                s.book_walk_error.add((fill['vwap'] - px) / book.mid)
+                s.taker += predict_maker_taker(book, px, side, sz)
+    return stats
+
+
+def _run_task(task):
+    path, inst, options = task
+    return backtest_file(path, inst, **options)
+
+
+def backtest(paths, instruments=None, workers=1, **options):
+    """
+    Backtest recordings in parallel. With `instruments`, each file is split
+    into one task per instrument; otherwise each file is one task. Returns
+    {instId: InstrumentStats} merged across files, plus 'ALL'.
+    """
+    tasks = [(path, inst, options) for path in paths for inst in (instruments or [None])]
+    merged = {}
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(min(workers, len(tasks))) as pool:
+            results = list(pool.map(_run_task, tasks))
+    else:
+        results = [_run_task(task) for task in tasks]
+
+    total = InstrumentStats('ALL')
+    for result in results:
+        for asset, stats in result.items():
+            if asset in merged:
+                merged[asset].merge(stats)
+            else:
+                merged[asset] = stats
+            total.merge(stats)
+    merged['ALL'] = total
+    return merged
+
+
+def backtest_csv(path, chunk_rows=65536):
+    """
+    Slippage-model error over a slippage_history.csv (the training file of
+    models/train_slippage_model.py), read and predicted in chunks of rows.
+    """
+    from models.slippage import _slip_model
+
+    model = _slip_model.get()
+    error = RunningStats()
+    realized = RunningStats()
+    with open(path, newline="") as fh:
+        reader = csv.reader(fh)
+        header = next(reader)
+        cols = [header.index(name) for name in
+                ("exec_price", "mid_price_at_submit", "spread", "depth5", "vol24h", "order_size")]
+        while True:
+            rows = [row for _, row in zip(range(chunk_rows), reader)]
+            if not rows:
+                break
+            chunk = np.array([[row[c] for c in cols] for row in rows], dtype=float)
+            target = (chunk[:, 0] - chunk[:, 1]) / chunk[:, 1]
+            realized.add_many(target)
+            error.add_many(model.predict(chunk[:, 2:]) - target)
+    return {'rows': realized.count, 'realized_slippage': realized.summary(), 'slippage_error': error.summary()}
+
+
+def backtest_store(root, instruments=None, start=None, end=None):
+    """
+    Slippage-model error and maker/taker hit rate over the `trades` table of
+    a MarketStore (utils/store.py), scored part by part on memory-mapped
+    columns. Returns {instId: summary dict}.
+    """
+    from models.maker_taker import clf
+    from models.slippage import _slip_model
+    from utils.store import MarketStore
+
+    slip_model = _slip_model.get()
+    taker_model = clf.get()
+    store = MarketStore(root)
+    reports = {}
+    for inst in instruments or store.instruments('trades'):
+        error, realized = RunningStats(), RunningStats()
+        trades = hits = 0
+        for chunk in store.scan('trades', inst, start, end):
+            bid, ask = chunk['best_bid'], chunk['best_ask']
+            mid = (bid + ask) / 2
+            spread = ask - bid
+            depth5 = chunk['bid_depth5'] + chunk['ask_depth5']
+            px, sz = chunk['px'], chunk['sz']
+
+            target = (px - mid) / mid
+            X = np.column_stack((spread / mid, depth5, chunk['vol24h'], sz * mid))
+            realized.add_many(target)
+            error.add_many(slip_model.predict(X) - target)
+
+            aggr = np.where(chunk['side'] > 0, px - bid, ask - px)
+            rel_aggr = np.where(spread > 0, aggr / np.where(spread > 0, spread, 1.0), 0.0)
+            ratio = np.where(depth5 > 0, sz / np.where(depth5 > 0, depth5, 1.0), 0.0)
+            predicted = taker_model.predict_proba(np.column_stack((rel_aggr, ratio)))[:, 1] >= 0.5
+            hits += int((predicted == (chunk['is_taker'] > 0)).sum())
+            trades += len(px)
+        reports[inst] = {'source': os.path.join(root, 'trades', inst), 'rows': trades,
+                         'maker_taker_accuracy': hits / trades if trades else None,
+                         'realized_slippage': realized.summary(), 'slippage_error': error.summary()}
+    return reports
+
+
+def format_report(summary):
+    """Plain-text report of one InstrumentStats.summary()."""
+    def line(name, s, scale=1.0, unit=""):
+        if not s['count']:
+            return f"  {name:<20} -"
+        return (f"  {name:<20} n={s['count']:<8} mean={s['mean'] * scale:10.4f}{unit} "
+                f"mae={s['mae'] * scale:10.4f}{unit} rmse={s['rmse'] * scale:10.4f}{unit} "
+                f"p50={s['p50'] * scale:10.4f}{unit} p99={s['p99'] * scale:10.4f}{unit}")
+
+    taker = summary['taker_rate']
+    lines = [f"{summary['asset']}: frames={summary['frames']} books={summary['books']} "
+             f"trades={summary['trades']} resyncs={summary['resyncs']} "
+             f"taker_rate={'-' if taker is None else f'{taker:.3f}'}",
+             line("realized slippage", summary['realized_slippage'], 1e4, "bp"),
+             line("slippage model err", summary['slippage_error'], 1e4, "bp"),
+             line("book walk err", summary['book_walk_error'], 1e4, "bp")]
+    for field, s in summary['costs'].items():
+        lines.append(line(field, s))
+    return "\n".join(lines)
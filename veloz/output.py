@@ -0,0 +1,115 @@
+import os
+import json
+import asyncio
+from utils.decode import format_ts
+
+
+def encode_result(result):
+    """One cost result as a compact JSON line (bytes, newline-terminated)."""
+    line = dict(result, timestamp=format_ts(result['ts']))
+    return (json.dumps(line, separators=(',', ':'), default=float) + "\n").encode()
+
+
+class JsonLinesWriter:
+    """
+    Writes results as JSON lines to a binary stream, or to a file opened
+    for appending (and closed by close()) when given a path. Lines are
+    buffered and written in one batch `flush_interval` seconds after the
+    first pending line, or once `max_buffer` bytes are pending, so the event
+    loop does not pay a write and flush per result.
+    """
+
+    def __init__(self, target, flush_interval=0.25, max_buffer=1 << 16):
+        self.owns_stream = isinstance(target, (str, bytes, os.PathLike))
+        self.stream = open(target, "ab") if self.owns_stream else target
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.lines = 0
+        self.flushes = 0
+        self._pending = []
+        self._pending_bytes = 0
+        self._timer = None
+
+    def publish(self, line):
+        self._pending.append(line)
+        self._pending_bytes += len(line)
+        self.lines += 1
+        if self._pending_bytes >= self.max_buffer:
+            self.flush()
+        elif self._timer is None:
+            try:
+                self._timer = asyncio.get_running_loop().call_later(self.flush_interval, self.flush)
+            except RuntimeError:
+                self.flush()  # no event loop to defer to
+
+    def flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        self.stream.write(b"".join(self._pending))
+        self.stream.flush()
+        self._pending.clear()
+        self._pending_bytes = 0
+        self.flushes += 1
+
+    def close(self):
+        self.flush()
+        if self.owns_stream:
+            self.stream.close()
+
+
+class JsonLinesServer:
+    """
+    TCP fan-out of JSON lines: every connected client receives every line
+    published after it connects. A client whose unsent backlog exceeds
+    `max_buffer` bytes is disconnected rather than slowing the session down.
+    """
+
+    def __init__(self, host="127.0.0.1", port=8766, max_buffer=1 << 20):
+        self.host = host
+        self.port = port
+        self.max_buffer = max_buffer
+        self.lines = 0
+        self.dropped_clients = 0
+        self._clients = set()
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def _handle(self, reader, writer):
+        self._clients.add(writer)
+        try:
+            # Subscribers only listen; wait for them to hang up
+            while await reader.read(1024):
+                pass
+        except ConnectionError:
+            pass
+        finally:
+            self._clients.discard(writer)
+            writer.close()
+
+    def publish(self, line):
+        self.lines += 1
+        for writer in list(self._clients):
+            if writer.transport.get_write_buffer_size() > self.max_buffer:
+                self.dropped_clients += 1
+                self._clients.discard(writer)
+                writer.close()
+                continue
+            writer.write(line)
+
+    @property
+    def clients(self):
+        return len(self._clients)
+
+    def close(self):
+        for writer in self._clients:
+            writer.close()
+        self._clients.clear()
+        if self._server:
+            self._server.close()
@@ -0,0 +1,196 @@
+import os
+import sys
+import time
+import logging
+from engine import OKX_PUBLIC_WS, ConnectionManager
+from utils.latency import LatencyTracker
+from utils.metrics import MetricsSink
+from utils.replay import FrameRecorder
+
+LOG_DIR = "logs"
+LOG_FILE = os.path.join(LOG_DIR, "latency_metrics.log")
+# Per-tick stage timings, written in batches off the hot path (see utils/metrics.py)
+METRICS_FILE = os.path.join(LOG_DIR, "tick_metrics.vlm")
+
+logger = logging.getLogger("LatencyMetrics")
+
+
+def configure_logging(log_file=LOG_FILE):
+    """Send periodic latency summaries to log_file (created on demand)."""
+    os.makedirs(os.path.dirname(log_file) or ".", exist_ok=True)
+    logging.basicConfig(
+        filename=log_file,
+        level=logging.INFO,
+        format='%(asctime)s %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+
+
+class Session:
+    """
+    Qt-free live pricing session: a ConnectionManager for the calculators,
+    per-stage latency histograms, the per-tick metrics sink and an optional
+    raw-frame recorder. Results and status events are fanned out to
+    subscribers added with subscribe(); the Qt UI, the headless CLI and the
+    benchmarks all sit on top of this.
+
+    `latest` always holds the most recent result and `published` counts
+    them, so slow consumers can poll instead of handling every tick.
+    """
+
+    def __init__(self, calculators, uri=OKX_PUBLIC_WS, reconnect_delay=2.0, queue_size=1000,
+                 record_path=None, metrics_path=METRICS_FILE, report_every=100, report_stream=None,
+                 impact_pool=None, trades=False, decoder="auto", trainer=None):
+        self.calculators = list(calculators)
+        # Streamed trades feed the online trainer (models/online.py), if any
+        self.trainer = trainer
+        self.manager = ConnectionManager(
+            self.calculators, uri,
+            on_result=self._on_result,
+            on_status=self._on_status,
+            reconnect_delay=reconnect_delay,
+            queue_size=queue_size,
+            impact_pool=impact_pool,
+            trades=trades or trainer is not None,
+            decoder=decoder,
+            on_trades=self._on_trades if trainer is not None else None
+        )
+        # Raw frames are optionally recorded for offline replay
+        self.record_path = record_path
+        self.metrics_path = metrics_path
+        self.metrics = None
+        self.report_every = report_every
+        self.report_stream = report_stream
+
+        self.published = 0
+        self.latest = None
+        self._result_subscribers = []
+        self._status_subscribers = []
+
+        # Rolling per-stage latency histograms, reported every `report_every` results.
+        # network/parse/model are recorded here, ui/e2e by a renderer via record_render()
+        self.latency = LatencyTracker()
+
+    def subscribe(self, on_result=None, on_status=None):
+        """Register on_result(result) and/or on_status(kind, detail) callbacks."""
+        if on_result:
+            self._result_subscribers.append(on_result)
+        if on_status:
+            self._status_subscribers.append(on_status)
+
+    def stop(self):
+        self.manager.stop()
+
+    async def run(self):
+        """Stream until stop() is called."""
+        if self.record_path:
+            self.manager.recorder = FrameRecorder(self.record_path)
+        if self.metrics_path:
+            os.makedirs(os.path.dirname(self.metrics_path) or ".", exist_ok=True)
+            self.metrics = MetricsSink(self.metrics_path)
+        try:
+            await self.manager.run()
+        finally:
+            if self.manager.recorder:
+                self.manager.recorder.close()
+            if self.metrics:
+                self.metrics.close()
+
+    def record_render(self, result, render_ms):
+        """Called by a renderer (e.g. the UI thread) after drawing `result` on screen."""
+        self.latency.record('ui', render_ms)
+        self.latency.record('e2e', (time.perf_counter() - result['latency']['recv_perf']) * 1000)
+
+    def _on_status(self, kind, detail):
+        if kind == 'recovered':
+            logger.info(f"Reconnect recovery={detail * 1000:.1f}ms")
+        for fn in self._status_subscribers:
+            fn(kind, detail)
+
+    def _on_trades(self, calc, trades):
+        """Join each trade with the book it hit and hand it to the trainer as a fill."""
+        book = calc.book
+        if not book.ready or not book.asks() or not book.bids():
+            return
+        features = book.top(5)
+        vol24h = calc.vol_cache.get(calc.asset)[0]
+        for trade in trades:
+            # Public trades are the taker side of each fill
+            self.trainer.add_fill(int(trade['ts']), float(trade['px']), float(trade['sz']),
+                                  1 if trade['side'] == 'buy' else -1, *features,
+                                  float("nan") if vol24h is None else vol24h, 1)
+
+    def _on_result(self, result):
+        latency = result['latency']
+        publish_ms = (time.perf_counter() - latency['recv_perf']) * 1000
+        self.latest = result
+        self.published += 1
+
+        self.latency.record('network', latency['network_ms'])
+        self.latency.record('parse', latency['parse_ms'])
+        self.latency.record('model', latency['model_ms'])
+        if self.metrics:
+            self.metrics.record((
+                result['ts'], latency['recv_wall'], latency['network_ms'], latency['queue_ms'],
+                latency['parse_ms'], latency['model_ms'], publish_ms
+            ))
+
+        for fn in self._result_subscribers:
+            fn(result)
+
+        if self.report_every and self.published % self.report_every == 0:
+            self.report()
+
+    def report(self):
+        """Print and log the last minute's latency percentiles and pipeline counters."""
+        out = self.report_stream or sys.stdout
+        print(f"[Metrics @ tick {self.published}, last 1m]", file=out)
+        for stage, s in self.latency.summary('1m').items():
+            if not s['count']:
+                continue  # e.g. ui/e2e without a renderer
+            print(f" {stage:<8} p50={s['p50_ms']:.2f}ms, p99={s['p99_ms']:.2f}ms, "
+                  f"p999={s['p999_ms']:.2f}ms, max={s['max_ms']:.2f}ms", file=out)
+            logger.info(
+                f"Latency stage={stage} window=1m n={s['count']} p50={s['p50_ms']:.3f}ms "
+                f"p99={s['p99_ms']:.3f}ms p999={s['p999_ms']:.3f}ms max={s['max_ms']:.3f}ms"
+            )
+        for vol_cache in {id(calc.vol_cache): calc.vol_cache for calc in self.calculators}.values():
+            v = vol_cache.stats()
+            if v['errors']:
+                print(f" Volume cache fetch errors={v['errors']}, last error={v['last_error']}", file=out)
+                logger.info(f"VolumeCache errors={v['errors']} last_error={v['last_error']}")
+        for calc in self.calculators:
+            cache = calc.impact_cache.stats()
+            print(f" Impact cache {calc.asset} hits={cache['hits']}, misses={cache['misses']}, "
+                  f"hit_rate={cache['hit_rate']:.1%}", file=out)
+            logger.info(
+                f"ImpactCache inst={calc.asset} hits={cache['hits']} misses={cache['misses']} "
+                f"size={cache['size']} hit_rate={cache['hit_rate']:.3f}"
+            )
+            if calc.realized_vol is not None:
+                v = calc.realized_vol.stats()
+                est = ", ".join(f"{k}={v[k]:.4f}" for k in ("ewma", "window") if v[k] is not None)
+                print(f" Realized vol {calc.asset} sigma={calc.volatility:.4f} ({v['method']}), {est}, "
+                      f"updates={v['updates']}", file=out)
+                logger.info(f"RealizedVol inst={calc.asset} sigma={calc.volatility:.6f} method={v['method']} "
+                            f"updates={v['updates']}")
+        if self.manager.queue is not None:
+            q = self.manager.queue.stats()
+            print(f" Tick queue depth={q['depth']}, max={q['max_depth']}, "
+                  f"conflated={q['conflated']}, dropped={q['dropped']}", file=out)
+            logger.info(
+                f"TickQueue depth={q['depth']} max_depth={q['max_depth']} "
+                f"conflated={q['conflated']} dropped={q['dropped']}"
+            )
+        if self.trainer is not None:
+            t = self.trainer.stats()
+            swapped = ", ".join(name for name, r in t['last'].items() if r.get('accepted')) or "none"
+            print(f" Online trainer fills={t['fills']}, retrains={t['retrains']}, swaps={t['swaps']}, "
+                  f"last swapped={swapped}", file=out)
+            logger.info(f"OnlineTrainer fills={t['fills']} retrains={t['retrains']} swaps={t['swaps']}")
+        if self.metrics:
+            m = self.metrics.stats()
+            logger.info(
+                f"MetricsSink recorded={m['recorded']} written={m['written']} "
+                f"dropped={m['dropped']} blocks={m['blocks']}"
+            )